@@ -1,105 +1,270 @@
-from flask import Flask, render_template, jsonify
-import requests
-from config import Config
-from models import db, Match, Team, CacheStatus
-from datetime import datetime, date, timedelta
+from flask import Blueprint, Flask, Response, current_app, render_template, jsonify, request, send_from_directory
+from flask_caching import Cache
+from config import CONFIGS
+from models import (db, Match, Team, League, CacheStatus, EventMark, PlayerStats, FINISHED_STATUSES, LIVE_STATUSES,
+                    MATCH_FIELDS)
+from sync import parse_fixture, parse_static_match, merge_fixture_rows, sync_matches, prune_expired
+from upstream import UpstreamClient
+from upstream_cache import CircuitBreaker, ResponseStore
+from refresher import BackgroundRefresher
+from planner import RefreshPlanner
+from quota import APIUsageTracker, make_quota_store
+from lineups import LineupCache, parse_lineups
+from match_events import events_after, ingest_events
+from logos import LogoStore
+from response_cache import ResponseCache
+from wire import negotiate
+from broadcaster import Broadcaster
+from archive import MatchArchive, decode_cursor, encode_cursor
+from snapshot import MatchSnapshot, SnapshotStore
+from standings import apply_standing_changes, league_countries, league_table, rebuild_standings
+from metrics import (REFRESH_LATENCY, QueryScope, init_request_metrics, instrument_engine, metrics_response,
+                     record_cache_lookup, record_upstream_call)
+from profiler import RequestProfiler
+from datetime import datetime, date, timedelta, timezone
+from functools import partial
+from zoneinfo import ZoneInfo
+from sqlalchemy import or_, update
+import click
 import json
 import os
+import threading
+import time
 
-# Import static data from separate file
-from static_data import STATIC_MATCHES, STATIC_LINEUPS
+cache = Cache()
+request_profiler = RequestProfiler()
+bp = Blueprint('main', __name__, cli_group=None)
 
-app = Flask(__name__)
-app.config.from_object(Config)
+# Kick-off times are asked for - and stored - in this timezone
+API_TIMEZONE = 'Europe/Athens'
 
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///football_stats.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Migration matching the schema db.create_all() built before Flask-Migrate was set up
+BASELINE_REVISION = '57a38ff241a2'
 
-db.init_app(app)
+# Config keys naming files or directories - relative ones are taken from the instance folder, as the
+# SQLite database's is, so nothing is written next to the code
+INSTANCE_PATHS = ('QUOTA_SQLITE_PATH', 'UPSTREAM_CACHE_PATH', 'ARCHIVE_DIR', 'REFRESH_LOCK_PATH',
+                  'SNAPSHOT_PATH', 'LOGO_DIR')
 
-# Initialize database
-with app.app_context():
-    db.create_all()
+# CacheStatus rows the refresh planner keeps its timestamps in - not refreshes
+PLANNER_MARKS = ('day_list', 'warm_fixtures')
 
+# One on-demand /fixtures/events fetch at a time per process
+events_fetch_lock = threading.Lock()
 
-# API Usage Tracker Class
-class APIUsageTracker:
-    def __init__(self, max_calls_per_day=100):
-        self.max_calls_per_day = max_calls_per_day
-        self.usage_file = 'api_usage.json'
+# Per-process services, created by create_app()
+api_tracker = response_cache = broadcaster = snapshots = archive = stats_engine = None
+upstream = lineup_cache = logo_store = planner = refresher = None
 
-    def can_make_call(self):
-        usage = self.get_today_usage()
-        return usage < self.max_calls_per_day
 
-    def record_api_call(self):
-        today = datetime.now().strftime('%Y-%m-%d')
-        usage_data = self.load_usage_data()
+def create_app(config_class=None):
+    """Application factory - FLASK_CONFIG picks development/production unless a config is given"""
+    app = Flask(__name__)
+    app.config.from_object(config_class or CONFIGS[os.getenv('FLASK_CONFIG', 'default')])
+    resolve_instance_paths(app)
 
-        if today not in usage_data:
-            usage_data[today] = 0
-        usage_data[today] += 1
+    db.init_app(app)
+    if click.get_current_context(silent=True) is not None:
+        # Flask-Migrate (and alembic) are only needed by the `flask db` commands
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    cache.init_app(app)
+    init_request_metrics(app)
+    request_profiler.init_app(app)
+    with app.app_context():
+        instrument_engine(db.engine)
+    if not app.config['PRELOAD_APP']:
+        init_services(app)
+    app.register_blueprint(bp)
+    return app
 
-        self.save_usage_data(usage_data)
 
-    def get_today_usage(self):
-        today = datetime.now().strftime('%Y-%m-%d')
-        usage_data = self.load_usage_data()
-        return usage_data.get(today, 0)
+def resolve_instance_paths(app):
+    """Point the relative INSTANCE_PATHS settings into app.instance_path"""
+    os.makedirs(app.instance_path, exist_ok=True)
+    for key in INSTANCE_PATHS:
+        if app.config.get(key) and not os.path.isabs(app.config[key]):
+            app.config[key] = os.path.join(app.instance_path, app.config[key])
 
-    def load_usage_data(self):
-        if os.path.exists(self.usage_file):
-            with open(self.usage_file, 'r') as f:
-                return json.load(f)
-        return {}
 
-    def save_usage_data(self, data):
-        with open(self.usage_file, 'w') as f:
-            json.dump(data, f)
+def init_worker(app):
+    """Per-process setup of an app preloaded by the gunicorn master, run in each forked worker"""
+    with app.app_context():
+        # Connections must not be shared with the master - not that it should have opened any
+        db.engine.dispose(close=False)
+    init_services(app)
+
+
+def init_services(app):
+    """Quota tracker, caches, upstream client and refresher for this process"""
+    global api_tracker, response_cache, broadcaster, snapshots, archive, stats_engine
+    global upstream, lineup_cache, logo_store, planner, refresher
+
+    # Create API tracker instance
+    api_tracker = APIUsageTracker(
+        make_quota_store(app.config),
+        max_calls_per_day=app.config['API_CALLS_PER_DAY'],
+        max_calls_per_minute=app.config['API_CALLS_PER_MINUTE'],
+        bucket_rate=app.config['API_BUCKET_RATE'],
+        bucket_capacity=app.config['API_BUCKET_CAPACITY']
+    )
+
+    # Current matches held in memory for the list endpoints
+    snapshots = SnapshotStore(app.config['SNAPSHOT_PATH'])
+
+    # Serialized match list responses, keyed by the snapshot version every worker shares
+    response_cache = ResponseCache(
+        cache,
+        timeout=app.config['CACHE_DEFAULT_TIMEOUT'],
+        version_fn=lambda: current_snapshot().version,
+        on_lookup=partial(record_cache_lookup, 'response')
+    )
+
+    # Pushes refresh diffs to /api/stream/live listeners
+    broadcaster = Broadcaster(heartbeat=app.config['STREAM_HEARTBEAT'])
+
+    # Finished matches, one SQLite file per month
+    archive = MatchArchive(app.config['ARCHIVE_DIR'])
+
+    # League/team statistics over the archive - NumPy is loaded by the first stats request
+    stats_engine = None
+
+    # Shared pooled client for every upstream call
+    upstream = UpstreamClient(
+        app.config['API_FOOTBALL_URL'],
+        get_api_headers(app.config),
+        timeout=app.config['UPSTREAM_TIMEOUT'],
+        retries=app.config['UPSTREAM_RETRIES'],
+        pool_size=app.config['UPSTREAM_POOL_SIZE'],
+        on_call=record_upstream_call,
+        **upstream_cache_options(app.config)
+    )
+
+    # Lineups: in-process LRU in front of the Lineup tables
+    lineup_cache = LineupCache(
+        fetch_lineups_from_api,
+        maxsize=app.config['LINEUP_CACHE_SIZE'],
+        prematch_ttl=app.config['LINEUP_TTL_PREMATCH'],
+        live_ttl=app.config['LINEUP_TTL_LIVE']
+    )
+
+    # Team and league logos served from our own host
+    logo_store = LogoStore(app.config['LOGO_DIR'], size=app.config['LOGO_SIZE']) if app.config['LOGO_DIR'] else None
+
+    # Which fixtures each refresh re-polls
+    planner = RefreshPlanner(
+        hot_before=app.config['REFRESH_HOT_BEFORE'],
+        warm_before=app.config['REFRESH_WARM_BEFORE'],
+        warm_interval=app.config['REFRESH_WARM_INTERVAL'],
+        day_list_interval=app.config['REFRESH_DAY_LIST_INTERVAL'],
+        batch_size=app.config['REFRESH_BATCH_SIZE']
+    )
+
+    # Keeps the cache warm and collapses concurrent refresh requests - across
+    # worker processes too when REFRESH_LOCK_PATH is set
+    refresher = BackgroundRefresher(
+        partial(run_refresh, app),
+        live_interval=app.config['REFRESH_LIVE_INTERVAL'],
+        idle_interval=app.config['REFRESH_IDLE_INTERVAL'],
+        min_interval=app.config['REFRESH_MIN_INTERVAL'],
+        budget_fn=quota_interval,
+        lock_path=app.config['REFRESH_LOCK_PATH']
+    )
+
+
+def upstream_cache_options(config):
+    """Stored responses and circuit breaker for UpstreamClient - none without UPSTREAM_CACHE_PATH"""
+    if not config['UPSTREAM_CACHE_PATH']:
+        return {}
+    return {
+        'store': ResponseStore(config['UPSTREAM_CACHE_PATH'], max_age=config['UPSTREAM_CACHE_MAX_AGE']),
+        'breaker': CircuitBreaker(config['UPSTREAM_BREAKER_THRESHOLD'], config['UPSTREAM_BREAKER_RESET']),
+        'fresh_for': config['UPSTREAM_FRESH_FOR'],
+        'stale_after': config['UPSTREAM_STALE_AFTER'],
+        'on_cache': partial(record_cache_lookup, 'upstream')
+    }
 
 
-# Create API tracker instance
-api_tracker = APIUsageTracker(max_calls_per_day=100)
+def start_background():
+    """Start the refresher and, with a shared snapshot, relay other workers' refreshes"""
+    refresher.start()
+    if snapshots.path:
+        snapshots.watch(relay_snapshot)
 
 
-def get_api_headers():
+def get_api_headers(config):
     return {
-        'X-RapidAPI-Key': app.config['API_FOOTBALL_KEY'],
-        'X-RapidAPI-Host': app.config['API_FOOTBALL_HOST']
+        'X-RapidAPI-Key': config['API_FOOTBALL_KEY'],
+        'X-RapidAPI-Host': config['API_FOOTBALL_HOST']
     }
 
 
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('index.html')
 
 
-@app.route('/api/refresh-cache')
+@bp.route('/api/refresh-cache')
 def refresh_cache():
-    """REAL API REFRESH with rate limiting"""
-
-    # Check if we can make API calls today
-    if not api_tracker.can_make_call():
-        return jsonify({
+    """Ask the background refresher for fresh data.
+
+    By default this only signals the refresher thread and returns the last
+    known result. With ?wait=1 the caller joins the single-flight refresh,
+    so a burst of clicks still costs one upstream refresh.
+    """
+    if request.args.get('wait'):
+        result = refresher.refresh()
+    else:
+        refresher.request_refresh()
+        result = dict(refresher.last_result or {'success': True, 'message': 'Refresh requested'}, queued=True)
+
+    return jsonify(dict(result, refresher=refresher.status()))
+
+
+def refresh_matches():
+    """REAL API REFRESH with rate limiting - returns a JSON-ready dict
+
+    The planner picks what to ask for: now and then the full live and day
+    lists, in between only the fixtures in play or about to start - and
+    nothing at all when none are.
+    """
+    snapshot = current_snapshot()
+    now = api_now()
+    plan = planner.plan(plan_fixtures(snapshot), now, planner_mark('day_list'), planner_mark('warm_fixtures'))
+    api_calls = planner.calls(plan)
+    if not api_calls:
+        return nothing_due(snapshot, plan)
+
+    # Check and record today's API calls in one atomic step
+    if not api_tracker.try_acquire(api_calls):
+        usage = api_tracker.usage_stats()
+        return {
             'success': False,
-            'error': f'Daily API limit reached ({api_tracker.max_calls_per_day} calls/day)',
-            'usage_today': api_tracker.get_today_usage(),
-            'remaining_calls': api_tracker.max_calls_per_day - api_tracker.get_today_usage()
-        })
+            'error': f'API limit reached ({api_tracker.max_calls_per_day} calls/day)',
+            'usage_today': usage['usage_today'],
+            'remaining_calls': usage['remaining_calls']
+        }
 
     try:
-        # Clear existing matches
-        db.session.query(Match).delete()
-
-        # Record that we're making API calls
-        api_tracker.record_api_call()
+        # Events and lineups embedded in the live / by-id payloads, by fixture id
+        details = {}
+        if plan.full:
+            # Fetch REAL data from API - both calls in flight at once
+            live_matches, today_matches = upstream.run_parallel(
+                partial(fetch_live_matches_from_api, current_app.config['LIVE_FIXTURE_LIMIT'], details),
+                partial(fetch_today_matches_from_api, current_app.config['TODAY_FIXTURE_LIMIT'])
+            )
+            rows = merge_fixture_rows(live_matches, today_matches)
+        else:
+            batches = upstream.run_parallel(*[partial(fetch_fixtures_by_id, ids, details) for ids in plan.batches])
+            rows = [row for batch in batches for row in batch]
 
-        # Fetch REAL data from API
-        live_matches = fetch_live_matches_from_api()
-        today_matches = fetch_today_matches_from_api()
+        # Diff against stored matches instead of wiping the table
+        changes = []
+        sync_stats = sync_matches(rows, changes=changes, complete=plan.full)
+        apply_standing_changes(rows, changes)
 
-        total_matches = len(live_matches) + len(today_matches)
+        usage = api_tracker.usage_stats()
 
         # Update cache status with REAL API call info
         cache_status = CacheStatus.query.filter_by(cache_type='live_refresh').first()
@@ -107,253 +272,586 @@ def refresh_cache():
             cache_status = CacheStatus(cache_type='live_refresh')
 
         cache_status.last_updated = datetime.utcnow()
-        cache_status.total_matches = total_matches
-        cache_status.api_calls_made = 1
+        cache_status.total_matches = len(rows)
+        cache_status.api_calls_made = api_calls
 
         db.session.add(cache_status)
+        if plan.full:
+            set_planner_mark('day_list', cache_status.last_updated)
+        if plan.warm:
+            set_planner_mark('warm_fixtures', cache_status.last_updated)
+
+        # Expired matches were archived when they finished
+        prune_expired(datetime.utcnow() - timedelta(days=current_app.config['ARCHIVE_PRUNE_DAYS']))
         db.session.commit()
 
-        return jsonify({
+        if changes:
+            archive_changes(rows, changes)
+            publish_changes(changes)
+        if logo_store is not None:
+            refresh_logos()
+        total_matches = len(current_snapshot())
+        events_added = ingest_match_events(rows, changes, details)
+
+        if current_app.config['PREFETCH_LINEUPS']:
+            try:
+                prefetch_lineups(rows)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Lineup prefetch failed: {e}")
+
+        stale_since = upstream.stale_since()
+        if stale_since is not None:
+            fetched = datetime.fromtimestamp(stale_since).strftime('%H:%M:%S')
+            message = f'⚠️ API slow or unavailable - showing {total_matches} matches as of {fetched}.'
+        elif plan.full:
+            message = f'✅ LIVE data refreshed! Loaded {total_matches} real matches from API.'
+        else:
+            message = f'✅ LIVE data refreshed! Re-polled {len(rows)} of {total_matches} matches from API.'
+
+        return {
             'success': True,
-            'message': f'✅ LIVE data refreshed! Loaded {total_matches} real matches from API.',
+            'message': message,
             'matches_count': total_matches,
+            'live_matches': len(current_snapshot().live),
+            'sync': sync_stats,
+            'plan': plan_summary(plan),
+            'pending_fixtures': len(plan.tiers['hot']) + len(plan.tiers['warm']),
+            'api_calls': api_calls,
+            'events_added': events_added,
             'last_updated': cache_status.last_updated.strftime('%Y-%m-%d %H:%M:%S'),
-            'data_source': 'live_api',
-            'usage_today': api_tracker.get_today_usage(),
-            'remaining_calls': api_tracker.max_calls_per_day - api_tracker.get_today_usage()
-        })
+            'data_source': 'live_api' if stale_since is None else 'upstream_cache',
+            'usage_today': usage['usage_today'],
+            'remaining_calls': usage['remaining_calls']
+        }
 
     except Exception as e:
-        # If API fails, fallback to static data
+        db.session.rollback()
+        # Keep the real matches we have - static data only ever fills an empty database
+        snapshot = current_snapshot()
+        if len(snapshot):
+            return keep_last_good_data(str(e), snapshot)
         return fallback_to_static_data(str(e))
 
 
-def fetch_live_matches_from_api():
-    """Fetch REAL live matches from Football API"""
+def api_now():
+    """Now as a naive time in API_TIMEZONE - the clock stored kick-off times run on"""
+    return datetime.now(ZoneInfo(API_TIMEZONE)).replace(tzinfo=None)
+
+
+def plan_fixtures(snapshot):
+    return [(record.id, record.status, record.match_time) for record in snapshot.today]
+
+
+def plan_summary(plan):
+    return dict({tier: len(ids) for tier, ids in plan.tiers.items()}, full=plan.full, batches=len(plan.batches))
+
+
+def planner_mark(name):
+    """When the planner last fetched `name` ('day_list' / 'warm_fixtures'), in API time - None if never"""
+    status = CacheStatus.query.filter_by(cache_type=name).first()
+    if status is None or status.last_updated is None:
+        return None
+    return status.last_updated.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(API_TIMEZONE)).replace(tzinfo=None)
+
+
+def set_planner_mark(name, when):
+    status = CacheStatus.query.filter_by(cache_type=name).first() or CacheStatus(cache_type=name)
+    status.last_updated = when
+    db.session.add(status)
+
+
+def nothing_due(snapshot, plan):
+    """The planner found nothing worth an API call - report the matches we have"""
+    usage = api_tracker.usage_stats()
+    return {
+        'success': True,
+        'message': f'✅ Matches up to date - nothing in play or about to start ({len(snapshot)} matches).',
+        'matches_count': len(snapshot),
+        'live_matches': len(snapshot.live),
+        'plan': plan_summary(plan),
+        'pending_fixtures': len(plan.tiers['hot']) + len(plan.tiers['warm']),
+        'api_calls': 0,
+        'data_source': 'live_api',
+        'usage_today': usage['usage_today'],
+        'remaining_calls': usage['remaining_calls']
+    }
+
+
+def fetch_live_matches_from_api(limit=None, details=None):
+    """Fetch REAL live matches from Football API as Match row dicts - embedded events go into `details`"""
     try:
-        url = f"{app.config['API_FOOTBALL_URL']}/fixtures"
-        params = {'live': 'all', 'timezone': 'Europe/Athens'}
-
-        response = requests.get(url, headers=get_api_headers(), params=params, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            matches = []
-
-            for match_data in data.get('response', [])[:15]:
-                match = Match(
-                    fixture_id=match_data['fixture']['id'],
-                    home_team=match_data['teams']['home']['name'],
-                    away_team=match_data['teams']['away']['name'],
-                    home_logo=match_data['teams']['home']['logo'],
-                    away_logo=match_data['teams']['away']['logo'],
-                    home_score=match_data['goals']['home'],
-                    away_score=match_data['goals']['away'],
-                    status=match_data['fixture']['status']['short'],
-                    elapsed=match_data['fixture']['status']['elapsed'],
-                    match_time=datetime.fromisoformat(match_data['fixture']['date'].replace('Z', '+00:00')),
-                    league=match_data['league']['name'],
-                    league_logo=match_data['league']['logo'],
-                    venue=match_data['fixture']['venue']['name'] if match_data['fixture']['venue'] else '',
-                    is_live=True
-                )
-
-                db.session.add(match)
-                matches.append(match)
+        params = {'live': 'all', 'timezone': API_TIMEZONE}
 
-            db.session.commit()
-            return matches
-        else:
-            raise Exception(f"API returned status code {response.status_code}")
+        fixtures = upstream.iter_items('/fixtures', params, limit=limit)
+        return [parse_fixture(keep_details(match_data, details), is_live=True) for match_data in fixtures]
 
     except Exception as e:
         print(f"Error fetching live matches from API: {e}")
         raise e
 
 
-def fetch_today_matches_from_api():
-    """Fetch REAL today's matches from Football API"""
+def fetch_fixtures_by_id(fixture_ids, details=None):
+    """Fetch REAL fixtures by id - up to 20 per call - as Match row dicts, embedded events into `details`"""
+    try:
+        params = {'ids': '-'.join(str(fixture_id) for fixture_id in fixture_ids), 'timezone': API_TIMEZONE}
+
+        fixtures = upstream.iter_items('/fixtures', params)
+        return [parse_fixture(keep_details(match_data, details),
+                              is_live=match_data['fixture']['status']['short'] in LIVE_STATUSES)
+                for match_data in fixtures]
+
+    except Exception as e:
+        print(f"Error fetching fixtures {fixture_ids} from API: {e}")
+        raise e
+
+
+def fetch_today_matches_from_api(limit=None):
+    """Fetch REAL today's matches from Football API as Match row dicts"""
     try:
         today = date.today().strftime('%Y-%m-%d')
-        url = f"{app.config['API_FOOTBALL_URL']}/fixtures"
-        params = {'date': today, 'timezone': 'Europe/Athens'}
-
-        response = requests.get(url, headers=get_api_headers(), params=params, timeout=10)
-
-        if response.status_code == 200:
-            data = response.json()
-            matches = []
-
-            for match_data in data.get('response', [])[:25]:
-                # Skip if already exists (live matches)
-                existing = Match.query.filter_by(fixture_id=match_data['fixture']['id']).first()
-                if existing:
-                    continue
-
-                match = Match(
-                    fixture_id=match_data['fixture']['id'],
-                    home_team=match_data['teams']['home']['name'],
-                    away_team=match_data['teams']['away']['name'],
-                    home_logo=match_data['teams']['home']['logo'],
-                    away_logo=match_data['teams']['away']['logo'],
-                    home_score=match_data['goals']['home'],
-                    away_score=match_data['goals']['away'],
-                    status=match_data['fixture']['status']['short'],
-                    elapsed=match_data['fixture']['status']['elapsed'],
-                    match_time=datetime.fromisoformat(match_data['fixture']['date'].replace('Z', '+00:00')),
-                    league=match_data['league']['name'],
-                    league_logo=match_data['league']['logo'],
-                    venue=match_data['fixture']['venue']['name'] if match_data['fixture']['venue'] else '',
-                    is_live=False
-                )
-
-                db.session.add(match)
-                matches.append(match)
+        params = {'date': today, 'timezone': API_TIMEZONE}
 
-            db.session.commit()
-            return matches
-        else:
-            raise Exception(f"API returned status code {response.status_code}")
+        fixtures = upstream.iter_items('/fixtures', params, limit=limit)
+        return [parse_fixture(match_data) for match_data in fixtures]
 
     except Exception as e:
         print(f"Error fetching today matches from API: {e}")
         raise e
 
 
+def keep_details(match_data, details):
+    """Put a fixture payload's events and lineups (when it has them) into `details`, returns the payload"""
+    if details is not None and match_data.get('events') is not None:
+        details[match_data['fixture']['id']] = {'events': match_data['events'], 'lineups': match_data.get('lineups')}
+    return match_data
+
+
+def fetch_events_from_api(fixture_id):
+    """Fetch REAL events for one fixture, counted against the API quota"""
+    if not upstream.session.headers.get('X-RapidAPI-Key'):
+        raise Exception('No API key configured')
+    if not api_tracker.try_acquire():
+        raise Exception(f'API limit reached ({api_tracker.max_calls_per_day} calls/day)')
+    return upstream.get('/fixtures/events', {'fixture': fixture_id}).get('response', [])
+
+
+def fetch_lineups_from_api(fixture_id):
+    """Fetch REAL lineups for one fixture, counted against the API quota"""
+    # Runs on the upstream pool too, so the key is read off the session, not the app config
+    if not upstream.session.headers.get('X-RapidAPI-Key'):
+        raise Exception('No API key configured')
+    if not api_tracker.try_acquire():
+        raise Exception(f'API limit reached ({api_tracker.max_calls_per_day} calls/day)')
+    return parse_lineups(upstream.get('/fixtures/lineups', {'fixture': fixture_id}))
+
+
+def prefetch_lineups(rows):
+    """Fetch lineups for live fixtures we don't have yet, all at once"""
+    statuses = {row['fixture_id']: row['status'] for row in rows if row['is_live']}
+    missing = lineup_cache.missing(list(statuses))[:current_app.config['LINEUP_PREFETCH_LIMIT']]
+
+    results = upstream.run_parallel(
+        *[partial(fetch_lineups_from_api, fixture_id) for fixture_id in missing],
+        return_exceptions=True
+    )
+    for fixture_id, lineups in zip(missing, results):
+        if isinstance(lineups, Exception):
+            print(f"Lineup prefetch failed for {fixture_id}: {lineups}")
+            continue
+        lineup_cache.store(fixture_id, lineups, statuses[fixture_id])
+
+
+def keep_last_good_data(error_message, snapshot):
+    """API failed and nothing was stored to replace it - leave the current matches in place"""
+    return {
+        'success': True,
+        'message': f'⚠️ API failed ({error_message}). Still showing the last {len(snapshot)} matches.',
+        'matches_count': len(snapshot),
+        'live_matches': len(snapshot.live),
+        'data_source': 'last_good',
+        'error': error_message
+    }
+
+
+def refresh_logos():
+    """Download missing logos after a refresh has committed and push them to the current matches"""
+    try:
+        patches = fetch_missing_logos()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Logo fetch failed: {e}")
+        return
+    if patches:
+        publish_changes(patches)
+
+
+def fetch_missing_logos():
+    """Download logos not in the logo store yet - returns patches for the current matches showing them.
+
+    No transaction is open during the downloads - on SQLite it would hold
+    the write lock, or go stale, for as long as they take - and the
+    asset names are written afterwards by primary key.
+    """
+    pending = ([(Team, item.id, item.logo) for item in
+                db.session.query(Team.id, Team.logo).filter(Team.logo_asset.is_(None), Team.logo.isnot(None))]
+               + [(League, item.id, item.logo) for item in
+                  db.session.query(League.id, League.logo).filter(League.logo_asset.is_(None), League.logo.isnot(None))])
+    db.session.commit()
+    if not pending:
+        return []
+
+    assets = logo_store.fetch([logo for _, _, logo in pending], limit=current_app.config['LOGO_FETCH_LIMIT'])
+    found = {Team: [], League: []}
+    for model, item_id, logo in pending:
+        if logo in assets:
+            found[model].append({'id': item_id, 'logo_asset': assets[logo]})
+    for model, updates in found.items():
+        if updates:
+            db.session.execute(update(model), updates)
+    teams, leagues = {row['id'] for row in found[Team]}, {row['id'] for row in found[League]}
+    if not (teams or leagues):
+        return []
+
+    patches = []
+    shown = Match.current().filter(or_(Match.home_team_id.in_(teams), Match.away_team_id.in_(teams),
+                                       Match.league_id.in_(leagues)))
+    for match in shown:
+        patch = {'id': match.fixture_id}
+        if match.home_team_id in teams:
+            patch['home_logo'] = match.home_team.logo_url
+        if match.away_team_id in teams:
+            patch['away_logo'] = match.away_team.logo_url
+        if match.league_id in leagues:
+            patch['league_logo'] = match.league.logo_url
+        patches.append(patch)
+    return patches
+
+
 def fallback_to_static_data(error_message):
     """Fallback to static data if API fails"""
     try:
-        # Clear and add static data
-        db.session.query(Match).delete()
-
-        matches_added = 0
-        for match_data in STATIC_MATCHES:
-            match = Match(
-                fixture_id=match_data['id'],
-                home_team=match_data['home_team'],
-                away_team=match_data['away_team'],
-                home_logo=match_data['home_logo'],
-                away_logo=match_data['away_logo'],
-                home_score=match_data['home_score'],
-                away_score=match_data['away_score'],
-                status=match_data['status'],
-                elapsed=match_data['elapsed'],
-                match_time=datetime.fromisoformat(match_data['time'].replace('Z', '+00:00')),
-                league=match_data['league'],
-                league_logo=match_data['league_logo'],
-                venue=match_data['venue'],
-                is_live=match_data['is_live']
-            )
-            db.session.add(match)
-            matches_added += 1
+        # Sync static data in place of the real matches
+        from static_data import STATIC_MATCHES
+        rows = [parse_static_match(match_data) for match_data in STATIC_MATCHES]
+        changes = []
+        sync_matches(rows, changes=changes)
+        apply_standing_changes(rows, changes)
+        matches_added = len(rows)
 
         db.session.commit()
+        if changes:
+            publish_changes(changes)
 
-        return jsonify({
+        return {
             'success': True,
             'message': f'⚠️ API failed ({error_message}). Loaded {matches_added} static matches for testing.',
             'matches_count': matches_added,
+            'live_matches': sum(1 for row in rows if row['is_live']),
             'last_updated': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
             'data_source': 'static_fallback'
-        })
+        }
 
     except Exception as fallback_error:
-        return jsonify({
+        db.session.rollback()
+        return {
             'success': False,
             'error': f'Both API and static fallback failed: {fallback_error}'
-        })
+        }
+
+
+def publish_changes(changes):
+    """Swap in a new snapshot version - which invalidates cached responses - and push the diff"""
+    previous = current_snapshot()
+    snapshot = MatchSnapshot.load(previous.version + 1, previous, changes)
+    snapshots.publish(snapshot, changes)
+    broadcaster.publish('patch', {'version': snapshot.version, 'changes': changes})
+
+
+def relay_snapshot(previous, snapshot, changes):
+    """Pass a refresh made by another worker on to this worker's stream listeners"""
+    if changes is not None and snapshot.version == previous.version + 1:
+        broadcaster.publish('patch', {'version': snapshot.version, 'changes': changes})
+    else:
+        # Missed a version in between - clients reload the list instead
+        broadcaster.publish('reset', {'version': snapshot.version})
+
+
+def ingest_match_events(rows, changes, details):
+    """Store this refresh's new fixture events and settle minutes of fixtures that finished - events added"""
+    finished = {change['id'] for change in changes if change.get('status') in FINISHED_STATUSES}
+    statuses = {row['fixture_id']: row['status'] for row in rows
+                if row['fixture_id'] in details or row['fixture_id'] in finished}
+    if not statuses:
+        return 0
+    try:
+        added = ingest_events(statuses, details)
+        db.session.commit()
+        return added
+    except Exception as e:
+        db.session.rollback()
+        print(f"Event ingestion failed: {e}")
+        return 0
+
+
+def load_fixture_events(fixture_id):
+    """Fetch a fixture's events the first time they are asked for - refreshes keep live ones current after that"""
+    record = current_snapshot().by_fixture.get(fixture_id)
+    if record is None or record.status not in LIVE_STATUSES + FINISHED_STATUSES:
+        return None
+    with events_fetch_lock:
+        mark = db.session.get(EventMark, fixture_id)
+        if mark is None:
+            ingest_events({fixture_id: record.status}, {fixture_id: {'events': fetch_events_from_api(fixture_id)}})
+            db.session.commit()
+            mark = db.session.get(EventMark, fixture_id)
+    return mark
+
+
+def archive_changes(rows, changes):
+    """Copy fixtures that changed in this refresh into the archive if they finished"""
+    changed = {change['id'] for change in changes if not change.get('removed')}
+    try:
+        archive.archive([row for row in rows if row['fixture_id'] in changed])
+    except Exception as e:
+        print(f"Archiving matches failed: {e}")
+
+
+def run_refresh(app):
+    """Refresh inside an app context - called from the refresher thread too"""
+    with app.app_context(), QueryScope('refresh'):
+        start = time.perf_counter()
+        result = refresh_matches()
+        REFRESH_LATENCY.labels(result.get('data_source', 'failed')).observe(time.perf_counter() - start)
+        return result
+
+
+def quota_interval():
+    """Seconds between refreshes that spends the remaining quota while matches are in play"""
+    # Runs on the refresher thread - no app context, so only the snapshot already held
+    snapshot = snapshots.current
+    fixtures = plan_fixtures(snapshot) if snapshot is not None else []
+    return planner.budget_interval(fixtures, api_now(), api_tracker.usage_stats()['remaining_calls'])
 
 
-@app.route('/api/usage-stats')
+def current_snapshot():
+    """Snapshot of current matches, loaded from the database only if there is none yet"""
+    # Versions start from the clock so a restarted process never reuses cached responses
+    return snapshots.get(lambda: MatchSnapshot.load(time.time_ns() // 1000000))
+
+
+def stats_frame():
+    """FixtureFrame of the archive, creating the stats engine on first use"""
+    global stats_engine
+    if stats_engine is None:
+        from stats import StatsEngine
+        stats_engine = StatsEngine(archive)
+    return stats_engine.frame()
+
+
+@bp.route('/api/usage-stats')
 def get_usage_stats():
     """Get current API usage statistics"""
-    return jsonify({
-        'daily_limit': api_tracker.max_calls_per_day,
-        'usage_today': api_tracker.get_today_usage(),
-        'remaining_calls': api_tracker.max_calls_per_day - api_tracker.get_today_usage(),
-        'usage_percentage': (api_tracker.get_today_usage() / api_tracker.max_calls_per_day) * 100
-    })
+    return jsonify(api_tracker.usage_stats())
 
 
-@app.route('/api/live-matches')
+def match_page_args():
+    """Validated ?cursor=&limit=&league=&country=&status=&fields=&since=&format= for the match lists"""
+    fields = request.args.get('fields')
+    if fields:
+        fields = ['id'] + [field for field in fields.split(',') if field != 'id']
+        unknown = set(fields) - set(MATCH_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown fields {', '.join(sorted(unknown))}")
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        cursor = (datetime.fromisoformat(value), row_id)
+
+    since = request.args.get('since')
+    if since is not None:
+        if not since.isdigit():
+            raise ValueError('since must be a data version (X-Data-Version)')
+        since = int(since)
+
+    return {
+        'fields': fields,
+        'cursor': cursor,
+        'limit': max(1, min(request.args.get('limit', current_app.config['MATCHES_PAGE_SIZE'], type=int),
+                            current_app.config['MATCHES_MAX_PAGE'])),
+        'league': request.args.get('league'),
+        'country': request.args.get('country'),
+        'status': request.args['status'].split(',') if request.args.get('status') else None,
+        'since': since,
+        'format': negotiate()
+    }
+
+
+def match_list(view, args):
+    """A page of the live/today list, or with ?since= only what changed after that version"""
+    snapshot = current_snapshot()
+    if args['since'] is not None:
+        return snapshot.delta(view, args)
+    return snapshot.page(view, args)
+
+
+@bp.route('/api/live-matches')
 def get_live_matches():
-    """Get live matches from database"""
+    """Get live matches from the snapshot, most recently updated first - paginated"""
     try:
-        matches = Match.query.filter_by(is_live=True).order_by(Match.updated_at.desc()).all()
-        return jsonify({
-            'matches': [match.to_dict() for match in matches],
-            'success': True,
-            'from_cache': True,
-            'count': len(matches)
-        })
+        args = match_page_args()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}', 'success': False}), 400
+
+    try:
+        return response_cache.respond('live-matches', lambda: match_list('live', args), args['format'])
     except Exception as e:
         return jsonify({'error': str(e), 'success': False})
 
 
-@app.route('/api/today-matches')
+@bp.route('/api/today-matches')
 def get_today_matches():
-    """Get today's matches from database"""
+    """Get today's matches from the snapshot in kick-off order - paginated"""
     try:
-        matches = Match.query.order_by(Match.match_time.asc()).all()
-        return jsonify({
-            'matches': [match.to_dict() for match in matches],
-            'success': True,
-            'from_cache': True,
-            'count': len(matches)
-        })
+        args = match_page_args()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}', 'success': False}), 400
+
+    try:
+        return response_cache.respond('today-matches', lambda: match_list('today', args), args['format'])
+    except Exception as e:
+        return jsonify({'error': str(e), 'success': False})
+
+
+@bp.route('/api/matches')
+def get_matches():
+    """Archived matches - ?from=YYYY-MM-DD&to=YYYY-MM-DD&league=&country=&cursor=&limit=
+
+    Keyset paginated on (kick-off, fixture id) and streamed row by row.
+    """
+    try:
+        start = date.fromisoformat(request.args['from']).isoformat() if request.args.get('from') else None
+        end = (date.fromisoformat(request.args['to']) + timedelta(days=1)).isoformat() if request.args.get('to') else None
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'error': f'Invalid parameter: {e}', 'success': False}), 400
+
+    league, country = request.args.get('league'), request.args.get('country')
+    limit = max(1, min(request.args.get('limit', 500, type=int), current_app.config['ARCHIVE_MAX_PAGE']))
+
+    def generate():
+        yield '{"success":true,"matches":['
+        count, last = 0, None
+        for match in archive.iter_matches(start, end, league, after, limit, country):
+            yield (',' if count else '') + json.dumps(match)
+            count, last = count + 1, match
+        next_cursor = encode_cursor(last['time'], last['id']) if count == limit else None
+        yield f'],"count":{count},"next_cursor":{json.dumps(next_cursor)}}}'
+
+    return Response(generate(), mimetype='application/json')
+
+
+@bp.route('/api/stats/league/<path:name>')
+def get_league_stats(name):
+    """League table computed from archived matches - ?country= as for /api/standings"""
+    try:
+        frame = stats_frame()
+        country = request.args.get('country')
+        if country is None:
+            countries = frame.countries(name)
+            if len(countries) > 1:
+                return ambiguous_league(name, countries)
+            country = countries[0] if countries else ''
+        table = frame.league_table(name, country)
+        if table is None:
+            return jsonify({'error': f'No archived matches for {name}', 'success': False})
+        return jsonify({'league': name, 'country': country, 'table': table, 'success': True})
+    except Exception as e:
+        return jsonify({'error': str(e), 'success': False})
+
+
+@bp.route('/api/stats/team/<path:name>')
+def get_team_stats(name):
+    """Team record, home/away split and form - ?form=5&vs=<opponent> for head-to-head"""
+    try:
+        stats = stats_frame().team_stats(
+            name,
+            form=request.args.get('form', 5, type=int),
+            opponent=request.args.get('vs')
+        )
+        if stats is None:
+            return jsonify({'error': f'No archived matches for {name}', 'success': False})
+        return jsonify(dict(stats, success=True))
+    except Exception as e:
+        return jsonify({'error': str(e), 'success': False})
+
+
+@bp.route('/api/standings/<path:league>')
+def get_standings(league):
+    """Standings kept up to date by the refresh - ?provisional=1 counts matches in play.
+
+    ?country= picks between leagues of the same name, and is required when there are several.
+    """
+    try:
+        country = request.args.get('country')
+        if country is None:
+            countries = league_countries(league)
+            if len(countries) > 1:
+                return ambiguous_league(league, countries)
+            country = countries[0] if countries else ''
+        provisional = request.args.get('provisional', '0') not in ('0', 'false', '')
+        table = league_table(league, country, provisional=provisional)
+        return jsonify({'league': league, 'country': country, 'provisional': provisional, 'table': table,
+                        'success': True})
     except Exception as e:
         return jsonify({'error': str(e), 'success': False})
 
 
-@app.route('/api/team-lineup/<int:fixture_id>')
+def ambiguous_league(league, countries):
+    """400 for a league name several countries use, when the request did not say which"""
+    return jsonify({
+        'error': f"More than one league is called {league} - pass ?country= ({', '.join(countries)})",
+        'countries': countries,
+        'success': False
+    }), 400
+
+
+@bp.route('/api/stream/live')
+def stream_live():
+    """Server-Sent Events stream of score/status diffs pushed by the refresher"""
+    # Somebody is watching - make sure the cache is being kept warm
+    refresher.start()
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    return Response(
+        broadcaster.listen(last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/api/team-lineup/<int:fixture_id>')
 def get_team_lineup(fixture_id):
-    """Get team lineup - try API first, fallback to static"""
+    """Get team lineup - cache, database, then API, fallback to static"""
     try:
-        # Try to get lineup from real API
-        if app.config.get('API_FOOTBALL_KEY'):
-            try:
-                url = f"{app.config['API_FOOTBALL_URL']}/fixtures/lineups"
-                params = {'fixture': fixture_id}
-
-                response = requests.get(url, headers=get_api_headers(), params=params, timeout=10)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('response'):
-                        lineups = []
-
-                        for team_lineup in data.get('response', []):
-                            team_data = {
-                                'team_name': team_lineup['team']['name'],
-                                'team_logo': team_lineup['team']['logo'],
-                                'formation': team_lineup['formation'],
-                                'coach': team_lineup['coach']['name'] if team_lineup['coach'] else 'Unknown',
-                                'players': []
-                            }
-
-                            for player in team_lineup['startXI']:
-                                player_data = {
-                                    'id': player['player']['id'],
-                                    'name': player['player']['name'],
-                                    'number': player['player']['number'],
-                                    'position': player['player']['pos'],
-                                    'grid': player['player']['grid']
-                                }
-                                team_data['players'].append(player_data)
-
-                            lineups.append(team_data)
-
-                        return jsonify({'lineups': lineups, 'success': True, 'source': 'live_api'})
-            except Exception as api_error:
-                print(f"API lineup failed: {api_error}")
+        lineups, source = lineup_cache.get(fixture_id)
+        record_cache_lookup('lineup', source)
+        if lineups:
+            return jsonify({'lineups': lineups, 'success': True, 'source': source})
 
         # Fallback to static lineups
+        from static_data import STATIC_LINEUPS
         if fixture_id in STATIC_LINEUPS:
             return jsonify({
                 'lineups': STATIC_LINEUPS[fixture_id],
                 'success': True,
                 'source': 'static_fallback'
             })
+        elif source == 'unknown':
+            return jsonify({'error': 'Unknown fixture', 'success': False}), 404
         else:
             return jsonify({
                 'error': 'Lineup not available for this match',
@@ -364,13 +862,64 @@ def get_team_lineup(fixture_id):
         return jsonify({'error': str(e), 'success': False})
 
 
-@app.route('/api/cache-status')
+@bp.route('/api/fixture/<int:fixture_id>/events')
+def get_fixture_events(fixture_id):
+    """Goals, cards and substitutions of a fixture - ?after=<last_seq seen> returns only the newer ones.
+
+    `count` is how many events the fixture has now: a client holding a
+    different number after adding the new ones missed a removal (a VAR
+    reversal) and should read the fixture again without `after`.
+    """
+    try:
+        after = request.args.get('after', 0, type=int)
+        mark = db.session.get(EventMark, fixture_id) or load_fixture_events(fixture_id)
+        last_seq = mark.last_seq if mark is not None else 0
+        return jsonify({
+            'fixture_id': fixture_id,
+            # Nothing newer than the client has - no need to touch the events at all
+            'events': events_after(fixture_id, after) if after < last_seq else [],
+            'last_seq': last_seq,
+            'count': mark.count if mark is not None else 0,
+            'success': True
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'success': False})
+
+
+@bp.route('/api/player/<int:player_id>/stats')
+def get_player_stats(player_id):
+    """Appearances, minutes, goals, assists and cards of a player, counted from ingested events"""
+    try:
+        stats = db.session.get(PlayerStats, player_id)
+        if stats is None:
+            return jsonify({'error': 'No events recorded for this player', 'success': False})
+        return jsonify(dict(stats.to_dict(), success=True))
+    except Exception as e:
+        return jsonify({'error': str(e), 'success': False})
+
+
+@bp.route('/logos/<name>')
+def get_logo(name):
+    """A logo from the logo store - named by content hash, so cached for good"""
+    if logo_store is None:
+        return jsonify({'error': 'Logo store disabled', 'success': False}), 404
+    response = send_from_directory(logo_store.directory, name, max_age=365 * 86400)
+    response.cache_control.immutable = True
+    # Only ever shown through <img> - never let a stored file run as a page
+    response.headers['Content-Security-Policy'] = 'sandbox'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+@bp.route('/api/cache-status')
 def get_cache_status():
     """Get cache status information"""
     try:
-        cache_status = CacheStatus.query.order_by(CacheStatus.last_updated.desc()).first()
-        live_count = Match.query.filter_by(is_live=True).count()
-        today_count = Match.query.count()
+        cache_status = (CacheStatus.query.filter(CacheStatus.cache_type.notin_(PLANNER_MARKS))
+                        .order_by(CacheStatus.last_updated.desc()).first())
+        snapshot = current_snapshot()
+        live_count, today_count = len(snapshot.live), len(snapshot)
 
         return jsonify({
             'success': True,
@@ -385,32 +934,101 @@ def get_cache_status():
         return jsonify({'error': str(e), 'success': False})
 
 
+@bp.route('/metrics')
+def get_metrics():
+    """Prometheus metrics - request timings, queries, upstream calls, cache hits and quota"""
+    usage = api_tracker.usage_stats()
+    snapshot = current_snapshot()
+    return metrics_response([
+        ('api_quota_daily_limit', 'Football API calls allowed per day', usage['daily_limit']),
+        ('api_quota_used_today', 'Football API calls made today', usage['usage_today']),
+        ('api_quota_remaining_today', 'Football API calls left today', usage['remaining_calls']),
+        ('current_matches', 'Matches in the current snapshot', len(snapshot)),
+        ('live_matches', 'Live matches in the current snapshot', len(snapshot.live)),
+        ('upstream_circuit_open', 'Football API circuit breaker open (1) or not (0)',
+         int(upstream.breaker is not None and upstream.breaker.state == 'open')),
+        ('upstream_serving_stale', 'Stored upstream bodies served in place of the API (1) or not (0)',
+         int(upstream.stale_since() is not None))
+    ])
+
+
+@bp.cli.command('archive-matches')
+def archive_matches_command():
+    """Copy every finished match in the database into the archive"""
+    rows = [match.to_row() for match in Match.query.filter(Match.status.in_(FINISHED_STATUSES))]
+    print(f"✅ Archived {archive.archive(rows)} finished matches")
+
+
+@bp.cli.command('rebuild-standings')
+@click.option('--verify', is_flag=True, help='Only compare, do not rewrite the standings')
+def rebuild_standings_command(verify):
+    """Recompute standings from the archive and live matches"""
+    columns = ('fixture_id', 'league', 'country', 'home_team', 'away_team', 'home_score', 'away_score', 'status')
+    rows = {row[0]: dict(zip(columns, row)) for row in archive.read_columns(columns)}
+    # Matches still in play (or finished but not archived yet) override the archive
+    for match in Match.query.filter_by(expired_at=None):
+        row = match.to_row()
+        rows[match.fixture_id] = {column: row[column] for column in columns}
+
+    mismatches = rebuild_standings(list(rows.values()), verify_only=verify)
+    for league, country, team, kind in mismatches:
+        print(f"❌ {league} ({country or '?'}) / {team} ({kind}) differs from a full rebuild")
+
+    if verify:
+        if mismatches:
+            raise SystemExit(1)
+        print("✅ Incremental standings match a full rebuild")
+    else:
+        db.session.commit()
+        print(f"✅ Rebuilt standings from {len(rows)} matches ({len(mismatches)} rows corrected)")
+
+
+def seed_static_matches():
+    """Load STATIC_MATCHES into an empty database, returns how many were added"""
+    if Match.query.count() > 0:
+        return 0
+
+    # Same path as a refresh - one bulk insert - so standings are seeded along with the matches
+    from static_data import STATIC_MATCHES
+    rows = [parse_static_match(match_data) for match_data in STATIC_MATCHES]
+    changes = []
+    sync_matches(rows, changes=changes)
+    apply_standing_changes(rows, changes)
+    db.session.commit()
+    return len(STATIC_MATCHES)
+
+
+@bp.cli.command('seed')
+def seed_command():
+    """Initialize an empty database with static data for testing"""
+    matches_added = seed_static_matches()
+    if matches_added:
+        print(f"✅ Initialized with {matches_added} static matches")
+    else:
+        print("Database already has matches - nothing seeded")
+
+
 if __name__ == '__main__':
-    # Initialize with static data on startup if database is empty
+    from config import DevelopmentConfig
+
+    app = create_app(DevelopmentConfig)
+
+    # Development shortcut - production runs `flask db upgrade` and `flask seed` instead. The schema
+    # is only checked here, once: a new database is migrated, one built by db.create_all() before
+    # migrations existed is stamped at the baseline and upgraded, a migrated one is left as it is
     with app.app_context():
-        if Match.query.count() == 0:
-            print("🚀 Initializing database with static data for testing...")
-            matches_added = 0
-            for match_data in STATIC_MATCHES:
-                match = Match(
-                    fixture_id=match_data['id'],
-                    home_team=match_data['home_team'],
-                    away_team=match_data['away_team'],
-                    home_logo=match_data['home_logo'],
-                    away_logo=match_data['away_logo'],
-                    home_score=match_data['home_score'],
-                    away_score=match_data['away_score'],
-                    status=match_data['status'],
-                    elapsed=match_data['elapsed'],
-                    match_time=datetime.fromisoformat(match_data['time'].replace('Z', '+00:00')),
-                    league=match_data['league'],
-                    league_logo=match_data['league_logo'],
-                    venue=match_data['venue'],
-                    is_live=match_data['is_live']
-                )
-                db.session.add(match)
-                matches_added += 1
-            db.session.commit()
-            print(f"✅ Initialized with {matches_added} static matches")
+        from sqlalchemy import inspect
+        if not inspect(db.engine).has_table('alembic_version'):
+            from flask_migrate import Migrate, stamp, upgrade
+            Migrate(app, db)
+            if inspect(db.engine).has_table('match'):
+                stamp(revision=BASELINE_REVISION)
+            upgrade()
+        if seed_static_matches():
+            print("🚀 Initialized database with static data for testing")
+
+    # Only the reloader's child process serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background()
 
     app.run(debug=True)
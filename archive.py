@@ -0,0 +1,201 @@
+import base64
+import os
+import sqlite3
+from datetime import datetime
+from models import FINISHED_STATUSES
+
+ARCHIVE_COLUMNS = (
+    'fixture_id', 'match_time', 'league', 'home_team', 'away_team', 'home_logo', 'away_logo',
+    'home_score', 'away_score', 'status', 'venue', 'league_logo', 'country'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived_match (
+    fixture_id INTEGER PRIMARY KEY,
+    match_time TEXT NOT NULL,
+    league TEXT,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    home_logo TEXT,
+    away_logo TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    status TEXT NOT NULL,
+    venue TEXT,
+    league_logo TEXT,
+    country TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_archived_match_time ON archived_match (match_time, fixture_id);
+CREATE INDEX IF NOT EXISTS ix_archived_league_time ON archived_match (league, match_time, fixture_id);
+"""
+
+
+def encode_cursor(match_time, fixture_id):
+    return base64.urlsafe_b64encode(f'{match_time}|{fixture_id}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    match_time, fixture_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return match_time, int(fixture_id)
+
+
+def _month_key(value):
+    return value[:7]  # 'YYYY-MM' from an ISO timestamp
+
+
+def _iso(value):
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat()
+    return value
+
+
+class MatchArchive:
+    """Finished matches in one SQLite file per month.
+
+    The hot Match table only has to hold the current day; anything that
+    finished is copied here, partitioned by kick-off month, so range
+    queries only open the months they cover and inserting a new season
+    never touches old files. Pages are keyset-paginated on
+    (match_time, fixture_id) and read lazily so a multi-year range never
+    sits in memory at once.
+    """
+
+    def __init__(self, directory='archive'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def partition_path(self, month):
+        return os.path.join(self.directory, f'matches-{month}.db')
+
+    def partitions(self, start=None, end=None):
+        """Month keys with a partition file, oldest first, within [start, end]"""
+        months = sorted(
+            name[len('matches-'):-len('.db')] for name in os.listdir(self.directory)
+            if name.startswith('matches-') and name.endswith('.db')
+        )
+        return [m for m in months if (not start or m >= start[:7]) and (not end or m <= end[:7])]
+
+    def connect(self, month):
+        conn = sqlite3.connect(self.partition_path(month), timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        # Partitions written before league names were qualified by country
+        if 'country' not in {row['name'] for row in conn.execute('PRAGMA table_info(archived_match)')}:
+            conn.execute('ALTER TABLE archived_match ADD COLUMN country TEXT')
+        return conn
+
+    def archive(self, rows):
+        """Upsert finished fixture rows into their month partitions"""
+        by_month = {}
+        for row in rows:
+            if row['status'] not in FINISHED_STATUSES or not row.get('match_time'):
+                continue
+            values = {column: _iso(row.get(column)) for column in ARCHIVE_COLUMNS}
+            by_month.setdefault(_month_key(values['match_time']), []).append(values)
+
+        placeholders = ', '.join(f':{column}' for column in ARCHIVE_COLUMNS)
+        updates = ', '.join(f'{column} = excluded.{column}' for column in ARCHIVE_COLUMNS[1:])
+        for month, values in by_month.items():
+            conn = self.connect(month)
+            try:
+                with conn:
+                    conn.executemany(
+                        f'INSERT INTO archived_match ({", ".join(ARCHIVE_COLUMNS)}) VALUES ({placeholders}) '
+                        f'ON CONFLICT(fixture_id) DO UPDATE SET {updates}',
+                        values
+                    )
+            finally:
+                conn.close()
+
+        return sum(len(values) for values in by_month.values())
+
+    def partition_stamps(self):
+        """{month: (mtime, size)} - changes whenever that partition is written"""
+        stamps = {}
+        for month in self.partitions():
+            stamp = []
+            for suffix in ('', '-wal'):
+                path = self.partition_path(month) + suffix
+                if os.path.exists(path):
+                    info = os.stat(path)
+                    stamp.append((info.st_mtime_ns, info.st_size))
+            stamps[month] = tuple(stamp)
+        return stamps
+
+    def read_columns(self, columns, where=None, months=None):
+        """Yield raw tuples of `columns` for archived matches, oldest first"""
+        sql = f'SELECT {", ".join(columns)} FROM archived_match'
+        if where:
+            sql += f' WHERE {where}'
+        sql += ' ORDER BY match_time, fixture_id'
+        for month in months if months is not None else self.partitions():
+            conn = self.connect(month)
+            conn.row_factory = None
+            try:
+                yield from conn.execute(sql)
+            finally:
+                conn.close()
+
+    def iter_matches(self, start=None, end=None, league=None, after=None, limit=None, country=None):
+        """Yield match dicts in (match_time, fixture_id) order, one partition at a time"""
+        remaining = limit
+        # Months before the cursor were already served
+        lowest = max(filter(None, (start, after[0] if after else None)), default=None)
+        for month in self.partitions(lowest, end):
+            if remaining is not None and remaining <= 0:
+                return
+
+            clauses, params = [], []
+            if start:
+                clauses.append('match_time >= ?')
+                params.append(start)
+            if end:
+                clauses.append('match_time < ?')
+                params.append(end)
+            if league:
+                clauses.append('league = ?')
+                params.append(league)
+            if country:
+                clauses.append('country = ?')
+                params.append(country)
+            if after:
+                clauses.append('(match_time, fixture_id) > (?, ?)')
+                params.extend(after)
+
+            sql = 'SELECT * FROM archived_match'
+            if clauses:
+                sql += ' WHERE ' + ' AND '.join(clauses)
+            sql += ' ORDER BY match_time, fixture_id'
+            if remaining is not None:
+                sql += f' LIMIT {int(remaining)}'
+
+            conn = self.connect(month)
+            try:
+                for row in conn.execute(sql, params):
+                    if remaining is not None:
+                        remaining -= 1
+                    yield self.to_dict(row)
+            finally:
+                conn.close()
+
+    @staticmethod
+    def to_dict(row):
+        """Same shape as Match.to_dict()"""
+        return {
+            'id': row['fixture_id'],
+            'home_team': row['home_team'],
+            'away_team': row['away_team'],
+            'home_logo': row['home_logo'],
+            'away_logo': row['away_logo'],
+            'home_score': row['home_score'],
+            'away_score': row['away_score'],
+            'status': row['status'],
+            'elapsed': None,
+            'time': row['match_time'],
+            'league': row['league'],
+            'country': row['country'],
+            'league_logo': row['league_logo'],
+            'venue': row['venue'],
+            'is_live': False
+        }
@@ -0,0 +1,97 @@
+"""Event ingestion per poll and ?after= tail reads, against re-reading the whole history.
+
+Loads a history of finished fixtures' events, then plays a match day of
+live fixtures whose upstream event lists grow between polls - now and then
+with a late-reported card in mid-list or an event withdrawn: every poll
+hands ingest_events() the full lists, as /fixtures payloads carry them,
+unchanged lists are skipped on their digest and only new events are
+inserted.
+Afterwards compares an ?after= tail with reading a fixture's events in full.
+Run from the repo root:  python -m benchmarks.bench_events [live fixtures] [history fixtures]
+"""
+import random
+import sys
+import time
+
+from benchmarks.common import make_app
+from match_events import events_after, ingest_events
+from models import db, MatchEvent
+
+POLLS = 30
+KINDS = (('Goal', 'Normal Goal'), ('Card', 'Yellow Card'), ('subst', 'Substitution 1'), ('Goal', 'Penalty'))
+
+
+def event(rng, fixture_id, minute):
+    kind, detail = rng.choice(KINDS)
+    team = fixture_id % 500
+    return {
+        'time': {'elapsed': minute, 'extra': None},
+        'team': {'id': team, 'name': f'Team {team}'},
+        'player': {'id': team * 100 + rng.randint(1, 11), 'name': 'Player'},
+        'assist': {'id': team * 100 + rng.randint(12, 16), 'name': 'Sub'} if kind == 'subst' else {'id': None, 'name': None},
+        'type': kind,
+        'detail': detail,
+        'comments': None
+    }
+
+
+def seed_history(rng, fixtures, per_fixture=15):
+    rows = []
+    for fixture_id in range(1, fixtures + 1):
+        for seq in range(1, per_fixture + 1):
+            rows.append({'fixture_id': fixture_id, 'seq': seq, 'elapsed': seq * 6, 'type': 'Card',
+                         'detail': 'Yellow Card', 'player_id': rng.randint(1, 50000), 'player_name': 'Player'})
+        if len(rows) >= 50000:
+            db.session.execute(MatchEvent.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(MatchEvent.__table__.insert(), rows)
+    db.session.commit()
+
+
+def main(live=300, history=20000):
+    rng = random.Random(1)
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        seed_history(rng, history)
+        stored = db.session.query(MatchEvent).count()
+        print(f"{stored} events of {history} finished fixtures stored, {live} fixtures live for {POLLS} polls")
+
+        feeds = {100000 + i: [] for i in range(live)}
+        payload_events = inserted = 0
+        seconds = []
+        for poll in range(POLLS):
+            minute = 3 * (poll + 1)
+            for fixture_id, events in feeds.items():
+                if rng.random() < 0.5:
+                    events.append(event(rng, fixture_id, minute))
+                if events and rng.random() < 0.02:
+                    events.insert(rng.randrange(len(events)), event(rng, fixture_id, minute - 1))
+                if events and rng.random() < 0.01:
+                    del events[rng.randrange(len(events))]
+            details = {fixture_id: {'events': list(events)} for fixture_id, events in feeds.items()}
+            payload_events += sum(len(events) for events in feeds.values())
+
+            start = time.perf_counter()
+            inserted += ingest_events({fixture_id: '1H' for fixture_id in feeds}, details)
+            db.session.commit()
+            seconds.append(time.perf_counter() - start)
+
+        current = sum(len(events) for events in feeds.values())
+        print(f"ingest: {payload_events} events in payloads, {inserted} inserted, "
+              f"{inserted - current} withdrawn again; "
+              f"{sum(seconds) / POLLS * 1000:.1f} ms per poll (max {max(seconds) * 1000:.1f} ms)")
+
+        fixture_ids = list(feeds)
+        tails = {fixture_id: max(len(feeds[fixture_id]) - 2, 0) for fixture_id in fixture_ids}
+        for name, read in (('?after= tail (last 2)', lambda f: events_after(f, tails[f])),
+                           ('whole fixture', lambda f: events_after(f, 0))):
+            start = time.perf_counter()
+            count = sum(len(read(fixture_id)) for fixture_id in fixture_ids)
+            per_read = (time.perf_counter() - start) / len(fixture_ids)
+            print(f"{name:<22} {per_read * 1e6:>8.0f} us per read, {count / len(fixture_ids):.1f} events")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300, int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
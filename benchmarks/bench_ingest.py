@@ -0,0 +1,56 @@
+"""Ingest synthetic fixtures the old way and through sync.py.
+
+Run from the repo root:  python -m benchmarks.bench_ingest [fixtures]
+"""
+import sys
+import time
+
+from benchmarks.common import QueryCounter, make_app, synthetic_fixtures
+from models import db, Match
+from dimensions import intern_dimensions
+from sync import INSERT_COLUMNS, parse_fixture, sync_matches
+
+
+def legacy_ingest(fixtures):
+    """The pre-sync refresh: wipe, then one SELECT + add per fixture"""
+    db.session.query(Match).delete()
+    for match_data in fixtures:
+        if Match.query.filter_by(fixture_id=match_data['fixture']['id']).first():
+            continue
+        row = intern_dimensions([parse_fixture(match_data)])[0]
+        db.session.add(Match(**{column: row[column] for column in INSERT_COLUMNS}))
+    db.session.commit()
+
+
+def batched_ingest(fixtures):
+    sync_matches([parse_fixture(match_data) for match_data in fixtures])
+    db.session.commit()
+
+
+def run(name, ingest, fixtures, counter):
+    counter.count = 0
+    start = time.perf_counter()
+    ingest(fixtures)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {counter.count:>7} queries {elapsed * 1000:>10.1f} ms")
+
+
+def main(count=2000):
+    fixtures = synthetic_fixtures(count)
+    # Second pass: a quarter of the fixtures got a goal
+    updated = synthetic_fixtures(count)
+    for match_data in updated[::4]:
+        match_data['goals']['home'] = 2
+
+    for name, ingest in (('before (per-row)', legacy_ingest), ('after (batched sync)', batched_ingest)):
+        app = make_app()
+        with app.app_context():
+            db.create_all()
+            counter = QueryCounter(db.engine)
+            run(f'{name} cold', ingest, fixtures, counter)
+            run(f'{name} warm', ingest, updated, counter)
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
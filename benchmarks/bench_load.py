@@ -0,0 +1,321 @@
+"""Scripted load scenarios against the app and a local upstream stub.
+
+The app runs in this process on a threaded WSGI server, pointed at
+benchmarks.upstream_stub, with a scratch database. Load comes from
+separate client processes. Every scenario reports, per app endpoint:
+latency percentiles, throughput, 304s/errors, database queries per
+request, and the upstream calls made while it ran.
+
+Scenarios:
+  matchday    5k clients polling the live/today lists every 30 s with
+              ETags, while scores change and the app refreshes every 5 s
+  storm       hundreds of clients hammering /api/refresh-cache at once
+              against a slow upstream
+  lineups     a burst of lineup requests for fixtures nobody asked for yet
+
+Run from the repo root:
+    python -m benchmarks.bench_load [matchday storm lineups] [--seconds 20] [--latency 0.1]
+    python -m benchmarks.bench_load --json out.json               # save results
+    python -m benchmarks.bench_load --baseline out.json           # exit 1 on regressions
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+from flask import has_request_context, request
+from sqlalchemy import event
+from werkzeug.serving import make_server
+
+from benchmarks.upstream_stub import UpstreamStub, synthetic_recording
+from config import Config
+
+
+class AppProbe:
+    """Counts SQL statements per Flask endpoint ('background' outside requests)"""
+
+    def __init__(self, engine):
+        self.queries = Counter()
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        endpoint = request.endpoint if has_request_context() else None
+        self.queries[(endpoint or 'background').rpartition('.')[2]] += 1
+
+
+def client_process(base_url, mix, clients, rate, seconds, threads, results):
+    """Paced load from one process: `rate` req/s over `threads` keep-alive sessions.
+
+    Each request is made on behalf of one of `clients` simulated clients,
+    which sends back the ETag it last got for that URL.
+    """
+    names, urls, weights = zip(*mix)
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(offset):
+        session = requests.Session()
+        etags = {}
+        rng = random.Random(offset)
+        interval = threads / rate if rate else 0
+        next_at = time.perf_counter() + offset * interval / threads
+        local = []
+        while True:
+            if interval:
+                next_at += interval
+                pause = next_at - time.perf_counter()
+                if pause > 0:
+                    time.sleep(pause)
+            if time.perf_counter() >= deadline:
+                break
+            i = rng.choices(range(len(urls)), weights)[0]
+            url = urls[i].format(fixture=100000 + rng.randrange(50))  # the stub's first 50 fixtures
+            key = (rng.randrange(clients), url)
+            headers = {'If-None-Match': etags[key]} if key in etags else {}
+            start = time.perf_counter()
+            try:
+                response = session.get(base_url + url, headers=headers, timeout=30)
+                status = response.status_code
+                if response.headers.get('ETag'):
+                    etags[key] = response.headers['ETag']
+            except requests.RequestException:
+                status = 0
+            local.append((names[i], time.perf_counter() - start, status))
+        with lock:
+            samples.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(samples)
+
+
+def run_load(base_url, mix, clients, rate, seconds, threads, processes):
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(
+            target=client_process,
+            args=(base_url, mix, max(1, clients // processes), rate / processes if rate else 0,
+                  seconds, threads, results)
+        )
+        for _ in range(processes)
+    ]
+    for proc in procs:
+        proc.start()
+    samples = sum((results.get() for _ in procs), [])
+    for proc in procs:
+        proc.join()
+    return samples
+
+
+def summarize(samples, seconds, queries):
+    by_endpoint = defaultdict(list)
+    for name, latency, status in samples:
+        by_endpoint[name].append((latency, status))
+
+    summary = {}
+    for name, rows in sorted(by_endpoint.items()):
+        latencies = sorted(latency for latency, _ in rows)
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2)
+
+        summary[name] = {
+            'requests': len(rows),
+            'rps': round(len(rows) / seconds, 1),
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'p99_ms': pct(0.99),
+            'not_modified': sum(1 for _, status in rows if status == 304),
+            'errors': sum(1 for _, status in rows if status == 0 or status >= 400),
+            'db_queries_per_request': round(queries.get(name, 0) / len(rows), 2)
+        }
+    return summary
+
+
+def print_summary(title, summary, upstream, background_queries):
+    print(f"\n== {title}")
+    print(f"{'endpoint':<22} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'304s':>6} {'errors':>6} {'db q/req':>8}")
+    for name, row in summary.items():
+        print(f"{name:<22} {row['requests']:>8} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['not_modified']:>6} {row['errors']:>6} {row['db_queries_per_request']:>8}")
+    print(f"upstream calls: {dict(upstream) or 'none'}   background db queries: {background_queries}")
+
+
+SCENARIOS = {
+    'matchday': {
+        'title': 'match-day peak: {clients} clients polling every 30s',
+        'clients': 5000,
+        'poll_interval': 30,
+        'mix': [
+            ('get_live_matches', '/api/live-matches?limit=50', 7),
+            ('get_today_matches', '/api/today-matches?limit=50', 2),
+            ('get_today_matches', '/api/today-matches?limit=50&league=League 3', 1)
+        ],
+        'refresh_every': 5
+    },
+    'storm': {
+        'title': 'refresh storm: {clients} clients hammering refresh',
+        'clients': 200,
+        'mix': [
+            ('refresh_cache', '/api/refresh-cache?wait=1', 3),
+            ('refresh_cache', '/api/refresh-cache', 1)
+        ]
+    },
+    'lineups': {
+        'title': 'lineup burst: {clients} clients opening 50 fixtures',
+        'clients': 300,
+        'mix': [('get_team_lineup', '/api/team-lineup/{fixture}', 1)]
+    }
+}
+
+
+def run_scenario(name, spec, base_url, stub, probe, args):
+    mix = spec['mix']
+    rate = spec['clients'] / spec['poll_interval'] if spec.get('poll_interval') else 0
+    threads = args.threads if rate else max(1, min(spec['clients'] // args.processes, 64))
+
+    stub.reset_counts()
+    probe.queries.clear()
+
+    stop = threading.Event()
+    driver = None
+    refreshes = []
+    if spec.get('refresh_every'):
+        def drive():
+            # Scores change upstream and the app picks them up, as the background refresher would
+            while not stop.wait(spec['refresh_every']):
+                stub.tick()
+                start = time.perf_counter()
+                status = requests.get(base_url + '/api/refresh-cache?wait=1', timeout=60).status_code
+                refreshes.append(('refresh_cache', time.perf_counter() - start, status))
+        driver = threading.Thread(target=drive, daemon=True)
+        driver.start()
+
+    samples = run_load(base_url, mix, spec['clients'], rate, args.seconds, threads, args.processes)
+    stop.set()
+    if driver:
+        driver.join()
+    samples += refreshes
+
+    queries = dict(probe.queries)
+    summary = summarize(samples, args.seconds, queries)
+    title = spec['title'].format(clients=spec['clients'])
+    if rate:
+        title += f' (target {rate:.0f} req/s)'
+    print_summary(title, summary, stub.call_counts(), queries.get('background', 0))
+    return {'seconds': args.seconds, 'endpoints': summary, 'upstream': stub.call_counts()}
+
+
+def compare(results, baseline, tolerance):
+    """Regressions against a saved run: slower p95, more queries or more upstream calls"""
+    problems = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if not base:
+            continue
+        for endpoint, row in result['endpoints'].items():
+            old = base['endpoints'].get(endpoint)
+            if not old:
+                continue
+            for metric in ('p95_ms', 'db_queries_per_request'):
+                if row[metric] > old[metric] * (1 + tolerance) + (1 if metric == 'p95_ms' else 0.01):
+                    problems.append(f'{scenario}/{endpoint} {metric}: {old[metric]} -> {row[metric]}')
+        # Per second, so runs of different lengths compare
+        old_rate = sum(base['upstream'].values()) / base['seconds']
+        new_rate = sum(result['upstream'].values()) / result['seconds']
+        if new_rate > old_rate * (1 + tolerance) + 0.1:
+            problems.append(f'{scenario} upstream calls/s: {old_rate:.2f} -> {new_rate:.2f}')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load scenarios against app.py with a stubbed upstream')
+    parser.add_argument('scenarios', nargs='*', help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--seconds', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.1, help='upstream latency in seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--fixtures', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument('--threads', type=int, default=16, help='connections per client process')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare with a --json file and exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp()
+    stub = UpstreamStub(synthetic_recording(args.fixtures), latency=args.latency, jitter=args.latency / 2,
+                        failure_rate=args.failure_rate).start()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'football_stats.db')}"
+        API_FOOTBALL_URL = stub.url
+        API_FOOTBALL_KEY = 'bench'
+        QUOTA_BACKEND = 'sqlite'
+        QUOTA_SQLITE_PATH = os.path.join(workdir, 'quota.db')
+        API_CALLS_PER_DAY = 10 ** 9
+        API_CALLS_PER_MINUTE = 10 ** 9
+        ARCHIVE_DIR = os.path.join(workdir, 'archive')
+        UPSTREAM_CACHE_PATH = os.path.join(workdir, 'upstream_cache.db')
+        UPSTREAM_FRESH_FOR = 0  # every refresh really calls the stub
+        LOGO_DIR = ''  # the synthetic logo URLs do not resolve
+        REFRESH_MIN_INTERVAL = 2
+        REFRESH_LOCK_PATH = None
+        SNAPSHOT_PATH = None
+
+    import app as football
+    from models import db
+
+    app = football.create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        probe = AppProbe(db.engine)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    # Load the match day once before measuring
+    requests.get(base_url + '/api/refresh-cache?wait=1', timeout=60)
+
+    results = {}
+    try:
+        for name in args.scenarios or SCENARIOS:
+            results[name] = run_scenario(name, SCENARIOS[name], base_url, stub, probe, args)
+    finally:
+        server.shutdown()
+        stub.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f'REGRESSION {problem}')
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""EXPLAIN QUERY PLAN regression check for the hot Match queries.
+
+Loads 100k matches and fails (exit code 1) if any of the queries behind
+/api/live-matches, /api/today-matches or /api/cache-status stops using
+an index or needs a temp b-tree to sort.
+
+Run from the repo root:  python -m benchmarks.bench_query_plans [rows]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from benchmarks.common import make_app
+from models import db, League, Match, Team
+
+HOT_QUERIES = {
+    'live-matches': lambda: Match.live(),
+    'today-matches': lambda: Match.current(),
+    'cache-status live count': lambda: Match.live().order_by(None).with_entities(db.func.count()),
+    'cache-status today count': lambda: Match.current().order_by(None).with_entities(db.func.count()),
+}
+
+
+def load_matches(count):
+    now = datetime(2025, 7, 2, 12, 0)
+    db.session.execute(Team.__table__.insert(), [{'id': i + 1, 'name': f'Team {i}'} for i in range(500)])
+    db.session.execute(League.__table__.insert(), [{'id': i + 1, 'name': f'League {i}'} for i in range(30)])
+    rows = []
+    for i in range(count):
+        # Mostly expired history, a few hundred current, a handful live
+        current = i % 100 == 0
+        rows.append({
+            'fixture_id': i + 1, 'home_team_id': i % 500 + 1, 'away_team_id': (i + 7) % 500 + 1,
+            'status': '1H' if current and i % 300 == 0 else 'FT', 'match_time': now - timedelta(minutes=i),
+            'league_id': i % 30 + 1, 'is_live': current and i % 300 == 0,
+            'expired_at': None if current else now, 'created_at': now, 'updated_at': now - timedelta(seconds=i)
+        })
+    db.session.execute(Match.__table__.insert(), rows)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+
+def explain(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    plan = [row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+    return sql, plan
+
+
+def main(count=100000):
+    app = make_app()
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        load_matches(count)
+
+        for name, build in HOT_QUERIES.items():
+            sql, plan = explain(build())
+            start = time.perf_counter()
+            build().all()
+            elapsed = (time.perf_counter() - start) * 1000
+
+            uses_index = any('USING INDEX' in step or 'USING COVERING INDEX' in step for step in plan)
+            full_scan = any(step.startswith('SCAN') and 'INDEX' not in step for step in plan)
+            temp_sort = any('TEMP B-TREE' in step for step in plan)
+            ok = uses_index and not full_scan and not temp_sort
+            failures += not ok
+
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<26} {elapsed:>8.2f} ms  {' | '.join(plan)}")
+
+    if failures:
+        print(f'{failures} hot queries lost their index')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
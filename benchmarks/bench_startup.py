@@ -0,0 +1,133 @@
+"""Worker cold start: import to first response, per worker and with PRELOAD_APP.
+
+Migrates a scratch database once (`flask db upgrade`, the only schema
+step) and fills it with synthetic fixtures, then times how long a new
+gunicorn worker takes from nothing to its first /api/today-matches:
+  cold       a fresh interpreter imports wsgi.py and serves - every worker
+             without PRELOAD_APP
+  preloaded  a master that imported wsgi.py with PRELOAD_APP=1 forks, and
+             the child runs app.init_worker() and serves - gunicorn's
+             post_worker_init with preload_app
+The background refresher is not started. Exits 1 if a preloaded worker
+misses the TARGET_MS budget.
+
+Run from the repo root:  python -m benchmarks.bench_startup [runs]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TARGET_MS = 200
+PATH = '/api/today-matches'
+
+
+def seed(uri, env, count):
+    """The one-time setup a deployment runs: migrations, then data"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'db', 'upgrade'], env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    migrated = time.perf_counter() - start
+
+    from benchmarks.common import make_app, synthetic_fixtures
+    from models import db
+    from sync import parse_fixture, sync_matches
+    app = make_app(uri)
+    with app.app_context():
+        sync_matches([parse_fixture(match_data) for match_data in synthetic_fixtures(count)])
+        db.session.commit()
+    return migrated
+
+
+def cold_worker():
+    """Child process: import the app from scratch and serve one request"""
+    start = time.perf_counter()
+    import wsgi
+    imported = time.perf_counter()
+    response = wsgi.app.test_client().get(PATH)
+    done = time.perf_counter()
+    print(json.dumps({'import': imported - start, 'first': done - imported, 'total': done - start,
+                      'status': response.status_code}))
+
+
+def preloaded_workers(runs):
+    """Child process: import the app once, then fork `runs` workers from it one after another"""
+    import app as application
+    import wsgi
+    for _ in range(runs):
+        read, write = os.pipe()
+        start = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            application.init_worker(wsgi.app)
+            ready = time.perf_counter()
+            response = wsgi.app.test_client().get(PATH)
+            done = time.perf_counter()
+            os.write(write, json.dumps({'init': ready - start, 'first': done - ready, 'total': done - start,
+                                        'status': response.status_code}).encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read) as f:
+            print(f.read(), flush=True)
+        os.waitpid(pid, 0)
+
+
+def report(name, results, columns):
+    for result in results:
+        if result['status'] != 200:
+            raise SystemExit(f"{name}: first response was {result['status']}")
+    cells = []
+    for column in columns:
+        values = sorted(result[column] * 1000 for result in results)
+        cells.append(f"{column:<6} {values[len(values) // 2]:>6.1f} ms")
+    worst = max(result['total'] for result in results) * 1000
+    verdict = 'ok' if worst <= TARGET_MS else f'over {TARGET_MS} ms'
+    print(f"{name:<10} {'   '.join(cells)}   worst {worst:>6.1f} ms  {verdict}")
+    return worst <= TARGET_MS
+
+
+def main(runs=5):
+    workdir = tempfile.mkdtemp()
+    uri = f"sqlite:///{os.path.join(workdir, 'football_stats.db')}"
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=uri,
+        SNAPSHOT_PATH=os.path.join(workdir, 'snapshot.pickle'),
+        REFRESH_LOCK_PATH=os.path.join(workdir, 'refresh.lock'),
+        QUOTA_SQLITE_PATH=os.path.join(workdir, 'quota.db'),
+        ARCHIVE_DIR=os.path.join(workdir, 'archive'),
+        UPSTREAM_CACHE_PATH=os.path.join(workdir, 'upstream_cache.db'),
+        LOGO_DIR=os.path.join(workdir, 'logos'),
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'),
+        API_CALLS_PER_DAY='1'
+    )
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+    try:
+        migrated = seed(uri, env, 1000)
+        print(f"one-time `flask db upgrade` {migrated * 1000:.0f} ms; median of {runs} workers, "
+              f"target {TARGET_MS} ms import-to-first-response")
+
+        command = [sys.executable, '-m', 'benchmarks.bench_startup', '--worker']
+        cold = [json.loads(subprocess.run(command + ['cold'], env=env, check=True, capture_output=True,
+                                          text=True).stdout) for _ in range(runs)]
+        report('cold', cold, ('import', 'first', 'total'))
+
+        output = subprocess.run(command + ['preloaded', str(runs)], env=dict(env, PRELOAD_APP='1'), check=True,
+                                capture_output=True, text=True).stdout
+        preloaded = [json.loads(line) for line in output.splitlines()]
+        if not report('preloaded', preloaded, ('init', 'first', 'total')):
+            raise SystemExit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--worker']:
+        cold_worker() if sys.argv[2] == 'cold' else preloaded_workers(int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,77 @@
+"""Stats engine over a synthetic archive of finished fixtures.
+
+Run from the repo root:  python -m benchmarks.bench_stats [fixtures]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from archive import MatchArchive
+from stats import StatsEngine
+
+
+def fill_archive(archive, count, teams=400, leagues=20, batch=50000):
+    rng = np.random.default_rng(7)
+    start = datetime(2015, 8, 1)
+    for offset in range(0, count, batch):
+        size = min(batch, count - offset)
+        league = rng.integers(0, leagues, size)
+        home = league * (teams // leagues) + rng.integers(0, teams // leagues, size)
+        away = league * (teams // leagues) + (home - league * (teams // leagues) + rng.integers(1, teams // leagues, size)) % (teams // leagues)
+        goals = rng.poisson(1.4, (size, 2))
+        archive.archive([
+            {
+                'fixture_id': offset + i,
+                'match_time': start + timedelta(minutes=15 * (offset + i)),
+                'league': f'League {league[i]}',
+                'country': 'X',
+                'home_team': f'Team {home[i]}',
+                'away_team': f'Team {away[i]}',
+                'home_score': int(goals[i, 0]),
+                'away_score': int(goals[i, 1]),
+                'status': 'FT'
+            }
+            for i in range(size)
+        ])
+
+
+def timed(label, fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:<34} {best * 1000:>9.1f} ms')
+    return result
+
+
+def main(count=500000):
+    with tempfile.TemporaryDirectory() as directory:
+        archive = MatchArchive(directory)
+        start = time.perf_counter()
+        fill_archive(archive, count)
+        print(f'{"fill archive (setup)":<34} {(time.perf_counter() - start) * 1000:>9.1f} ms  {count} fixtures')
+
+        engine = StatsEngine(archive)
+        timed('load columnar frame (first ever)', engine.frame, repeat=1)
+        # What a restarted worker pays - every month's columns were saved by the first load
+        engine = StatsEngine(archive)
+        frame = timed('load columnar frame (cold)', engine.frame, repeat=1)
+        timed('frame lookup (warm)', engine.frame)
+
+        # A refresh archiving one more result only re-reads that month
+        fill_archive(archive, 1, batch=1)
+        frame = timed('reload after one new result', engine.frame, repeat=1)
+
+        table = timed('league table', lambda: frame.league_table('League 3', 'X'))
+        timed('all league tables', lambda: [frame.league_table(f'League {i}', 'X') for i in range(20)])
+        timed('team stats + form(5)', lambda: frame.team_stats('Team 61', form=5))
+        timed('team stats + head-to-head', lambda: frame.team_stats('Team 61', form=5, opponent='Team 62'))
+        print(f"top of League 3: {table[0]['team']} {table[0]['points']} pts from {table[0]['played']} games")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,84 @@
+"""Peak memory of fetching a large fixtures payload, whole-body vs streamed.
+
+Records a synthetic day of fixtures to a JSON file (or uses the file given),
+serves it over local HTTP and fetches it through UpstreamClient.
+Run from the repo root:  python -m benchmarks.bench_stream [fixtures|recorded.json] [limit]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.common import synthetic_fixtures
+from sync import parse_fixture
+from upstream import UpstreamClient
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # the streamed fetch hangs up early on purpose
+
+
+def record(count, path):
+    with open(path, 'w') as f:
+        json.dump({'get': 'fixtures', 'results': count, 'response': synthetic_fixtures(count)}, f)
+
+
+def whole_body(client, limit):
+    """The pre-streaming fetch: parse everything, then slice"""
+    return [parse_fixture(match_data) for match_data in client.get('/fixtures.json')['response'][:limit]]
+
+
+def streamed(client, limit):
+    return [parse_fixture(match_data) for match_data in client.iter_items('/fixtures.json', limit=limit)]
+
+
+def run(name, fetch, client, limit):
+    start = time.perf_counter()
+    rows = fetch(client, limit)
+    elapsed = time.perf_counter() - start
+    # Timed and measured separately - tracing allocations slows the parser down a lot
+    tracemalloc.start()
+    fetch(client, limit)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<26} {len(rows):>6} rows {elapsed * 1000:>9.1f} ms {peak / 1024 / 1024:>9.2f} MB peak")
+
+
+def main(source='20000', limit=None):
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, 'fixtures.json')
+    if source.isdigit():
+        record(int(source), path)
+    else:
+        with open(source, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read())
+    print(f"payload {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+    server = QuietServer(('127.0.0.1', 0), partial(QuietHandler, directory=workdir))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = UpstreamClient(f'http://127.0.0.1:{server.server_port}', {})
+
+    try:
+        for cap in (25, limit):
+            run(f'whole body, limit {cap}', whole_body, client, cap)
+            run(f'streamed, limit {cap}', streamed, client, cap)
+    finally:
+        client.close()
+        server.shutdown()
+        os.remove(path)
+        os.rmdir(workdir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else '20000', int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,74 @@
+"""Bytes and serialize time of a match list per wire format, against the old to_dict() path.
+
+Loads synthetic fixtures into an in-memory database and encodes the whole
+today list each way, then a ?since= delta after a few fixtures changed.
+Figures are scaled to 1,000 fixtures.
+Run from the repo root:  python -m benchmarks.bench_wire [fixtures] [repeats]
+"""
+import gzip
+import json
+import sys
+import time
+
+from benchmarks.common import make_app, synthetic_fixtures
+from models import db, Match
+from snapshot import MatchSnapshot
+from sync import parse_fixture, sync_matches
+from wire import encode, msgpack
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def legacy_body():
+    """The pre-snapshot list: query, to_dict() every match, dump JSON"""
+    matches = [match.to_dict() for match in Match.current()]
+    return json.dumps({'matches': matches, 'success': True, 'from_cache': True, 'count': len(matches)}).encode()
+
+
+def timed(build, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        body = build()
+    return body, (time.perf_counter() - start) / repeats
+
+
+def report(name, body, seconds, scale):
+    sizes = [len(body), len(gzip.compress(body, compresslevel=6))]
+    if brotli is not None:
+        sizes.append(len(brotli.compress(body, quality=5)))
+    columns = ''.join(f'{size * scale / 1024:>10.1f}' for size in sizes)
+    print(f"{name:<24}{columns} KB {seconds * scale * 1000:>9.2f} ms")
+
+
+def main(count=1000, repeats=20):
+    formats = ['json', 'columnar'] + (['msgpack'] if msgpack is not None else [])
+    scale = 1000 / count
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        sync_matches([parse_fixture(match_data) for match_data in synthetic_fixtures(count)])
+        db.session.commit()
+
+        args = {'fields': None, 'cursor': None, 'limit': count, 'league': None, 'country': None, 'status': None,
+                'since': None}
+        snapshot = MatchSnapshot.load(1)
+
+        print(f"per 1,000 fixtures{'raw':>16}{'gzip':>10}{'br' if brotli else '':>10}    serialize")
+        report('to_dict() json', *timed(legacy_body, repeats), scale)
+        for fmt in formats:
+            report(fmt, *timed(lambda: encode(snapshot.page('today', args), fmt), repeats), scale)
+
+        # A refresh where one fixture in fifty scored
+        changes = [{'id': 100000 + i, 'home_score': 2} for i in range(0, count, 50)]
+        latest = MatchSnapshot.load(2, snapshot, changes)
+        delta_args = dict(args, since=1)
+        for fmt in formats:
+            report(f'{fmt} ?since= delta', *timed(lambda: encode(latest.delta('today', delta_args), fmt), repeats),
+                   scale)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
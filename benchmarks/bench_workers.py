@@ -0,0 +1,132 @@
+"""Throughput of the match list endpoints under gunicorn with 1, 2, 4... workers.
+
+Seeds a scratch database with synthetic fixtures, starts gunicorn with
+gunicorn.conf.py and ProductionConfig for each worker count and hammers
+/api/today-matches and /api/live-matches from several client processes.
+Upstream refreshes are disabled (a daily quota smaller than one refresh),
+so only the read path is measured. Throughput can only scale up to the
+number of CPU cores.
+
+Run from the repo root:  python -m benchmarks.bench_workers [workers,...] [seconds]
+"""
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.common import make_app, synthetic_fixtures
+from models import db
+from sync import parse_fixture, sync_matches
+
+PATHS = (
+    '/api/today-matches?limit=50',
+    '/api/today-matches?limit=50&league=League 3',
+    '/api/live-matches?limit=50',
+    '/api/today-matches?limit=20&fields=id,home_team,away_team,home_score,away_score,status',
+)
+
+
+def seed(uri, count):
+    app = make_app(uri)
+    with app.app_context():
+        db.create_all()
+        sync_matches([parse_fixture(match_data, is_live=match_data['fixture']['status']['short'] == '1H')
+                      for match_data in synthetic_fixtures(count)])
+        db.session.commit()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def client(base_url, seconds, connections, results):
+    """One client process: `connections` keep-alive sessions taking turns, as fast as they can"""
+    sessions = [requests.Session() for _ in range(connections)]
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        sessions[i % connections].get(base_url + PATHS[i % len(PATHS)], timeout=10).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    results.put(latencies)
+
+
+def run(workers, seconds, env, clients):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--workers', str(workers),
+         '--bind', f'127.0.0.1:{port}', 'wsgi:app'],
+        env=dict(env, WEB_CONCURRENCY=str(workers)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        for _ in range(100):
+            try:
+                requests.get(base_url + PATHS[0], timeout=5)
+                break
+            except requests.RequestException:
+                time.sleep(0.1)
+        # Warm every worker's snapshot and response cache
+        for _ in range(workers * 20):
+            for path in PATHS:
+                requests.get(base_url + path, timeout=5)
+
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=client, args=(base_url, seconds, 4, results)) for _ in range(clients)]
+        for proc in procs:
+            proc.start()
+        latencies = sorted(sum((results.get() for _ in procs), []))
+        for proc in procs:
+            proc.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print(f"{workers:>3} workers {len(latencies) / seconds:>9.1f} req/s   "
+          f"p50 {pct(0.50):>6.1f} ms  p95 {pct(0.95):>6.1f} ms  p99 {pct(0.99):>6.1f} ms")
+
+
+def main(worker_counts=(1, 2, 4), seconds=10):
+    workdir = tempfile.mkdtemp()
+    uri = f"sqlite:///{os.path.join(workdir, 'football_stats.db')}"
+    seed(uri, 2000)
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=uri,
+        SNAPSHOT_PATH=os.path.join(workdir, 'snapshot.pickle'),
+        REFRESH_LOCK_PATH=os.path.join(workdir, 'refresh.lock'),
+        QUOTA_SQLITE_PATH=os.path.join(workdir, 'quota.db'),
+        ARCHIVE_DIR=os.path.join(workdir, 'archive'),
+        UPSTREAM_CACHE_PATH=os.path.join(workdir, 'upstream_cache.db'),
+        LOGO_DIR=os.path.join(workdir, 'logos'),
+        API_CALLS_PER_DAY='1'
+    )
+    print(f"{os.cpu_count()} CPUs, {seconds}s per run")
+    try:
+        for workers in worker_counts:
+            run(workers, seconds, env, clients=max(2, os.cpu_count() or 1))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main(
+        tuple(int(n) for n in sys.argv[1].split(',')) if len(sys.argv) > 1 else (1, 2, 4),
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    )
@@ -0,0 +1,85 @@
+"""LineupCache regression check: stored lineups must never cost or lose an upstream call.
+
+Covers a lineup whose Match row was pruned (it must be served from storage
+as final, without a fetch), an empty upstream answer for a fixture that
+already has a stored lineup (the stored rows must survive it) and a
+fixture we have never seen (no fetch at all). Exits 1 if any check fails.
+
+Run from the repo root:  python -m benchmarks.check_lineups
+"""
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_app
+from lineups import LineupCache
+from models import db, Match, Team
+
+LINEUP = [{
+    'team_id': 1, 'team_name': 'Team 1', 'team_logo': None, 'formation': '4-4-2', 'coach': 'Coach',
+    'players': [{'id': i, 'name': f'Player {i}', 'number': i, 'position': 'M', 'grid': f'1:{i}'} for i in range(1, 12)]
+}]
+
+
+class CountingFetch:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, fixture_id):
+        self.calls += 1
+        return self.result
+
+
+def stored_lineup(fixture_id, age):
+    cache = LineupCache(CountingFetch(LINEUP))
+    cache.store(fixture_id, LINEUP)
+    db.session.execute(db.text('UPDATE lineup SET fetched_at = :at WHERE fixture_id = :id'),
+                       {'at': datetime.utcnow() - age, 'id': fixture_id})
+    db.session.commit()
+
+
+def pruned_match():
+    stored_lineup(42, timedelta(days=3))
+    fetch = CountingFetch([])
+    lineups, source = LineupCache(fetch).get(42)
+    return fetch.calls == 0 and source == 'database' and len(lineups) == 1, f'{source}, {fetch.calls} upstream calls'
+
+
+def empty_answer():
+    now = datetime.utcnow()
+    db.session.execute(Team.__table__.insert(), [{'id': 1, 'name': 'Team 1'}, {'id': 2, 'name': 'Team 2'}])
+    db.session.execute(Match.__table__.insert(), [{
+        'fixture_id': 43, 'home_team_id': 1, 'away_team_id': 2, 'status': 'NS',
+        'match_time': now + timedelta(hours=1), 'updated_at': now
+    }])
+    db.session.commit()
+    stored_lineup(43, timedelta(hours=1))
+    fetch = CountingFetch([])
+    lineups, source = LineupCache(fetch).get(43)
+    # A fresh cache, so the second read has to come from the tables
+    kept, _ = LineupCache(CountingFetch([])).get(43)
+    return len(lineups) == 1 and len(kept) == 1, f'{source}, {len(kept)} lineups kept'
+
+
+def unknown_fixture():
+    fetch = CountingFetch(LINEUP)
+    lineups, source = LineupCache(fetch).get(44)
+    return fetch.calls == 0 and source == 'unknown' and not lineups, f'{source}, {fetch.calls} upstream calls'
+
+
+def main():
+    app = make_app()
+    failed = False
+    with app.app_context():
+        db.create_all()
+        for name, check in (('pruned Match row', pruned_match), ('empty upstream answer', empty_answer),
+                            ('unknown fixture', unknown_fixture)):
+            ok, detail = check()
+            failed |= not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<24} {detail}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
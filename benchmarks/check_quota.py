@@ -0,0 +1,97 @@
+"""Quota limit check for every QUOTA_BACKEND under concurrent callers.
+
+Threads keep calling APIUsageTracker.try_acquire() until they are refused,
+while another thread keeps reading the counters. Fails (exit code 1) if a
+backend grants more than a limit allows, ends up with a counter that does
+not match what it granted, or is ever seen above a limit mid-run.
+Redis runs against benchmarks/fake_redis.py unless a URL is given.
+
+Run from the repo root:  python -m benchmarks.check_quota [threads] [redis://...]
+"""
+import os
+import sys
+import tempfile
+import threading
+
+from benchmarks.fake_redis import FakeRedis
+from quota import APIUsageTracker, MemoryQuotaStore, RedisQuotaStore, SQLiteQuotaStore
+
+CALLS = 3  # per try_acquire(), as a refresh asking for several lists does
+ROUND_TRIP = 0.0002  # seconds per fake Redis command, so other callers get in between
+
+# name -> (tracker limits, most calls they may grant)
+SCENARIOS = {
+    'daily limit': (dict(max_calls_per_day=100), 99),
+    'per-minute limit': (dict(max_calls_per_day=1000, max_calls_per_minute=40), 39),
+    'token bucket': (dict(max_calls_per_day=1000, bucket_rate=1e-9, bucket_capacity=30), 30),
+}
+
+
+def hammer(tracker, threads, keys):
+    granted, peaks = [], {key: 0 for key in keys}
+    done = threading.Event()
+
+    def caller():
+        mine = 0
+        while tracker.try_acquire(CALLS):
+            mine += CALLS
+        granted.append(mine)
+
+    def watcher():
+        while not done.is_set():
+            for key in keys:
+                peaks[key] = max(peaks[key], tracker.store.get(key))
+
+    watch = threading.Thread(target=watcher)
+    watch.start()
+    callers = [threading.Thread(target=caller) for _ in range(threads)]
+    for thread in callers:
+        thread.start()
+    for thread in callers:
+        thread.join()
+    done.set()
+    watch.join()
+    return sum(granted), peaks
+
+
+def check(name, make_store, threads):
+    failed = False
+    for scenario, (limits, most) in SCENARIOS.items():
+        tracker = APIUsageTracker(make_store(), **limits)
+        keys = [tracker.day_key()] + ([tracker.minute_key()] if limits.get('max_calls_per_minute') else [])
+        granted, peaks = hammer(tracker, threads, keys)
+        used = tracker.get_today_usage()
+        over = {key: peak for key, peak in peaks.items()
+                if peak > (limits['max_calls_per_minute'] if key.startswith('minute:') else limits['max_calls_per_day'])}
+        ok = granted == most and used == granted and not over
+        failed |= not ok
+        seen = ', '.join(f"{key.split(':')[0]} {peak}" for key, peak in peaks.items())
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<8} {scenario:<17} granted {granted:>4} of {most:>4}, "
+              f"counter {used:>4}, peak seen: {seen}")
+    return not failed
+
+
+def main(threads=16, redis_url=None):
+    workdir = tempfile.mkdtemp()
+    runs = iter(range(1000))
+
+    if redis_url:
+        import redis
+        client = redis.Redis.from_url(redis_url)
+        # Fresh keys per scenario, leaving anything else in the database alone
+        make_redis = lambda: RedisQuotaStore(client, prefix=f'check-quota:{os.getpid()}:{next(runs)}:')
+    else:
+        make_redis = lambda: RedisQuotaStore(FakeRedis(latency=ROUND_TRIP))
+
+    backends = {
+        'memory': MemoryQuotaStore,
+        'sqlite': lambda: SQLiteQuotaStore(os.path.join(workdir, f'quota-{next(runs)}.db')),
+        'redis': make_redis,
+    }
+    results = [check(name, make_store, threads) for name, make_store in backends.items()]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,52 @@
+"""Helpers shared by the benchmark scripts."""
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db
+
+
+def synthetic_fixtures(count, kickoff=None):
+    """API-Football shaped fixtures with a handful of teams and leagues"""
+    kickoff = kickoff or datetime(2025, 7, 2, 12, 0)
+    fixtures = []
+    for i in range(count):
+        live = i % 4 == 0
+        fixtures.append({
+            'fixture': {
+                'id': 100000 + i,
+                'date': (kickoff + timedelta(minutes=15 * (i % 40))).isoformat() + '+00:00',
+                'status': {'short': '1H' if live else 'NS', 'elapsed': 30 if live else None},
+                'venue': {'name': f'Stadium {i % 300}'}
+            },
+            'teams': {
+                'home': {'id': i % 500, 'name': f'Team {i % 500}', 'logo': f'https://media.example/teams/{i % 500}.png'},
+                'away': {'id': (i + 7) % 500, 'name': f'Team {(i + 7) % 500}', 'logo': f'https://media.example/teams/{(i + 7) % 500}.png'}
+            },
+            'goals': {'home': 1 if live else None, 'away': 0 if live else None},
+            'league': {'id': i % 30, 'name': f'League {i % 30}', 'country': 'Nowhere', 'logo': f'https://media.example/leagues/{i % 30}.png'}
+        })
+    return fixtures
+
+
+def make_app(uri='sqlite://'):
+    """A bare Flask app bound to `db`, without app.py's startup side effects"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+class QueryCounter:
+    """Counts statements sent to the database"""
+
+    def __init__(self, engine):
+        self.count = 0
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append((statement, parameters))
@@ -0,0 +1,98 @@
+"""In-process stand-in for the Redis client RedisQuotaStore talks to.
+
+Keeps plain keys, hashes and expiry times in dicts and runs
+RedisQuotaStore's Lua scripts as Python ports under one lock, the way
+Redis runs a script without interleaving other commands - so the Redis
+quota backend can be exercised without a server. Arguments are turned
+into strings on the way in, as the real client does, and each command
+may wait `latency` seconds first, standing in for the round trip that
+lets other clients' commands run in between.
+"""
+import threading
+import time
+
+from quota import RedisQuotaStore
+
+
+class FakeRedis:
+    def __init__(self, latency=0):
+        self.latency = latency
+        self._values = {}
+        self._hashes = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+        self._scripts = {
+            RedisQuotaStore.INCR_SCRIPT: self._incr_script,
+            RedisQuotaStore.TOKEN_BUCKET_SCRIPT: self._token_bucket_script,
+        }
+
+    def get(self, key):
+        self._round_trip()
+        with self._lock:
+            self._expire(key)
+            value = self._values.get(key)
+            return None if value is None else str(value).encode()
+
+    def incrby(self, key, amount=1):
+        self._round_trip()
+        with self._lock:
+            return self._incrby(key, int(amount))
+
+    def decrby(self, key, amount=1):
+        return self.incrby(key, -int(amount))
+
+    def expire(self, key, seconds):
+        self._round_trip()
+        with self._lock:
+            self._expire(key)
+            if key not in self._values and key not in self._hashes:
+                return False
+            self._expires[key] = time.monotonic() + int(seconds)
+            return True
+
+    def eval(self, script, numkeys, *keys_and_args):
+        self._round_trip()
+        keys, args = keys_and_args[:numkeys], [str(arg) for arg in keys_and_args[numkeys:]]
+        with self._lock:
+            for key in keys:
+                self._expire(key)
+            return self._scripts[script](keys, args)
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _incr_script(self, keys, args):
+        amount = int(args[0])
+        value = self._values.get(keys[0], 0) + amount
+        if args[1] != '' and amount > 0 and value > int(args[1]):
+            return None
+        self._incrby(keys[0], amount)
+        if args[2] != '' and keys[0] not in self._expires:
+            self._expires[keys[0]] = time.monotonic() + int(args[2])
+        return value
+
+    def _token_bucket_script(self, keys, args):
+        rate, capacity, now, amount = (float(arg) for arg in args)
+        bucket = self._hashes.setdefault(keys[0], {})
+        tokens = float(bucket.get('tokens', capacity))
+        updated = float(bucket.get('updated', now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = 0
+        if tokens >= amount:
+            tokens -= amount
+            allowed = 1
+        bucket.update(tokens=tokens, updated=now)
+        return allowed
+
+    def _incrby(self, key, amount):
+        self._expire(key)
+        self._values[key] = self._values.get(key, 0) + amount
+        return self._values[key]
+
+    def _expire(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._values.pop(key, None)
+            self._hashes.pop(key, None)
+            del self._expires[key]
@@ -0,0 +1,201 @@
+"""Simulated match day: upstream calls and data freshness, full-list refreshes vs the planner.
+
+Plays a day of fixtures - kick-offs, goals, half-time, full time - against
+both refresh strategies, paced the way BackgroundRefresher paces them for
+the given daily quota, and reports how long each change took to show up.
+Kick-offs come from a recorded /fixtures day (an API body or an
+upstream_stub recording) or a synthetic day; goals are drawn at random.
+Run from the repo root:  python -m benchmarks.sim_refresh [--quota 100 1000] [--fixtures 120] [--recording day.json]
+"""
+import argparse
+import json
+import math
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from config import Config
+from planner import FULL_REFRESH_CALLS, RefreshPlanner
+
+DAY = datetime(2025, 7, 2)
+MIDNIGHT = DAY + timedelta(days=1)
+
+
+def synthetic_kickoffs(count, rng):
+    """Kick-offs on the quarter hour between 12:00 and 21:45, busiest in the evening"""
+    slots = [DAY + timedelta(hours=12, minutes=15 * i) for i in range(40)]
+    return sorted(rng.choices(slots, weights=[1 + i // 8 for i in range(40)], k=count))
+
+
+def recorded_kickoffs(path):
+    with open(path) as f:
+        recording = json.load(f)
+    fixtures = recording['today']['response'] if 'today' in recording else recording['response']
+    # Replayed on the simulated day at the same wall-clock time
+    kickoffs = []
+    for match_data in fixtures:
+        kickoff = datetime.fromisoformat(match_data['fixture']['date'].replace('Z', '+00:00')).replace(tzinfo=None)
+        kickoffs.append(DAY + timedelta(hours=kickoff.hour, minutes=kickoff.minute))
+    return sorted(kickoffs)
+
+
+def timeline(kickoff, rng):
+    """[(time, status, home goals, away goals)] of one match, from before kick-off to full time"""
+    # Matches kick off a little after the scheduled time
+    kickoff += timedelta(seconds=rng.randint(0, 120))
+    events = [(DAY, 'NS', None, None), (kickoff, '1H', 0, 0)]
+    goals = sorted((rng.randint(1, 90), rng.choice('ha')) for _ in range(rng.choice((0, 1, 1, 2, 2, 3, 4))))
+    home = away = 0
+    for minute, side in goals:
+        home, away = home + (side == 'h'), away + (side == 'a')
+        # 45 minutes, 15 of half-time, and a couple of minutes of stoppage each half
+        offset = minute if minute <= 45 else minute + 17
+        events.append((kickoff + timedelta(minutes=offset, seconds=rng.randint(0, 59)), '1H' if minute <= 45 else '2H',
+                       home, away))
+    events += [(kickoff + timedelta(minutes=47), 'HT', None, None), (kickoff + timedelta(minutes=62), '2H', None, None),
+               (kickoff + timedelta(minutes=109), 'FT', None, None)]
+    events.sort(key=lambda event: event[0])
+
+    # Fill the scores in on the status changes
+    filled, home, away = [], None, None
+    for when, status, h, a in events:
+        if h is not None:
+            home, away = h, a
+        elif status != 'NS':
+            home, away = home or 0, away or 0
+        filled.append((when, status, home, away))
+    return filled
+
+
+class Day:
+    def __init__(self, kickoffs, rng):
+        self.kickoffs = kickoffs
+        self.timelines = [timeline(kickoff, rng) for kickoff in kickoffs]
+        self.times = [[event[0] for event in events] for events in self.timelines]
+
+    def status(self, fixture_id, when):
+        return self.timelines[fixture_id][bisect_left(self.times[fixture_id], when + timedelta(microseconds=1)) - 1][1]
+
+    def live(self, when):
+        return any(self.status(i, when) in ('1H', 'HT', '2H') for i in range(len(self.kickoffs)))
+
+    def events(self):
+        """(fixture id, time) of every change a client should see - kick-off onwards"""
+        for fixture_id, events in enumerate(self.timelines):
+            for when, status, _, _ in events:
+                if status != 'NS':
+                    yield fixture_id, when
+
+
+class FullLists:
+    """The pre-planner refresh: live + day lists every time"""
+    name = 'full lists'
+
+    def __init__(self, day):
+        self.day = day
+
+    def refresh(self, now, remaining):
+        if remaining < FULL_REFRESH_CALLS:
+            return 0, []
+        return FULL_REFRESH_CALLS, range(len(self.day.kickoffs))
+
+    def interval(self, now, remaining, config):
+        interval = config.REFRESH_LIVE_INTERVAL if self.day.live(now) else config.REFRESH_IDLE_INTERVAL
+        budget = (MIDNIGHT - now).total_seconds() / max(remaining // FULL_REFRESH_CALLS, 1)
+        return max(interval, budget)
+
+
+class Planned:
+    """RefreshPlanner over what the app has seen so far"""
+    name = 'planner'
+
+    def __init__(self, day, planner):
+        self.day = day
+        self.planner = planner
+        self.seen = {}  # fixture id -> status as last polled
+        self.day_list_at = self.warm_at = None
+        self.pending = 0
+
+    def fixtures(self):
+        return [(i, status, self.day.kickoffs[i]) for i, status in self.seen.items()]
+
+    def refresh(self, now, remaining):
+        plan = self.planner.plan(self.fixtures(), now, self.day_list_at, self.warm_at)
+        self.pending = len(plan.tiers['hot']) + len(plan.tiers['warm'])
+        calls = self.planner.calls(plan)
+        if calls > remaining:
+            return 0, []
+        if plan.full:
+            self.day_list_at = self.warm_at = now
+            polled = range(len(self.day.kickoffs))
+        else:
+            if plan.warm:
+                self.warm_at = now
+            polled = [fixture_id for batch in plan.batches for fixture_id in batch]
+        for fixture_id in polled:
+            self.seen[fixture_id] = self.day.status(fixture_id, now)
+        return calls, polled
+
+    def interval(self, now, remaining, config):
+        busy = self.pending or any(status in ('1H', 'HT', '2H') for status in self.seen.values())
+        interval = config.REFRESH_LIVE_INTERVAL if busy else config.REFRESH_IDLE_INTERVAL
+        return max(interval, self.planner.budget_interval(self.fixtures(), now, remaining))
+
+
+def simulate(day, strategy, quota, config):
+    remaining, refreshes = quota, 0
+    polls = [[] for _ in day.kickoffs]  # fixture id -> times it was polled
+    now = DAY
+    while now < MIDNIGHT:
+        calls, polled = strategy.refresh(now, remaining)
+        remaining -= calls
+        refreshes += calls > 0
+        for fixture_id in polled:
+            polls[fixture_id].append(now)
+        now += timedelta(seconds=max(strategy.interval(now, remaining, config), config.REFRESH_MIN_INTERVAL))
+
+    lags, missed = [], 0
+    for fixture_id, when in day.events():
+        times = polls[fixture_id]
+        index = bisect_left(times, when)
+        if index == len(times):
+            missed += 1
+        else:
+            lags.append((times[index] - when).total_seconds())
+    return quota - remaining, refreshes, sorted(lags), missed
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, math.ceil(fraction * len(values)) - 1)] if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quota', type=int, nargs='+', default=[100, 1000, 7500], help='API calls per day')
+    parser.add_argument('--fixtures', type=int, default=120, help='size of the synthetic day')
+    parser.add_argument('--recording', help='/fixtures body or upstream_stub recording to take kick-offs from')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    kickoffs = recorded_kickoffs(args.recording) if args.recording else synthetic_kickoffs(args.fixtures, rng)
+    day = Day(kickoffs, rng)
+    config = Config
+    print(f"{len(kickoffs)} fixtures, {sum(1 for _ in day.events())} changes to catch")
+    print(f"{'quota':>6} {'strategy':<11} {'calls':>6} {'refreshes':>9} {'saved':>6} "
+          f"{'mean lag s':>10} {'p95 lag s':>9} {'max lag s':>9} {'missed':>6}")
+
+    for quota in args.quota:
+        baseline = None
+        for strategy in (FullLists(day), Planned(day, RefreshPlanner(
+                config.REFRESH_HOT_BEFORE, config.REFRESH_WARM_BEFORE, config.REFRESH_WARM_INTERVAL,
+                config.REFRESH_DAY_LIST_INTERVAL, config.REFRESH_BATCH_SIZE))):
+            calls, refreshes, lags, missed = simulate(day, strategy, quota, config)
+            baseline = calls if baseline is None else baseline
+            mean = sum(lags) / len(lags) if lags else float('nan')
+            print(f"{quota:>6} {strategy.name:<11} {calls:>6} {refreshes:>9} {baseline - calls:>6} "
+                  f"{mean:>10.0f} {percentile(lags, 0.95):>9.0f} {(lags[-1] if lags else 0):>9.0f} {missed:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""Local stand-in for API-Football's /fixtures, /fixtures/lineups and /fixtures/events.
+
+Replays a recorded set of payloads - {"live": body, "today": body,
+"lineups": {fixture_id: body}, "events": {fixture_id: body}} with bodies
+exactly as API-Football returns them - with configurable latency and
+failure rate. Live fixtures carry their events, as API-Football's do.
+Without a recording, a synthetic match day is generated.
+
+Standalone, for running the app against it by hand:
+    python -m benchmarks.upstream_stub --port 18080 [--recording day.json] [--latency 0.2] [--failure-rate 0.05]
+    API_FOOTBALL_URL=http://127.0.0.1:18080/v3 python app.py
+Record the synthetic day to a file with --save day.json.
+"""
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.common import synthetic_fixtures
+
+
+def goal_event(match_data, side, minute):
+    team = match_data['teams'][side]
+    return {
+        'time': {'elapsed': minute, 'extra': None},
+        'team': dict(team),
+        'player': {'id': team['id'] * 100 + 9, 'name': 'Player 9'},
+        'assist': {'id': team['id'] * 100 + 10, 'name': 'Player 10'},
+        'type': 'Goal',
+        'detail': 'Normal Goal',
+        'comments': None
+    }
+
+
+def synthetic_recording(count=1000, lineups=100):
+    """A match day: `count` fixtures, a quarter of them live, lineups for the first `lineups`"""
+    fixtures = synthetic_fixtures(count)
+    live = [match_data for match_data in fixtures if match_data['fixture']['status']['short'] == '1H']
+    for match_data in live:
+        match_data['events'] = [goal_event(match_data, 'home', 20)] if match_data['goals']['home'] else []
+    recording = {
+        'live': {'get': 'fixtures', 'results': len(live), 'response': live},
+        'today': {'get': 'fixtures', 'results': len(fixtures), 'response': fixtures},
+        'lineups': {},
+        'events': {}
+    }
+    for match_data in fixtures[:lineups]:
+        teams = match_data['teams']
+        recording['lineups'][str(match_data['fixture']['id'])] = {
+            'get': 'fixtures/lineups',
+            'response': [
+                {
+                    'team': dict(teams[side]),
+                    'formation': '4-3-3',
+                    'coach': {'name': f"Coach {teams[side]['id']}"},
+                    'startXI': [
+                        {'player': {'id': teams[side]['id'] * 100 + n, 'name': f'Player {n}', 'number': n,
+                                    'pos': 'G' if n == 1 else 'M', 'grid': f'{1 + (n + 2) // 4}:{1 + n % 4}'}}
+                        for n in range(1, 12)
+                    ]
+                }
+                for side in ('home', 'away')
+            ]
+        }
+    return recording
+
+
+class UpstreamStub:
+    """Threaded HTTP server replaying a recording under /v3"""
+
+    def __init__(self, recording=None, latency=0.0, jitter=0.0, failure_rate=0.0, port=0, seed=1):
+        self.recording = copy.deepcopy(recording or synthetic_recording())
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = Counter()  # (endpoint, outcome) -> count
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {}
+        self._encode()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = stub.handle(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v3'
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name='upstream-stub', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _encode(self):
+        with self._lock:
+            self._bodies = {
+                'live': json.dumps(self.recording['live']).encode(),
+                'today': json.dumps(self.recording['today']).encode()
+            }
+
+    def tick(self, goals=5):
+        """Score `goals` random goals in live fixtures, as a match day would between polls"""
+        live = self.recording['live']['response']
+        if not live:
+            return
+        by_id = {match_data['fixture']['id']: match_data for match_data in self.recording['today']['response']}
+        for _ in range(goals):
+            match_data = self._random.choice(live)
+            side = self._random.choice(('home', 'away'))
+            match_data['goals'][side] = (match_data['goals'][side] or 0) + 1
+            match_data['fixture']['status']['elapsed'] = min(90, (match_data['fixture']['status']['elapsed'] or 0) + 1)
+            if 'events' in match_data:
+                match_data['events'].append(goal_event(match_data, side, match_data['fixture']['status']['elapsed']))
+            if match_data['fixture']['id'] in by_id:
+                by_id[match_data['fixture']['id']].update(copy.deepcopy(match_data))
+        self._encode()
+
+    def handle(self, path):
+        url = urlparse(path)
+        params = parse_qs(url.query)
+        if url.path.endswith('/fixtures/lineups'):
+            endpoint = 'fixtures/lineups'
+        elif url.path.endswith('/fixtures/events'):
+            endpoint = 'fixtures/events'
+        elif url.path.endswith('/fixtures'):
+            endpoint = 'fixtures?live' if 'live' in params else 'fixtures?ids' if 'ids' in params else 'fixtures?date'
+        else:
+            return 404, b'{}'
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.calls[(endpoint, 'failed')] += 1
+            return 500, b'{"errors": {"server": "stub failure"}}'
+
+        self.calls[(endpoint, 'ok')] += 1
+        if endpoint == 'fixtures/lineups':
+            body = self.recording['lineups'].get(params.get('fixture', [''])[0], {'response': []})
+            return 200, json.dumps(body).encode()
+        if endpoint == 'fixtures/events':
+            fixture_id = params.get('fixture', [''])[0]
+            body = self.recording.get('events', {}).get(fixture_id)
+            if body is None:
+                # Fall back to the events embedded in the fixture itself
+                body = {'response': next((m.get('events', []) for m in self.recording['today']['response']
+                                          if str(m['fixture']['id']) == fixture_id), [])}
+            return 200, json.dumps(body).encode()
+        if endpoint == 'fixtures?ids':
+            ids = {int(i) for i in params['ids'][0].split('-')}
+            body = [m for m in self.recording['today']['response'] if m['fixture']['id'] in ids]
+            return 200, json.dumps({'response': body}).encode()
+        with self._lock:
+            return 200, self._bodies['live' if endpoint == 'fixtures?live' else 'today']
+
+    def call_counts(self):
+        """{endpoint: count} of successful and failed upstream calls"""
+        counts = Counter()
+        for (endpoint, _), count in self.calls.items():
+            counts[endpoint] += count
+        return dict(counts)
+
+    def reset_counts(self):
+        self.calls.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--recording', help='JSON file with live/today/lineups/events payloads')
+    parser.add_argument('--fixtures', type=int, default=1000, help='size of the synthetic day')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds, uniform')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='fraction of calls answered with a 500')
+    parser.add_argument('--save', help='write the recording being served to this file')
+    args = parser.parse_args()
+
+    recording = None
+    if args.recording:
+        with open(args.recording) as f:
+            recording = json.load(f)
+    stub = UpstreamStub(recording or synthetic_recording(args.fixtures), latency=args.latency,
+                        jitter=args.jitter, failure_rate=args.failure_rate, port=args.port)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(stub.recording, f)
+    print(f"Serving {stub.url}")
+    stub.server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
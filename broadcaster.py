@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class Broadcaster:
+    """Fan-out of refresh diffs to Server-Sent Events listeners.
+
+    Publishing appends to one shared ring of recent events and wakes every
+    listener - there are no per-client queues, so an idle connection costs
+    a blocked greenlet/thread and nothing else. Under the gevent worker
+    the Condition is monkey-patched and thousands of listeners are cheap.
+    Listeners reconnecting with Last-Event-ID get what they missed, or a
+    `reset` event if it already fell out of the ring. Event ids carry a
+    per-process epoch, so an id handed out by another worker (or before a
+    restart) also means `reset`.
+    """
+
+    def __init__(self, history=256, heartbeat=15):
+        self.heartbeat = heartbeat
+        self.epoch = f'{os.getpid()}.{time.time_ns() // 1000000}'
+        self._events = deque(maxlen=history)  # (seq, event, json data)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self.listeners = 0
+
+    def publish(self, event, data):
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, event, json.dumps(data, separators=(',', ':'))))
+            self._cond.notify_all()
+
+    def parse_event_id(self, event_id):
+        """Sequence number of one of our event ids, -1 if it came from elsewhere"""
+        epoch, _, seq = (event_id or '').rpartition(':')
+        if epoch != self.epoch or not seq.isdigit():
+            return -1
+        return int(seq)
+
+    def listen(self, last_event_id=None):
+        """Generator of SSE-formatted messages, starting after `last_event_id`"""
+        with self._cond:
+            seq = self._seq if last_event_id is None else self.parse_event_id(last_event_id)
+            self.listeners += 1
+
+        try:
+            # Tell the client where it stands before the first diff
+            yield 'retry: 5000\n\n'
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq > seq, timeout=self.heartbeat)
+                    oldest = self._events[0][0] if self._events else self._seq + 1
+                    pending = [e for e in self._events if e[0] > seq]
+                    missed = (seq + 1 < oldest and self._seq > seq) or seq < 0
+
+                if missed:
+                    seq = self._seq
+                    yield f'id: {self.epoch}:{seq}\nevent: reset\ndata: {{}}\n\n'
+                    continue
+                if not pending:
+                    yield ': keep-alive\n\n'
+                    continue
+                for seq, event, data in pending:
+                    yield f'id: {self.epoch}:{seq}\nevent: {event}\ndata: {data}\n\n'
+        finally:
+            with self._cond:
+                self.listeners -= 1
@@ -4,12 +4,97 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///football_stats.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
     API_FOOTBALL_KEY = os.getenv('API_FOOTBALL_KEY', 'abc')
     API_FOOTBALL_HOST = 'api-football-v1.p.rapidapi.com'
-    API_FOOTBALL_URL = 'https://api-football-v1.p.rapidapi.com/v3'
+    API_FOOTBALL_URL = os.getenv('API_FOOTBALL_URL', 'https://api-football-v1.p.rapidapi.com/v3')
+    UPSTREAM_TIMEOUT = 10
+    UPSTREAM_RETRIES = 2
+    UPSTREAM_POOL_SIZE = 10
+    # Last good upstream bodies, in SQLite shared by the workers (off unless a path is set, a relative
+    # one is in the instance folder): a body younger than UPSTREAM_FRESH_FOR is served without calling
+    # upstream; when upstream takes longer than UPSTREAM_STALE_AFTER, fails, or has failed
+    # UPSTREAM_BREAKER_THRESHOLD times in a row (then it is left alone for UPSTREAM_BREAKER_RESET
+    # seconds), the stored body is served instead. Stored bodies are downloaded whole, so the
+    # *_FIXTURE_LIMITs below no longer cut a download short
+    UPSTREAM_CACHE_PATH = os.getenv('UPSTREAM_CACHE_PATH', '')
+    UPSTREAM_CACHE_MAX_AGE = 86400
+    UPSTREAM_FRESH_FOR = 10
+    UPSTREAM_STALE_AFTER = 2
+    UPSTREAM_BREAKER_THRESHOLD = 5
+    UPSTREAM_BREAKER_RESET = 60
+    # Fixtures kept per fetch (None ingests all); the rest of the payload is never parsed
+    LIVE_FIXTURE_LIMIT = int(os.getenv('LIVE_FIXTURE_LIMIT')) if os.getenv('LIVE_FIXTURE_LIMIT') else None
+    TODAY_FIXTURE_LIMIT = int(os.getenv('TODAY_FIXTURE_LIMIT')) if os.getenv('TODAY_FIXTURE_LIMIT') else None
+    # Page size of /api/live-matches and /api/today-matches
+    MATCHES_PAGE_SIZE = 50
+    MATCHES_MAX_PAGE = 200
+    # Share the current-matches snapshot between worker processes through this file
+    SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH')
+    # API quota: 'sqlite' (shared by all workers, a relative path is in the instance folder), 'memory'
+    # or 'redis'
+    QUOTA_BACKEND = os.getenv('QUOTA_BACKEND', 'sqlite')
+    QUOTA_SQLITE_PATH = os.getenv('QUOTA_SQLITE_PATH', 'api_quota.db')
+    QUOTA_FLUSH_PATH = 'api_usage.json'
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    API_CALLS_PER_DAY = int(os.getenv('API_CALLS_PER_DAY', 100))
+    API_CALLS_PER_MINUTE = int(os.getenv('API_CALLS_PER_MINUTE', 10))
+    API_BUCKET_RATE = None  # tokens/second, None disables the token bucket
+    API_BUCKET_CAPACITY = None
+    # Lineup cache: seconds a lineup stays fresh (finished matches: forever)
+    LINEUP_CACHE_SIZE = 512
+    LINEUP_TTL_PREMATCH = 300
+    LINEUP_TTL_LIVE = 3600
+    PREFETCH_LINEUPS = os.getenv('PREFETCH_LINEUPS', '').lower() in ('1', 'true', 'yes')
+    LINEUP_PREFETCH_LIMIT = 5
+    # Local logo store ('' disables, a relative path is in the instance folder): logos downloaded once,
+    # shrunk to LOGO_SIZE px, served from /logos/
+    LOGO_DIR = os.getenv('LOGO_DIR', 'logo_cache')
+    LOGO_SIZE = 64
+    LOGO_FETCH_LIMIT = 50  # downloads per refresh
+    # Flask-Caching backend for serialized responses
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = 3600
+    # Seconds between SSE keep-alive comments
+    STREAM_HEARTBEAT = 15
+    # Match archive: one SQLite file per month of finished matches, in the instance folder unless absolute
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+    ARCHIVE_PRUNE_DAYS = 2
+    ARCHIVE_MAX_PAGE = 5000
+    # Background refresher: seconds between polls
+    REFRESH_LIVE_INTERVAL = int(os.getenv('REFRESH_LIVE_INTERVAL', 60))
+    REFRESH_IDLE_INTERVAL = int(os.getenv('REFRESH_IDLE_INTERVAL', 1800))
+    REFRESH_MIN_INTERVAL = int(os.getenv('REFRESH_MIN_INTERVAL', 30))
+    # Refresh planner: fixtures in play or kicking off within REFRESH_HOT_BEFORE seconds are re-polled
+    # on every refresh, REFRESH_BATCH_SIZE per /fixtures?ids= call; those kicking off within
+    # REFRESH_WARM_BEFORE every REFRESH_WARM_INTERVAL; the full live + day lists are fetched every
+    # REFRESH_DAY_LIST_INTERVAL; finished fixtures are never re-polled
+    REFRESH_HOT_BEFORE = 900
+    REFRESH_WARM_BEFORE = 7200
+    REFRESH_WARM_INTERVAL = 900
+    REFRESH_DAY_LIST_INTERVAL = int(os.getenv('REFRESH_DAY_LIST_INTERVAL', 10800))
+    REFRESH_BATCH_SIZE = 20
+    # Lock file that makes refreshes single-flight across worker processes
+    REFRESH_LOCK_PATH = os.getenv('REFRESH_LOCK_PATH')
+    # ?profile=1 / X-Profile: 1 returns a profile of the request instead of its response
+    PROFILING = os.getenv('PROFILING', '').lower() in ('1', 'true', 'yes')
+    # Gunicorn imports the app once in the master and forks ready workers from it (see gunicorn.conf.py);
+    # each worker then opens its own services through app.init_worker()
+    PRELOAD_APP = os.getenv('PRELOAD_APP', '').lower() in ('1', 'true', 'yes')
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///football_stats.db'
+    # Several gunicorn workers: share the refresh and the match snapshot (files in the instance folder)
+    REFRESH_LOCK_PATH = os.getenv('REFRESH_LOCK_PATH', 'refresh.lock')
+    SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'match_snapshot.pickle')
 
 class DevelopmentConfig(Config):
-    DEBUG = True
\ No newline at end of file
+    DEBUG = True
+    PROFILING = os.getenv('PROFILING', '1').lower() in ('1', 'true', 'yes')
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'default': Config
+}
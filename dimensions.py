@@ -0,0 +1,83 @@
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Team, League
+
+
+def _key(api_id, name):
+    # Teams/leagues from the API are known by id; static data only has names
+    return ('id', api_id) if api_id is not None else ('name', name)
+
+
+def _intern(model, id_column, entries):
+    """Primary keys for {key: {name, logo, ...}} entries, inserting the missing ones.
+
+    Rows known by upstream id follow renames. Existing rows whose upstream
+    logo changed get the new URL and lose their local copy, so it is
+    downloaded again.
+    """
+    if not entries:
+        return {}
+
+    api_ids = [value for kind, value in entries if kind == 'id']
+    names = [value for kind, value in entries if kind == 'name']
+
+    def load():
+        found = {}
+        query = db.session.query(model).filter(or_(
+            getattr(model, id_column).in_(api_ids),
+            model.name.in_(names)
+        ))
+        for row in query:
+            api_id = getattr(row, id_column)
+            if api_id is not None:
+                found[('id', api_id)] = row
+            # A name-only reference may point at any team/league of that name
+            found.setdefault(('name', row.name), row)
+        return found
+
+    found = load()
+    missing = [dict(values, **{id_column: key[1] if key[0] == 'id' else None})
+               for key, values in entries.items() if key not in found]
+    if missing:
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = (sqlite if dialect == 'sqlite' else postgresql).insert(model.__table__)
+            # Another worker may have interned the same ids in the meantime
+            db.session.execute(insert.on_conflict_do_nothing(index_elements=[id_column]), missing)
+        else:
+            db.session.bulk_insert_mappings(model, missing)
+        found = load()
+
+    for key, values in entries.items():
+        row = found[key]
+        if key[0] == 'id' and row.name != values['name']:
+            row.name = values['name']
+        if values.get('logo') and row.logo != values['logo']:
+            row.logo, row.logo_asset = values['logo'], None
+    return {key: row.id for key, row in found.items()}
+
+
+def intern_dimensions(rows):
+    """Point every row at its Team and League rows, creating the ones not seen before.
+
+    Reads the names/logos parse_fixture() puts on a row (plus the upstream
+    ids when there are any) and sets home_team_id, away_team_id and
+    league_id to primary keys - a couple of queries for the whole batch.
+    """
+    teams, leagues = {}, {}
+    for row in rows:
+        for side in ('home', 'away'):
+            teams.setdefault(_key(row.get(f'{side}_team_api_id'), row[f'{side}_team']),
+                             {'name': row[f'{side}_team'], 'logo': row[f'{side}_logo']})
+        if row.get('league'):
+            leagues.setdefault(_key(row.get('league_api_id'), row['league']),
+                               {'name': row['league'], 'country': row.get('country'), 'logo': row['league_logo']})
+
+    team_ids = _intern(Team, 'team_id', teams)
+    league_ids = _intern(League, 'league_id', leagues)
+
+    for row in rows:
+        for side in ('home', 'away'):
+            row[f'{side}_team_id'] = team_ids[_key(row.get(f'{side}_team_api_id'), row[f'{side}_team'])]
+        row['league_id'] = league_ids[_key(row.get('league_api_id'), row['league'])] if row.get('league') else None
+    return rows
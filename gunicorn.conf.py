@@ -0,0 +1,58 @@
+"""Gunicorn settings for production:  gunicorn -c gunicorn.conf.py wsgi:app
+
+gevent workers so the SSE stream can hold many idle connections. Every
+worker is a full copy of the app; ProductionConfig makes them share the
+refresh (REFRESH_LOCK_PATH) and the match snapshot (SNAPSHOT_PATH), and
+the quota lives in SQLite by default. Each worker must own its threads
+and connections: without PRELOAD_APP every worker imports the app itself;
+with PRELOAD_APP=1 the master imports it once and forked workers only
+open their own services (app.init_worker), so a worker added on a spike
+serves within milliseconds instead of re-importing Flask and SQLAlchemy.
+
+Prometheus metrics are written by every worker under
+PROMETHEUS_MULTIPROC_DIR, so /metrics on any worker reports all of them.
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('WORKER_CLASS', 'gevent')
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 1000))
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+preload_app = os.getenv('PRELOAD_APP', '').lower() in ('1', 'true', 'yes')
+accesslog = os.getenv('ACCESS_LOG')
+errorlog = '-'
+
+# Must be set before a worker imports prometheus_client - by default in the app's instance folder
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'prometheus_metrics')
+)
+
+if preload_app and worker_class == 'gevent':
+    # The master imports the app (ssl, threading, ...) before any worker could patch them
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def on_starting(server):
+    # Counters from a previous run would otherwise be added to this one's
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    import app
+    if preload_app:
+        app.init_worker(worker.wsgi)
+    # One refresher leader is elected among the workers, the rest relay its snapshots
+    app.start_background()
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from models import db, Match, Lineup, LineupPlayer, LIVE_STATUSES, FINISHED_STATUSES
+
+
+def parse_lineups(data):
+    """Turn a /fixtures/lineups response into the lineup dicts the frontend uses"""
+    lineups = []
+
+    for team_lineup in data.get('response', []):
+        team_data = {
+            'team_id': team_lineup['team'].get('id'),
+            'team_name': team_lineup['team']['name'],
+            'team_logo': team_lineup['team']['logo'],
+            'formation': team_lineup['formation'],
+            'coach': team_lineup['coach']['name'] if team_lineup['coach'] else 'Unknown',
+            'players': []
+        }
+
+        for player in team_lineup['startXI']:
+            team_data['players'].append({
+                'id': player['player']['id'],
+                'name': player['player']['name'],
+                'number': player['player']['number'],
+                'position': player['player']['pos'],
+                'grid': player['player']['grid']
+            })
+
+        lineups.append(team_data)
+
+    return lineups
+
+
+class LineupCache:
+    """Lineups served from an in-process LRU, then the Lineup tables, then upstream.
+
+    How long a lineup stays fresh depends on the match status: finished
+    matches never change so their lineups are kept forever, live ones are
+    kept for `live_ttl`, and pre-match lineups (which may still be missing
+    or change) only for `prematch_ttl`. Concurrent misses for the same
+    fixture wait for a single fetch. Fixtures with no Match row are never
+    fetched, so made-up ids cannot spend the API quota, and lineups of
+    matches pruned from Match are served from storage as final.
+    """
+
+    def __init__(self, fetch_fn, maxsize=512, prematch_ttl=300, live_ttl=3600, empty_ttl=60):
+        self.fetch_fn = fetch_fn  # fixture_id -> parsed lineups, raises on failure
+        self.maxsize = maxsize
+        self.prematch_ttl = prematch_ttl
+        self.live_ttl = live_ttl
+        self.empty_ttl = empty_ttl
+
+        self._entries = OrderedDict()  # fixture_id -> (lineups, expires_at)
+        self._lock = threading.Lock()
+        self._inflight = {}  # fixture_id -> threading.Event
+
+    def ttl_for(self, status):
+        """Seconds a lineup stays fresh, None meaning forever"""
+        if status in FINISHED_STATUSES:
+            return None
+        if status in LIVE_STATUSES:
+            return self.live_ttl
+        return self.prematch_ttl
+
+    def get(self, fixture_id):
+        """Lineups for a fixture as (lineups, source), lineups may be empty - source 'unknown' for a fixture we do not have"""
+        cached = self._get_cached(fixture_id)
+        if cached is not None:
+            return cached, 'cache'
+
+        with self._lock:
+            event = self._inflight.get(fixture_id)
+            leader = event is None
+            if leader:
+                event = self._inflight[fixture_id] = threading.Event()
+
+        if not leader:
+            # Another request is already loading this fixture
+            event.wait(timeout=15)
+            cached = self._get_cached(fixture_id)
+            return (cached, 'cache') if cached is not None else ([], 'none')
+
+        try:
+            return self._load(fixture_id)
+        finally:
+            with self._lock:
+                self._inflight.pop(fixture_id, None)
+            event.set()
+
+    def store(self, fixture_id, lineups, status=None):
+        """Replace the stored lineups for a fixture and cache them
+
+        An empty response never replaces lineups already stored - the
+        stored ones are kept and served instead.
+        """
+        if not lineups:
+            stored = Lineup.query.filter_by(fixture_id=fixture_id).order_by(Lineup.id).all()
+            if stored:
+                kept = [lineup.to_dict() for lineup in stored]
+                self._put(fixture_id, kept, self.ttl_for(status))
+                return kept
+
+        old_ids = db.session.query(Lineup.id).filter_by(fixture_id=fixture_id).scalar_subquery()
+        LineupPlayer.query.filter(LineupPlayer.lineup_id.in_(old_ids)).delete(synchronize_session=False)
+        Lineup.query.filter_by(fixture_id=fixture_id).delete(synchronize_session=False)
+        for team_data in lineups:
+            lineup = Lineup(
+                fixture_id=fixture_id,
+                team_id=team_data.get('team_id'),
+                team_name=team_data['team_name'],
+                team_logo=team_data['team_logo'],
+                formation=team_data['formation'],
+                coach=team_data['coach'],
+                fetched_at=datetime.utcnow()
+            )
+            lineup.players = [
+                LineupPlayer(player_id=p['id'], name=p['name'], number=p['number'],
+                             position=p['position'], grid=p['grid'])
+                for p in team_data['players']
+            ]
+            db.session.add(lineup)
+        db.session.commit()
+
+        public = [{k: v for k, v in team.items() if k != 'team_id'} for team in lineups]
+        self._put(fixture_id, public, self.ttl_for(status) if public else self.empty_ttl)
+        return public
+
+    def missing(self, fixture_ids):
+        """Which of these fixtures have no stored lineup yet"""
+        if not fixture_ids:
+            return []
+        stored = {row.fixture_id for row in
+                  db.session.query(Lineup.fixture_id).filter(Lineup.fixture_id.in_(fixture_ids)).distinct()}
+        return [fixture_id for fixture_id in fixture_ids if fixture_id not in stored]
+
+    def _load(self, fixture_id):
+        match = db.session.query(Match.status).filter_by(fixture_id=fixture_id).first()
+        stored = Lineup.query.filter_by(fixture_id=fixture_id).order_by(Lineup.id).all()
+        if match is None and not stored:
+            return [], 'unknown'
+        # No Match row beside a stored lineup means the match was pruned
+        # long after it finished - its lineup is final
+        status = match.status if match else None
+        ttl = self.ttl_for(status) if match else None
+        if stored:
+            age = (datetime.utcnow() - stored[0].fetched_at).total_seconds()
+            lineups = [lineup.to_dict() for lineup in stored]
+            if ttl is None or age < ttl:
+                self._put(fixture_id, lineups, None if ttl is None else ttl - age)
+                return lineups, 'database'
+
+        try:
+            return self.store(fixture_id, self.fetch_fn(fixture_id), status), 'live_api'
+        except Exception as e:
+            db.session.rollback()
+            print(f"API lineup failed: {e}")
+            if stored:
+                # Stale beats nothing
+                return [lineup.to_dict() for lineup in stored], 'database'
+            self._put(fixture_id, [], self.empty_ttl)
+            return [], 'none'
+
+    def _get_cached(self, fixture_id):
+        with self._lock:
+            entry = self._entries.get(fixture_id)
+            if entry is None:
+                return None
+            lineups, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[fixture_id]
+                return None
+            self._entries.move_to_end(fixture_id)
+            return lineups
+
+    def _put(self, fixture_id, lineups, ttl):
+        with self._lock:
+            self._entries[fixture_id] = (lineups, time.monotonic() + ttl if ttl is not None else None)
+            self._entries.move_to_end(fixture_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -0,0 +1,77 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# Raster formats only - an SVG served from our own origin could run script
+IMAGE_FORMATS = ('PNG', 'JPEG', 'GIF', 'WEBP')
+
+
+class LogoStore:
+    """Team and league logos downloaded once and served from our own host.
+
+    Each logo is decoded with Pillow, shrunk to fit `size` x `size`, and
+    saved as PNG under a hash of its content, so the file behind a name
+    never changes and browsers can cache it for good. Anything Pillow does
+    not decode as one of IMAGE_FORMATS (SVG included) is rejected. Failed
+    downloads are not retried for `retry_after` seconds.
+    """
+
+    def __init__(self, directory, size=64, timeout=5, workers=8, retry_after=3600):
+        self.directory = directory
+        self.size = size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        os.makedirs(directory, exist_ok=True)
+
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='logo')
+        self._failed = {}  # url -> time.monotonic() of the last failure
+        self._lock = threading.Lock()
+
+    def fetch(self, urls, limit=None):
+        """Download up to `limit` logos side by side, {url: asset file name} for the ones that worked"""
+        now = time.monotonic()
+        with self._lock:
+            urls = [url for url in dict.fromkeys(urls)
+                    if url not in self._failed or now - self._failed[url] >= self.retry_after][:limit]
+
+        assets = {}
+        for url, future in [(url, self.executor.submit(self._fetch_one, url)) for url in urls]:
+            try:
+                assets[url] = future.result()
+            except Exception as e:
+                print(f"Logo download failed for {url}: {e}")
+                with self._lock:
+                    self._failed[url] = time.monotonic()
+        return assets
+
+    def _fetch_one(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        body = self._shrink(response.content)
+
+        name = f"{hashlib.blake2b(body, digest_size=16).hexdigest()}.png"
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        return name
+
+    def _shrink(self, body):
+        """PNG no larger than size x size - raises for anything but a raster image"""
+        # Imported with the first logo rather than at startup
+        from PIL import Image
+        with Image.open(io.BytesIO(body), formats=IMAGE_FORMATS) as image:
+            if image.width <= self.size and image.height <= self.size and image.format == 'PNG':
+                return body
+            image = image.convert('RGBA')
+            image.thumbnail((self.size, self.size), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format='PNG', optimize=True)
+        return out.getvalue()
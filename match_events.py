@@ -0,0 +1,401 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models import (db, EventMark, Lineup, LineupPlayer, MatchEvent, PlayerAppearance, PlayerStats,
+                    FINISHED_STATUSES)
+import hashlib
+
+# Keys of an /api/fixture/<id>/events item
+EVENT_FIELDS = ('seq', 'elapsed', 'extra', 'type', 'detail', 'team_id', 'team_name', 'player_id', 'player_name',
+                'assist_id', 'assist_name', 'comments')
+
+# What identifies an event - upstream lists gain events mid-list (late cards) and lose them (VAR), so
+# an event's position says nothing
+EVENT_KEY = ('elapsed', 'extra', 'type', 'detail', 'team_id', 'player_id')
+
+PLAYER_STAT_COLUMNS = ('appearances', 'minutes', 'goals', 'assists', 'yellow_cards', 'red_cards')
+# Of those, the ones counted straight from a fixture's events (rather than from appearances)
+COUNTED_COLUMNS = ('goals', 'assists', 'yellow_cards', 'red_cards')
+
+# Minutes a finished match lasted, by its final status
+MATCH_MINUTES = {'FT': 90, 'AET': 120, 'PEN': 120}
+
+# Compare-and-set of a fixture's mark, on the digest of the event list it was last brought up to
+ADVANCE_MARK = (
+    update(EventMark.__table__)
+    .where(EventMark.__table__.c.fixture_id == bindparam('id'),
+           func.coalesce(EventMark.__table__.c.digest, '') == bindparam('seen'))
+    .values(digest=bindparam('digest'), last_seq=bindparam('last_seq'), count=bindparam('count'),
+            updated_at=bindparam('now'))
+)
+SETTLE_MARK = (
+    update(EventMark.__table__)
+    .where(EventMark.__table__.c.fixture_id == bindparam('id'), EventMark.__table__.c.settled.is_(False))
+    .values(settled=True, updated_at=bindparam('now'))
+)
+DELETE_EVENT = delete(MatchEvent.__table__).where(
+    MatchEvent.__table__.c.fixture_id == bindparam('id'), MatchEvent.__table__.c.seq == bindparam('event_seq')
+)
+
+
+def parse_events(events):
+    """Turn API-Football fixture events into MatchEvent column dicts, without their seq"""
+    parsed = []
+    for event in events:
+        team, player, assist = event.get('team') or {}, event.get('player') or {}, event.get('assist') or {}
+        parsed.append({
+            'elapsed': event['time']['elapsed'],
+            'extra': event['time'].get('extra'),
+            'type': event['type'],
+            'detail': event.get('detail'),
+            'team_id': team.get('id'),
+            'team_name': team.get('name'),
+            'player_id': player.get('id'),
+            'player_name': player.get('name'),
+            'assist_id': assist.get('id'),
+            'assist_name': assist.get('name'),
+            'comments': event.get('comments')
+        })
+    return parsed
+
+
+def event_keys(events):
+    """EVENT_KEY of each upstream event, unparsed"""
+    return [(event['time']['elapsed'], event['time'].get('extra'), event['type'], event.get('detail'),
+             (event.get('team') or {}).get('id'), (event.get('player') or {}).get('id')) for event in events]
+
+
+def events_digest(keys):
+    """Digest of an event list's keys - unchanged lists are skipped without parsing"""
+    return hashlib.blake2b(repr(keys).encode(), digest_size=16).hexdigest()
+
+
+def diff_events(stored, keys):
+    """(added, removed): positions in the upstream list of events not stored yet, stored events no longer in it"""
+    unmatched = {}
+    for event in stored:
+        unmatched.setdefault(tuple(event[field] for field in EVENT_KEY), []).append(event)
+    added = []
+    for position, key in enumerate(keys):
+        same = unmatched.get(key)
+        if same:
+            same.pop(0)
+        else:
+            added.append(position)
+    return added, [event for same in unmatched.values() for event in same]
+
+
+def events_after(fixture_id, after=0):
+    """Event dicts of a fixture with seq > after, oldest first - one range scan of the primary key"""
+    query = (db.session.query(*[getattr(MatchEvent, field) for field in EVENT_FIELDS])
+             .filter(MatchEvent.fixture_id == fixture_id, MatchEvent.seq > after)
+             .order_by(MatchEvent.seq))
+    return [dict(zip(EVENT_FIELDS, row)) for row in query]
+
+
+def event_counts(events, players):
+    """player id -> ((id, name, team id, team name), Counter of COUNTED_COLUMNS) over one fixture's events,
+    for the given player ids"""
+    counts = {}
+
+    def count(player, **stats):
+        if player[0] in players:
+            counts.setdefault(player[0], (player, Counter()))[1].update(stats)
+
+    for event in events:
+        if event['player_id'] not in players and event['assist_id'] not in players:
+            continue
+        kind, detail = event['type'].lower(), (event['detail'] or '').lower()
+        player = (event['player_id'], event['player_name'], event['team_id'], event['team_name'])
+        if kind == 'goal' and detail not in ('missed penalty', 'own goal'):
+            count(player, goals=1)
+            count((event['assist_id'], event['assist_name'], event['team_id'], event['team_name']), assists=1)
+        elif kind == 'card':
+            # 'Yellow Card', 'Second Yellow card' (a red as well) or 'Red Card'
+            if 'yellow' in detail:
+                count(player, yellow_cards=1)
+            if 'red' in detail or 'second yellow' in detail:
+                count(player, red_cards=1)
+        elif kind == 'var' and detail.startswith('goal cancelled'):
+            count(player, goals=-1)
+    for _, counter in counts.values():
+        # Upstream may drop the cancelled goal as well as reporting the VAR decision
+        counter['goals'] = max(counter['goals'], 0)
+    return counts
+
+
+def moves_players(event):
+    """Whether an event takes a player off or brings one on"""
+    detail = (event['detail'] or '').lower()
+    return event['type'].lower() == 'subst' or (event['type'].lower() == 'card' and
+                                                ('red' in detail or 'second yellow' in detail))
+
+
+class PlayerTally:
+    """Player stat deltas and appearance changes gathered during one ingestion"""
+
+    def __init__(self, appearances):
+        self.appearances = appearances  # (fixture_id, player_id) -> PlayerAppearance
+        self.deltas = {}  # player_id -> Counter of PLAYER_STAT_COLUMNS
+        self.players = {}  # player_id -> {'name': ..., 'team_id': ..., 'team_name': ...}
+
+    def add(self, player, **stats):
+        player_id, name, team_id, team_name = player
+        if player_id is None:
+            return
+        known = self.players.setdefault(player_id, {'name': None, 'team_id': None, 'team_name': None})
+        if name:
+            known.update(name=name, team_id=team_id, team_name=team_name)
+        self.deltas.setdefault(player_id, Counter()).update(stats)
+
+    def close(self, appearance, minute):
+        appearance.off_minute = max(minute, appearance.on_minute)
+        self.add((appearance.player_id, None, appearance.team_id, None),
+                 minutes=appearance.off_minute - appearance.on_minute)
+
+    def reopen(self, fixture_id, player):
+        """Undo off(): back on the pitch, minutes taken back"""
+        appearance = self.appearances.get((fixture_id, player[0]))
+        if appearance is not None and appearance.off_minute is not None:
+            self.add(player, minutes=appearance.on_minute - appearance.off_minute)
+            appearance.off_minute = None
+
+    def drop(self, fixture_id, player):
+        """Undo on(): the appearance never happened"""
+        appearance = self.appearances.pop((fixture_id, player[0]), None)
+        if appearance is None:
+            return
+        self.reopen(fixture_id, player)
+        self.add(player, appearances=-1)
+        if appearance in db.session.new:
+            db.session.expunge(appearance)
+        else:
+            db.session.delete(appearance)
+
+    def on(self, fixture_id, player, minute):
+        key = (fixture_id, player[0])
+        if player[0] is None or key in self.appearances:
+            return
+        appearance = PlayerAppearance(fixture_id=fixture_id, player_id=player[0], team_id=player[2], on_minute=minute)
+        db.session.add(appearance)
+        self.appearances[key] = appearance
+        self.add(player, appearances=1)
+
+    def off(self, fixture_id, player, minute):
+        # Going off without having come on means they started
+        self.on(fixture_id, player, 0)
+        appearance = self.appearances.get((fixture_id, player[0]))
+        if appearance is None:
+            return
+        if appearance.off_minute is not None:
+            # Nobody goes off twice: an earlier minute is a correction (of full time, say), a later one is not
+            if minute >= appearance.off_minute:
+                return
+            self.reopen(fixture_id, player)
+        self.close(appearance, minute)
+
+    def recount(self, stored, events, changed):
+        """Goals, assists and cards of a fixture whose events went from `stored` to `events` by `changed`"""
+        # Only players named in the events that came or went can have different totals
+        players = {event[field] for event in changed for field in ('player_id', 'assist_id')} - {None}
+        before, after = event_counts(stored, players), event_counts(events, players)
+        for player_id in set(before) | set(after):
+            player, counts = after.get(player_id) or before[player_id]
+            old = before.get(player_id, (None, Counter()))[1]
+            self.add(player, **{c: counts[c] - old[c] for c in COUNTED_COLUMNS})
+
+    def apply(self, fixture_id, event, sign=1):
+        """Move players on and off for one MatchEvent column dict - or, with sign=-1, take that back"""
+        minute = event['elapsed'] or 0
+        kind, detail = event['type'].lower(), (event['detail'] or '').lower()
+        player = (event['player_id'], event['player_name'], event['team_id'], event['team_name'])
+        assist = (event['assist_id'], event['assist_name'], event['team_id'], event['team_name'])
+        if kind == 'card' and ('red' in detail or 'second yellow' in detail):
+            if sign > 0:
+                self.off(fixture_id, player, minute)
+            else:
+                self.reopen(fixture_id, player)
+        elif kind == 'subst':
+            # API-Football names the player going off in `player`, the one coming on in `assist`
+            if sign > 0:
+                self.off(fixture_id, player, minute)
+                self.on(fixture_id, assist, minute)
+            else:
+                self.reopen(fixture_id, player)
+                self.drop(fixture_id, assist)
+
+    def settle(self, fixture_id, status, starters):
+        """Full time: everyone still on the pitch - starters included - plays to the end"""
+        minutes = MATCH_MINUTES.get(status, 90)
+        for player in starters:
+            self.on(fixture_id, player, 0)
+        for (appearance_fixture, _), appearance in list(self.appearances.items()):
+            if appearance_fixture == fixture_id and appearance.off_minute is None:
+                self.close(appearance, minutes)
+
+    def rows(self):
+        now = datetime.utcnow()
+        return [
+            dict({c: deltas.get(c, 0) for c in PLAYER_STAT_COLUMNS}, player_id=player_id, updated_at=now,
+                 **self.players[player_id])
+            for player_id, deltas in self.deltas.items() if any(deltas.values())
+        ]
+
+
+def starters(fixture_id, lineups=None):
+    """(player_id, name, team_id, team_name) of the starting XIs - from a payload's lineups, else the Lineup tables"""
+    if lineups:
+        return [(entry['player']['id'], entry['player']['name'], lineup['team'].get('id'), lineup['team']['name'])
+                for lineup in lineups for entry in lineup.get('startXI') or ()]
+    return (db.session.query(LineupPlayer.player_id, LineupPlayer.name, Lineup.team_id, Lineup.team_name)
+            .join(Lineup).filter(Lineup.fixture_id == fixture_id).all())
+
+
+def ingest_events(statuses, details):
+    """Bring stored fixture events in line with upstream and update player totals, returns how many were added.
+
+    `statuses` maps fixture ids to their current status, `details` fixture
+    ids to the 'events' (and 'lineups') embedded in their /fixtures payload.
+    A fixture whose event list digests the same as last time is skipped
+    without parsing. Otherwise the list is matched against the stored
+    events by EVENT_KEY: new events are appended past the high-water mark
+    (so `?after=` tails see late-reported ones too), and events upstream
+    dropped - a VAR reversal - are deleted and their counts taken back.
+    The mark moves with a compare-and-set on the digest, so a fixture
+    ingested by two processes at once is only counted by one. A fixture
+    seen finished gets its remaining minutes credited, once, and again for
+    players a later correction puts back on the pitch.
+    """
+    marks = {mark.fixture_id: mark for mark in EventMark.query.filter(EventMark.fixture_id.in_(list(statuses)))}
+
+    lists = {}  # fixture id -> upstream events, their keys and digest, for fixtures whose list changed
+    for fixture_id in statuses:
+        events = (details.get(fixture_id) or {}).get('events')
+        if events is None:
+            continue
+        keys = event_keys(events)
+        digest = events_digest(keys)
+        mark = marks.get(fixture_id)
+        if mark is None or mark.digest != digest:
+            lists[fixture_id] = (events, keys, digest)
+
+    stored = {fixture_id: [] for fixture_id in lists}
+    known = [fixture_id for fixture_id in lists if fixture_id in marks]
+    if known:
+        table = MatchEvent.__table__
+        query = (select(table.c.fixture_id, *[table.c[field] for field in EVENT_FIELDS])
+                 .where(table.c.fixture_id.in_(known)).order_by(table.c.fixture_id, table.c.seq))
+        for row in db.session.connection().execute(query):
+            stored[row[0]].append(dict(zip(EVENT_FIELDS, row[1:])))
+
+    claimed = {}  # fixture id -> (added, removed) event dicts
+    for fixture_id, (events, keys, digest) in lists.items():
+        mark = marks.get(fixture_id)
+        positions, removed = diff_events(stored[fixture_id], keys)
+        added = parse_events([events[position] for position in positions])
+        last_seq = mark.last_seq if mark is not None else 0
+        for seq, event in enumerate(added, start=last_seq + 1):
+            event['seq'] = seq
+        if _advance_mark(fixture_id, mark, digest, last_seq + len(added), len(events)):
+            claimed[fixture_id] = (added, removed)
+
+    settling = [
+        fixture_id for fixture_id, status in statuses.items()
+        if status in FINISHED_STATUSES and (fixture_id in claimed or fixture_id in marks)
+        and not (fixture_id in marks and marks[fixture_id].settled) and _settle_mark(fixture_id)
+    ]
+    # Corrections to a match already settled can put players back on the pitch until the end
+    settling += [fixture_id for fixture_id in claimed if fixture_id in marks and marks[fixture_id].settled]
+    touched = set(claimed) | set(settling)
+    if not touched:
+        return 0
+
+    # Appearances only move on substitutions, red cards and full time
+    moving = set(settling) | {fixture_id for fixture_id, (added, removed) in claimed.items()
+                              if any(moves_players(event) for event in added + removed)}
+    tally = PlayerTally({
+        (appearance.fixture_id, appearance.player_id): appearance
+        for appearance in PlayerAppearance.query.filter(PlayerAppearance.fixture_id.in_(moving))
+    } if moving else {})
+    rows, gone = [], []
+    for fixture_id, (added, removed) in claimed.items():
+        gone_seqs = {event['seq'] for event in removed}
+        kept = [event for event in stored[fixture_id] if event['seq'] not in gone_seqs]
+        tally.recount(stored[fixture_id], kept + added, added + removed)
+        for event in reversed(removed):
+            tally.apply(fixture_id, event, sign=-1)
+            gone.append({'id': fixture_id, 'event_seq': event['seq']})
+        for event in added:
+            tally.apply(fixture_id, event)
+            rows.append(dict(event, fixture_id=fixture_id, created_at=datetime.utcnow()))
+    connection = db.session.connection()
+    if gone:
+        connection.execute(DELETE_EVENT, gone)
+    if rows:
+        connection.execute(MatchEvent.__table__.insert(), rows)
+    for fixture_id in settling:
+        tally.settle(fixture_id, statuses[fixture_id],
+                     starters(fixture_id, (details.get(fixture_id) or {}).get('lineups')))
+    _apply_player_deltas(tally.rows())
+    return len(rows)
+
+
+def _insert(model):
+    """INSERT ... ON CONFLICT DO NOTHING where the dialect has it, else a plain INSERT"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        return insert(model.__table__).on_conflict_do_nothing()
+    return model.__table__.insert()
+
+
+def _advance_mark(fixture_id, mark, digest, last_seq, count):
+    """Move a fixture's mark on from the list we read it at - False if someone else moved it first"""
+    # Straight on the session's connection: one of these per fixture with news, every poll
+    connection, now = db.session.connection(), datetime.utcnow()
+    if mark is None:
+        result = connection.execute(_insert(EventMark), {'fixture_id': fixture_id, 'digest': digest,
+                                                         'last_seq': last_seq, 'count': count, 'settled': False,
+                                                         'updated_at': now})
+    else:
+        result = connection.execute(ADVANCE_MARK, {'id': fixture_id, 'seen': mark.digest or '', 'digest': digest,
+                                                   'last_seq': last_seq, 'count': count, 'now': now})
+    return result.rowcount == 1
+
+
+def _settle_mark(fixture_id):
+    return db.session.connection().execute(SETTLE_MARK, {'id': fixture_id, 'now': datetime.utcnow()}).rowcount == 1
+
+
+def _apply_player_deltas(rows):
+    """Add stat deltas to PlayerStats with one INSERT ... ON CONFLICT DO UPDATE"""
+    if not rows:
+        return
+
+    table = PlayerStats.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['player_id'],
+            set_=dict(
+                {c: table.c[c] + stmt.excluded[c] for c in PLAYER_STAT_COLUMNS},
+                **{c: func.coalesce(stmt.excluded[c], table.c[c]) for c in ('name', 'team_id', 'team_name')},
+                updated_at=stmt.excluded.updated_at
+            )
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        stats = db.session.get(PlayerStats, row['player_id'])
+        if stats is None:
+            stats = PlayerStats(player_id=row['player_id'], **{c: 0 for c in PLAYER_STAT_COLUMNS})
+            db.session.add(stats)
+        for c in PLAYER_STAT_COLUMNS:
+            setattr(stats, c, getattr(stats, c) + row[c])
+        for c in ('name', 'team_id', 'team_name'):
+            if row[c] is not None:
+                setattr(stats, c, row[c])
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from flask import Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent handling a request', ['endpoint', 'method']
+)
+REQUESTS = Counter('http_requests', 'Requests handled', ['endpoint', 'method', 'status'])
+
+DB_QUERIES = Histogram(
+    'db_queries_per_scope', 'SQL statements run by one request or background refresh', ['scope'],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+)
+DB_TIME = Histogram(
+    'db_time_per_scope_seconds', 'Time spent in SQL by one request or background refresh', ['scope'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+UPSTREAM_LATENCY = Histogram(
+    'upstream_request_duration_seconds', 'Football API time to response headers', ['endpoint'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+UPSTREAM_CALLS = Counter('upstream_requests', 'Football API calls by HTTP status', ['endpoint', 'status'])
+
+# result: hit/miss for responses, the serving tier (cache/database/live_api/none) for lineups
+CACHE_LOOKUPS = Counter('cache_lookups', 'Response and lineup cache lookups', ['cache', 'result'])
+
+REFRESH_LATENCY = Histogram(
+    'refresh_duration_seconds', 'Time of one refresh, upstream calls included', ['data_source'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+_scopes = threading.local()
+
+
+class QueryScope:
+    """Counts the SQL statements this thread runs between start() and finish().
+
+    finish() records them as DB_QUERIES/DB_TIME[scope]. Scopes nest - a
+    refresh joined by a ?wait=1 request counts towards both.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+
+    def start(self):
+        if not hasattr(_scopes, 'stack'):
+            _scopes.stack = []
+        _scopes.stack.append(self)
+        return self
+
+    def finish(self):
+        _scopes.stack.remove(self)
+        DB_QUERIES.labels(self.scope).observe(self.count)
+        DB_TIME.labels(self.scope).observe(self.seconds)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.finish()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop('query_started', time.perf_counter())
+    for scope in getattr(_scopes, 'stack', ()):
+        scope.count += 1
+        scope.seconds += elapsed
+
+
+def instrument_engine(engine):
+    """Feed every statement on `engine` to the active QueryScopes"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _endpoint():
+    # The URL rule, not the path, so /api/team-lineup/<id> is one series
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def init_request_metrics(app):
+    """Time every request and count its queries"""
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = QueryScope(_endpoint()).start()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            endpoint = _endpoint()
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+            REQUESTS.labels(endpoint, request.method, response.status_code).inc()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        scope = g.pop('metrics_queries', None)
+        if scope is not None:
+            scope.finish()
+
+
+def record_upstream_call(path, status, seconds):
+    """UpstreamClient on_call hook - status is the HTTP code or 'error'"""
+    UPSTREAM_LATENCY.labels(path).observe(seconds)
+    UPSTREAM_CALLS.labels(path, status).inc()
+
+
+def record_cache_lookup(cache, result):
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+class _Gauges:
+    """Values read at scrape time, e.g. quota left - the same in every worker"""
+
+    def __init__(self, gauges):
+        self.gauges = gauges
+
+    def collect(self):
+        for name, documentation, value in self.gauges:
+            yield GaugeMetricFamily(name, documentation, value=value)
+
+
+def metrics_response(gauges=()):
+    """Prometheus text for /metrics, adding up every worker's files under PROMETHEUS_MULTIPROC_DIR"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        body = generate_latest(registry)
+    else:
+        body = generate_latest(REGISTRY)
+
+    extra = CollectorRegistry()
+    extra.register(_Gauges(gauges))
+    return Response(body + generate_latest(extra), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,29 @@
+"""match expired_at
+
+Revision ID: 4f803683a223
+Revises: 57a38ff241a2
+Create Date: 2026-10-18 19:02:11.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f803683a223'
+down_revision = '57a38ff241a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database built with db.create_all() after the sync engine landed already has the column
+    if 'expired_at' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('match')}:
+        return
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expired_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.drop_column('expired_at')
@@ -0,0 +1,124 @@
+"""team and league dimensions
+
+Revision ID: a9baafb8971c
+Revises: 2b0d13b443d5
+Create Date: 2026-10-18 18:11:32.424678
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9baafb8971c'
+down_revision = '2b0d13b443d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('league',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('league_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('country', sa.String(length=50), nullable=True),
+    sa.Column('logo', sa.String(length=255), nullable=True),
+    sa.Column('logo_asset', sa.String(length=64), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('league_id')
+    )
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_league_name'), ['name'], unique=False)
+
+    with op.batch_alter_table('team', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('logo_asset', sa.String(length=64), nullable=True))
+        batch_op.alter_column('team_id',
+               existing_type=sa.INTEGER(),
+               nullable=True)
+        batch_op.create_index(batch_op.f('ix_team_name'), ['name'], unique=False)
+
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('home_team_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('away_team_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('league_id', sa.Integer(), nullable=True))
+
+    # Stored matches have no upstream ids - intern their teams by name and
+    # their leagues by name and country, same-named leagues being distinct
+    op.execute(
+        'INSERT INTO league (name, country, logo) '
+        'SELECT league, country, MAX(league_logo) FROM "match" WHERE league IS NOT NULL GROUP BY league, country'
+    )
+    op.execute(
+        'INSERT INTO team (name, logo) '
+        'SELECT name, MAX(logo) FROM ('
+        '  SELECT home_team AS name, home_logo AS logo FROM "match"'
+        '  UNION ALL SELECT away_team, away_logo FROM "match"'
+        ') AS sides WHERE name NOT IN (SELECT name FROM team) GROUP BY name'
+    )
+    op.execute(
+        'UPDATE "match" SET '
+        'home_team_id = (SELECT MIN(id) FROM team WHERE team.name = "match".home_team), '
+        'away_team_id = (SELECT MIN(id) FROM team WHERE team.name = "match".away_team), '
+        'league_id = (SELECT MIN(id) FROM league WHERE league.name = "match".league '
+        '             AND COALESCE(league.country, \'\') = COALESCE("match".country, \'\'))'
+    )
+
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.alter_column('home_team_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('away_team_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_match_home_team_id_team', 'team', ['home_team_id'], ['id'])
+        batch_op.create_foreign_key('fk_match_away_team_id_team', 'team', ['away_team_id'], ['id'])
+        batch_op.create_foreign_key('fk_match_league_id_league', 'league', ['league_id'], ['id'])
+        batch_op.drop_column('home_team')
+        batch_op.drop_column('away_team')
+        batch_op.drop_column('home_logo')
+        batch_op.drop_column('away_logo')
+        batch_op.drop_column('league')
+        batch_op.drop_column('country')
+        batch_op.drop_column('league_logo')
+
+
+def downgrade():
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('home_team', sa.VARCHAR(length=100), nullable=True))
+        batch_op.add_column(sa.Column('away_team', sa.VARCHAR(length=100), nullable=True))
+        batch_op.add_column(sa.Column('home_logo', sa.VARCHAR(length=255), nullable=True))
+        batch_op.add_column(sa.Column('away_logo', sa.VARCHAR(length=255), nullable=True))
+        batch_op.add_column(sa.Column('league', sa.VARCHAR(length=100), nullable=True))
+        batch_op.add_column(sa.Column('country', sa.VARCHAR(length=50), nullable=True))
+        batch_op.add_column(sa.Column('league_logo', sa.VARCHAR(length=255), nullable=True))
+
+    op.execute(
+        'UPDATE "match" SET '
+        'home_team = (SELECT name FROM team WHERE team.id = "match".home_team_id), '
+        'home_logo = (SELECT logo FROM team WHERE team.id = "match".home_team_id), '
+        'away_team = (SELECT name FROM team WHERE team.id = "match".away_team_id), '
+        'away_logo = (SELECT logo FROM team WHERE team.id = "match".away_team_id), '
+        'league = (SELECT name FROM league WHERE league.id = "match".league_id), '
+        'country = (SELECT country FROM league WHERE league.id = "match".league_id), '
+        'league_logo = (SELECT logo FROM league WHERE league.id = "match".league_id)'
+    )
+
+    with op.batch_alter_table('match', schema=None) as batch_op:
+        batch_op.alter_column('home_team', existing_type=sa.VARCHAR(length=100), nullable=False)
+        batch_op.alter_column('away_team', existing_type=sa.VARCHAR(length=100), nullable=False)
+        batch_op.drop_constraint('fk_match_home_team_id_team', type_='foreignkey')
+        batch_op.drop_constraint('fk_match_away_team_id_team', type_='foreignkey')
+        batch_op.drop_constraint('fk_match_league_id_league', type_='foreignkey')
+        batch_op.drop_column('league_id')
+        batch_op.drop_column('away_team_id')
+        batch_op.drop_column('home_team_id')
+
+    # Teams only known by name did not exist before
+    op.execute('DELETE FROM team WHERE team_id IS NULL')
+    with op.batch_alter_table('team', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_team_name'))
+        batch_op.alter_column('team_id',
+               existing_type=sa.INTEGER(),
+               nullable=False)
+        batch_op.drop_column('logo_asset')
+
+    with op.batch_alter_table('league', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_league_name'))
+
+    op.drop_table('league')
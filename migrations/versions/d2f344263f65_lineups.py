@@ -0,0 +1,60 @@
+"""lineups
+
+Revision ID: d2f344263f65
+Revises: 4f803683a223
+Create Date: 2026-10-18 19:04:37.052918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f344263f65'
+down_revision = '4f803683a223'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A database built with db.create_all() after the lineup cache landed already has the tables
+    if sa.inspect(op.get_bind()).has_table('lineup'):
+        return
+    op.create_table('lineup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fixture_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('team_name', sa.String(length=100), nullable=False),
+    sa.Column('team_logo', sa.String(length=255), nullable=True),
+    sa.Column('formation', sa.String(length=20), nullable=True),
+    sa.Column('coach', sa.String(length=100), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('lineup', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lineup_fixture_id'), ['fixture_id'], unique=False)
+
+    op.create_table('lineup_player',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lineup_id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('number', sa.Integer(), nullable=True),
+    sa.Column('position', sa.String(length=10), nullable=True),
+    sa.Column('grid', sa.String(length=10), nullable=True),
+    sa.ForeignKeyConstraint(['lineup_id'], ['lineup.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('lineup_player', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lineup_player_lineup_id'), ['lineup_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('lineup_player', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lineup_player_lineup_id'))
+
+    op.drop_table('lineup_player')
+    with op.batch_alter_table('lineup', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lineup_fixture_id'))
+
+    op.drop_table('lineup')
@@ -1,57 +1,293 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from datetime import datetime
+import sqlite3
 
 db = SQLAlchemy()
 
+LIVE_STATUSES = ('1H', 'HT', '2H', 'ET', 'BT', 'P', 'LIVE', 'INT')
+FINISHED_STATUSES = ('FT', 'AET', 'PEN')
+
+# Keys of Match.to_dict(), selectable with ?fields=
+MATCH_FIELDS = (
+    'id', 'home_team', 'away_team', 'home_logo', 'away_logo', 'home_score', 'away_score', 'status',
+    'elapsed', 'time', 'league', 'country', 'league_logo', 'venue', 'is_live'
+)
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL so readers never block on the refresh writer, plus cheaper syncs"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-20000')  # ~20MB page cache
+    cursor.execute('PRAGMA mmap_size=134217728')
+    cursor.close()
+
+
 class Match(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     fixture_id = db.Column(db.Integer, unique=True, nullable=False)
-    home_team = db.Column(db.String(100), nullable=False)
-    away_team = db.Column(db.String(100), nullable=False)
-    home_logo = db.Column(db.String(255))
-    away_logo = db.Column(db.String(255))
+    # Teams and league are interned by dimensions.py and referenced by key
+    home_team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    away_team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    league_id = db.Column(db.Integer, db.ForeignKey('league.id'))
     home_score = db.Column(db.Integer)
     away_score = db.Column(db.Integer)
     status = db.Column(db.String(20), nullable=False)
     elapsed = db.Column(db.Integer)
     match_time = db.Column(db.DateTime)
-    league = db.Column(db.String(100))
-    league_logo = db.Column(db.String(255))
     venue = db.Column(db.String(100))
     is_live = db.Column(db.Boolean, default=False)
+    expired_at = db.Column(db.DateTime)  # set when a refresh no longer returns the fixture
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    def to_dict(self):
-        return {
+    home_team = db.relationship('Team', foreign_keys=[home_team_id], lazy='joined', innerjoin=True)
+    away_team = db.relationship('Team', foreign_keys=[away_team_id], lazy='joined', innerjoin=True)
+    league = db.relationship('League', lazy='joined')
+
+    __table_args__ = (
+        # /api/live-matches: is_live = 1 ORDER BY updated_at DESC
+        db.Index('ix_match_is_live_updated_at', 'is_live', 'updated_at'),
+        # /api/today-matches and the cache-status count: expired_at IS NULL ORDER BY match_time
+        db.Index('ix_match_expired_at_match_time', 'expired_at', 'match_time'),
+    )
+
+    @classmethod
+    def live(cls):
+        """Live matches, most recently updated first"""
+        return cls.query.filter_by(is_live=True, expired_at=None).order_by(cls.updated_at.desc())
+
+    @classmethod
+    def current(cls):
+        """Every match the last refresh returned, in kick-off order"""
+        return cls.query.filter_by(expired_at=None).order_by(cls.match_time.asc())
+
+    def to_dict(self, fields=None):
+        """API representation, optionally only `fields` (see MATCH_FIELDS)"""
+        league = self.league
+        data = {
             'id': self.fixture_id,
-            'home_team': self.home_team,
-            'away_team': self.away_team,
-            'home_logo': self.home_logo,
-            'away_logo': self.away_logo,
+            'home_team': self.home_team.name,
+            'away_team': self.away_team.name,
+            'home_logo': self.home_team.logo_url,
+            'away_logo': self.away_team.logo_url,
             'home_score': self.home_score,
             'away_score': self.away_score,
             'status': self.status,
             'elapsed': self.elapsed,
             'time': self.match_time.isoformat() if self.match_time else None,
-            'league': self.league,
-            'league_logo': self.league_logo,
+            'league': league.name if league else None,
+            'country': league.country if league else None,
+            'league_logo': league.logo_url if league else None,
+            'venue': self.venue,
+            'is_live': self.is_live
+        }
+        return data if fields is None else {field: data[field] for field in fields}
+
+    def to_row(self):
+        """The row dict sync.parse_fixture() gives, for the archive and standings"""
+        league = self.league
+        return {
+            'fixture_id': self.fixture_id,
+            'home_team': self.home_team.name,
+            'away_team': self.away_team.name,
+            'home_logo': self.home_team.logo,
+            'away_logo': self.away_team.logo,
+            'home_score': self.home_score,
+            'away_score': self.away_score,
+            'status': self.status,
+            'elapsed': self.elapsed,
+            'match_time': self.match_time,
+            'league': league.name if league else None,
+            'country': league.country if league else None,
+            'league_logo': league.logo if league else None,
             'venue': self.venue,
             'is_live': self.is_live
         }
 
 class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    team_id = db.Column(db.Integer, unique=True, nullable=False)
-    name = db.Column(db.String(100), nullable=False)
+    team_id = db.Column(db.Integer, unique=True)  # API-Football id, NULL for teams only known by name
+    name = db.Column(db.String(100), nullable=False, index=True)
     logo = db.Column(db.String(255))
+    logo_asset = db.Column(db.String(64))  # file name in the logo store, once downloaded
     country = db.Column(db.String(50))
     founded = db.Column(db.Integer)
     venue = db.Column(db.String(100))
 
+    @property
+    def logo_url(self):
+        return logo_url(self.logo, self.logo_asset)
+
+class League(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    league_id = db.Column(db.Integer, unique=True)  # API-Football id, NULL for leagues only known by name
+    name = db.Column(db.String(100), nullable=False, index=True)
+    country = db.Column(db.String(50))
+    logo = db.Column(db.String(255))
+    logo_asset = db.Column(db.String(64))
+
+    @property
+    def logo_url(self):
+        return logo_url(self.logo, self.logo_asset)
+
+def logo_url(remote, asset):
+    """The local copy of a logo once it is in the logo store, the upstream URL until then"""
+    return f'/logos/{asset}' if asset else remote
+
 class CacheStatus(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     cache_type = db.Column(db.String(50), nullable=False)  # 'live', 'today'
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     total_matches = db.Column(db.Integer, default=0)
     api_calls_made = db.Column(db.Integer, default=0)
+
+class Lineup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    fixture_id = db.Column(db.Integer, nullable=False, index=True)
+    team_id = db.Column(db.Integer)
+    team_name = db.Column(db.String(100), nullable=False)
+    team_logo = db.Column(db.String(255))
+    formation = db.Column(db.String(20))
+    coach = db.Column(db.String(100))
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    players = db.relationship('LineupPlayer', backref='lineup', cascade='all, delete-orphan',
+                              order_by='LineupPlayer.id', lazy='selectin')
+
+    def to_dict(self):
+        return {
+            'team_name': self.team_name,
+            'team_logo': self.team_logo,
+            'formation': self.formation,
+            'coach': self.coach,
+            'players': [player.to_dict() for player in self.players]
+        }
+
+class LineupPlayer(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    lineup_id = db.Column(db.Integer, db.ForeignKey('lineup.id'), nullable=False, index=True)
+    player_id = db.Column(db.Integer)
+    name = db.Column(db.String(100), nullable=False)
+    number = db.Column(db.Integer)
+    position = db.Column(db.String(10))
+    grid = db.Column(db.String(10))
+
+    def to_dict(self):
+        return {
+            'id': self.player_id,
+            'name': self.name,
+            'number': self.number,
+            'position': self.position,
+            'grid': self.grid
+        }
+
+class Standing(db.Model):
+    """Materialized league table row, maintained incrementally by standings.py"""
+    id = db.Column(db.Integer, primary_key=True)
+    league = db.Column(db.String(100), nullable=False)
+    # League names repeat across countries ('Premier League'), '' when the country is unknown
+    country = db.Column(db.String(50), nullable=False, default='', server_default='')
+    team = db.Column(db.String(100), nullable=False)
+    kind = db.Column(db.String(10), nullable=False, default='final')  # 'final' or 'live' (provisional)
+    played = db.Column(db.Integer, nullable=False, default=0)
+    won = db.Column(db.Integer, nullable=False, default=0)
+    drawn = db.Column(db.Integer, nullable=False, default=0)
+    lost = db.Column(db.Integer, nullable=False, default=0)
+    goals_for = db.Column(db.Integer, nullable=False, default=0)
+    goals_against = db.Column(db.Integer, nullable=False, default=0)
+    points = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('league', 'country', 'team', 'kind', name='uq_standing_league_country_team_kind'),
+    )
+
+class StandingContribution(db.Model):
+    """What each fixture currently adds to Standing, so changes apply as deltas"""
+    fixture_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    league = db.Column(db.String(100), nullable=False)
+    country = db.Column(db.String(50), nullable=False, default='', server_default='')
+    home_team = db.Column(db.String(100), nullable=False)
+    away_team = db.Column(db.String(100), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)
+    home_goals = db.Column(db.Integer, nullable=False)
+    away_goals = db.Column(db.Integer, nullable=False)
+
+class MatchEvent(db.Model):
+    """One goal, card, substitution or VAR decision of a fixture.
+
+    The key is (fixture_id, seq), seq numbering a fixture's events in the
+    order they were first seen - events upstream reports late get the next
+    seq, not their place in the list, and events upstream drops are
+    deleted. On SQLite the table is WITHOUT ROWID, so a fixture's events sit
+    together in the primary key b-tree and a tail (`seq > after`) is a
+    single range scan.
+    """
+    fixture_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    elapsed = db.Column(db.Integer)
+    extra = db.Column(db.Integer)  # stoppage-time minutes
+    type = db.Column(db.String(20), nullable=False)  # 'Goal', 'Card', 'subst', 'Var'
+    detail = db.Column(db.String(50))
+    team_id = db.Column(db.Integer)
+    team_name = db.Column(db.String(100))
+    player_id = db.Column(db.Integer)
+    player_name = db.Column(db.String(100))
+    assist_id = db.Column(db.Integer)  # for substitutions: the player coming on
+    assist_name = db.Column(db.String(100))
+    comments = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = {'sqlite_with_rowid': False}
+
+class EventMark(db.Model):
+    """High-water mark of a fixture's events: the last seq given out, and the upstream list it stands for"""
+    fixture_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # events stored now
+    digest = db.Column(db.String(32))  # match_events.events_digest() of that list
+    settled = db.Column(db.Boolean, nullable=False, default=False)  # full-time minutes credited
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class PlayerAppearance(db.Model):
+    """A player's time on the pitch in one fixture, closed when they go off or the match ends"""
+    fixture_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    player_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    team_id = db.Column(db.Integer)
+    on_minute = db.Column(db.Integer, nullable=False)
+    off_minute = db.Column(db.Integer)
+
+class PlayerStats(db.Model):
+    """Running totals per player, incremented by match_events.py as events arrive"""
+    player_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # API-Football id
+    name = db.Column(db.String(100))
+    team_id = db.Column(db.Integer)
+    team_name = db.Column(db.String(100))
+    appearances = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
+    goals = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    yellow_cards = db.Column(db.Integer, nullable=False, default=0)
+    red_cards = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.player_id,
+            'name': self.name,
+            'team_id': self.team_id,
+            'team_name': self.team_name,
+            'appearances': self.appearances,
+            'minutes': self.minutes,
+            'goals': self.goals,
+            'assists': self.assists,
+            'yellow_cards': self.yellow_cards,
+            'red_cards': self.red_cards
+        }
@@ -0,0 +1,133 @@
+import math
+from collections import namedtuple
+from datetime import datetime, timedelta
+from models import LIVE_STATUSES, FINISHED_STATUSES
+
+# Never going to change again - not polled at all
+DONE_STATUSES = FINISHED_STATUSES + ('CANC', 'ABD', 'AWD', 'WO')
+
+# Postponed, time to be defined, suspended or interrupted - may resume, but
+# not on any schedule worth polling for, so left to the full lists
+STALLED_STATUSES = ('PST', 'TBD', 'SUSP', 'INT')
+
+# Calls a full refresh costs: the live list and the day list
+FULL_REFRESH_CALLS = 2
+
+# Kick-off to final whistle, half-time and stoppages included
+MATCH_LENGTH = timedelta(minutes=120)
+
+RefreshPlan = namedtuple('RefreshPlan', 'full batches tiers warm')
+
+
+class RefreshPlanner:
+    """Decides what a refresh asks upstream for, fixture by fixture.
+
+    Every known fixture falls in a tier from its status and kick-off:
+      hot   in play, or kicking off within `hot_before` seconds (or late,
+            up to MATCH_LENGTH after kick-off) - re-polled on every refresh
+      warm  kicking off within `warm_before` seconds - re-polled once
+            `warm_interval` seconds have passed since the last time
+      cold  later on, stalled (postponed, suspended, ...) or never started
+            long after kick-off - only seen when the full lists are
+            fetched, every `day_list_interval` seconds and on the first
+            refresh of a day
+      done  finished, cancelled, ... - never polled again
+    Hot and warm fixtures are fetched `batch_size` at a time through
+    /fixtures?ids=, so a quiet afternoon costs no calls at all - unless
+    that takes as many calls as the full lists, which are fetched instead.
+
+    Times are naive, in the timezone the API reports kick-offs in.
+    """
+
+    def __init__(self, hot_before=900, warm_before=7200, warm_interval=900, day_list_interval=10800, batch_size=20):
+        self.hot_before = timedelta(seconds=hot_before)
+        self.warm_before = timedelta(seconds=warm_before)
+        self.warm_interval = warm_interval
+        self.day_list_interval = day_list_interval
+        self.batch_size = batch_size
+
+    def tier(self, status, match_time, now):
+        if status in STALLED_STATUSES:
+            return 'cold'
+        if status in LIVE_STATUSES:
+            return 'hot'
+        if status in DONE_STATUSES:
+            return 'done'
+        if match_time is None or match_time + MATCH_LENGTH <= now:
+            return 'cold'
+        if match_time - self.hot_before <= now:
+            return 'hot'
+        if match_time - self.warm_before <= now:
+            return 'warm'
+        return 'cold'
+
+    def plan(self, fixtures, now, day_list_at=None, warm_at=None):
+        """RefreshPlan for (fixture_id, status, match_time) fixtures.
+
+        `day_list_at` / `warm_at` are when the full lists / the warm
+        fixtures were last fetched (None if never). A full plan has no
+        batches - the full lists cover every fixture. `warm` says whether
+        the warm fixtures are fetched this time.
+        """
+        tiers = {'hot': [], 'warm': [], 'cold': [], 'done': []}
+        for fixture_id, status, match_time in fixtures:
+            tiers[self.tier(status, match_time, now)].append(fixture_id)
+
+        full = (day_list_at is None or day_list_at.date() != now.date()
+                or (now - day_list_at).total_seconds() >= self.day_list_interval)
+        if full:
+            return RefreshPlan(True, [], tiers, True)
+
+        due = list(tiers['hot'])
+        warm = bool(tiers['warm']) and (warm_at is None or (now - warm_at).total_seconds() >= self.warm_interval)
+        if warm:
+            due += tiers['warm']
+        batches = [due[i:i + self.batch_size] for i in range(0, len(due), self.batch_size)]
+        if len(batches) >= FULL_REFRESH_CALLS:
+            # The full lists cost no more and cover everything
+            return RefreshPlan(True, [], tiers, True)
+        return RefreshPlan(False, batches, tiers, warm)
+
+    def calls(self, plan):
+        return FULL_REFRESH_CALLS if plan.full else len(plan.batches)
+
+    def _sweep(self, fixtures, now, until):
+        """(seconds some fixture is hot, calls it takes to refresh every second meanwhile) from now to until"""
+        points = []
+        for _, status, match_time in fixtures:
+            if status in DONE_STATUSES or status in STALLED_STATUSES or match_time is None:
+                continue
+            start, end = match_time - self.hot_before, match_time + MATCH_LENGTH
+            if status in LIVE_STATUSES:
+                # Running late (extra time, penalties) - still hot for a while
+                end = max(end, now + self.hot_before)
+            start, end = max(start, now), min(end, until)
+            if start < end:
+                points += [(start, 1), (end, -1)]
+
+        busy = cost = 0.0
+        hot, last = 0, now
+        for when, step in sorted(points):
+            if hot:
+                seconds = (when - last).total_seconds()
+                busy += seconds
+                cost += seconds * min(FULL_REFRESH_CALLS, math.ceil(hot / self.batch_size))
+            hot += step
+            last = when
+        return busy, cost
+
+    def budget_interval(self, fixtures, now, remaining_calls):
+        """Seconds between refreshes that spends the remaining quota while fixtures are hot.
+
+        Calls for the full lists due outside those hours are set aside; the
+        rest is spread over the hot hours left instead of the whole day,
+        weighted by how many calls a refresh will take at each point.
+        """
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        busy, cost = self._sweep(fixtures, now, midnight)
+        quiet = (midnight - now).total_seconds() - busy
+        spendable = remaining_calls - math.ceil(quiet / self.day_list_interval) * FULL_REFRESH_CALLS
+        if spendable < FULL_REFRESH_CALLS:
+            # Only the full lists are affordable now
+            return (midnight - now).total_seconds() / max(remaining_calls // FULL_REFRESH_CALLS, 1)
+        return cost / spendable
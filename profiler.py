@@ -0,0 +1,80 @@
+import cProfile
+import io
+import pstats
+import threading
+from flask import Response, g, request
+
+
+class RequestProfiler:
+    """Opt-in profile of a single request.
+
+    With PROFILING enabled, a request carrying ?profile=1 or an
+    `X-Profile: 1` header gets its profile back instead of its response:
+    pyinstrument's HTML call tree if it is installed (?profile=text for
+    plain text), otherwise cProfile's top functions by cumulative time.
+    One request is profiled at a time; others run normally meanwhile.
+    """
+
+    def __init__(self, app=None, top=40):
+        self.top = top
+        self._lock = threading.Lock()
+        self._pyinstrument = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PROFILING'):
+            return
+        # Only imported when profiling is on
+        try:
+            from pyinstrument import Profiler
+            self._pyinstrument = Profiler
+        except ImportError:
+            pass
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._abandon)
+
+    def _wanted(self):
+        return request.args.get('profile') or request.headers.get('X-Profile')
+
+    def _start(self):
+        if not self._wanted() or not self._lock.acquire(blocking=False):
+            return
+        if self._pyinstrument is not None:
+            g.profiler = self._pyinstrument()
+            g.profiler.start()
+        else:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    def _finish(self, response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            if self._wanted():
+                response.headers['X-Profile'] = 'busy'
+            return response
+
+        try:
+            if self._pyinstrument is not None:
+                profiler.stop()
+                if self._wanted() == 'text':
+                    return Response(profiler.output_text(unicode=True), mimetype='text/plain')
+                return Response(profiler.output_html(), mimetype='text/html')
+
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(self.top)
+            return Response(out.getvalue(), mimetype='text/plain')
+        finally:
+            self._lock.release()
+
+    def _abandon(self, exc):
+        # The request failed before after_request - drop its profile
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            if self._pyinstrument is not None:
+                profiler.stop()
+            else:
+                profiler.disable()
+            self._lock.release()
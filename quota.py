@@ -0,0 +1,294 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+class MemoryQuotaStore:
+    """Process-local counters, only touching disk when flushing.
+
+    Good for a single worker. Counters are loaded once from `flush_path`
+    and written back at most every `flush_interval` seconds and at exit.
+    """
+
+    def __init__(self, flush_path=None, flush_interval=30):
+        self.flush_path = flush_path
+        self.flush_interval = flush_interval
+        self._counters = {}
+        self._expires = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._dirty = False
+
+        if flush_path and os.path.exists(flush_path):
+            with open(flush_path, 'r') as f:
+                for key, value in json.load(f).items():
+                    # Old api_usage.json files are keyed by bare date
+                    self._counters[key if ':' in key else f'day:{key}'] = value
+
+        if flush_path:
+            atexit.register(self.flush)
+
+    def get(self, key):
+        with self._lock:
+            self._expire()
+            return self._counters.get(key, 0)
+
+    def incr(self, key, amount=1, limit=None, ttl=None):
+        with self._lock:
+            self._expire()
+            value = self._counters.get(key, 0) + amount
+            if limit is not None and amount > 0 and value > limit:
+                return None
+            self._counters[key] = value
+            if ttl and key not in self._expires:
+                self._expires[key] = time.monotonic() + ttl
+            self._dirty = True
+
+        if self.flush_path and time.monotonic() - self._last_flush > self.flush_interval:
+            self.flush()
+        return value
+
+    def take_token(self, key, rate, capacity, amount=1, now=None):
+        now = now if now is not None else time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < amount:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - amount, now)
+            return True
+
+    def flush(self):
+        if not self.flush_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            # Same {date: count} layout the old api_usage.json used
+            data = {key[4:]: value for key, value in self._counters.items() if key.startswith('day:')}
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+        tmp_path = f'{self.flush_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.flush_path)
+
+    def _expire(self):
+        # Every expired window goes, not just the one asked for - otherwise
+        # each minute's counter would stay in memory forever
+        now = time.monotonic()
+        for key in [key for key, expires in self._expires.items() if expires < now]:
+            self._counters.pop(key, None)
+            del self._expires[key]
+
+
+class SQLiteQuotaStore:
+    """Counters in a small SQLite file, safe across worker processes.
+
+    Every check-and-increment is a single UPDATE ... RETURNING, so two
+    workers can never both take the last call of the day.
+    """
+
+    def __init__(self, path='api_quota.db'):
+        self.path = path
+        self._local = threading.local()
+        self._execute(
+            'CREATE TABLE IF NOT EXISTS quota_counter '
+            '(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL)'
+        )
+        self._execute(
+            'CREATE TABLE IF NOT EXISTS quota_bucket '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+        )
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    def get(self, key):
+        row = self._execute(
+            'SELECT value FROM quota_counter WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key, amount=1, limit=None, ttl=None):
+        now = time.time()
+        # Drop every expired window (this key's included), then create the row if it isn't there
+        self._execute('DELETE FROM quota_counter WHERE expires_at <= ?', (now,))
+        self._execute(
+            'INSERT OR IGNORE INTO quota_counter (key, value, expires_at) VALUES (?, 0, ?)',
+            (key, now + ttl if ttl else None)
+        )
+        if limit is None or amount <= 0:
+            row = self._execute(
+                'UPDATE quota_counter SET value = value + ? WHERE key = ? RETURNING value',
+                (amount, key)
+            ).fetchone()
+        else:
+            row = self._execute(
+                'UPDATE quota_counter SET value = value + ? WHERE key = ? AND value + ? <= ? RETURNING value',
+                (amount, key, amount, limit)
+            ).fetchone()
+        return row[0] if row else None
+
+    def take_token(self, key, rate, capacity, amount=1, now=None):
+        now = now if now is not None else time.time()
+        self._execute(
+            'INSERT OR IGNORE INTO quota_bucket (key, tokens, updated_at) VALUES (?, ?, ?)',
+            (key, capacity, now)
+        )
+        row = self._execute(
+            'UPDATE quota_bucket '
+            'SET tokens = MIN(:capacity, tokens + (:now - updated_at) * :rate) - :amount, updated_at = :now '
+            'WHERE key = :key AND MIN(:capacity, tokens + (:now - updated_at) * :rate) >= :amount '
+            'RETURNING tokens',
+            {'key': key, 'capacity': capacity, 'rate': rate, 'amount': amount, 'now': now}
+        ).fetchone()
+        return row is not None
+
+    def flush(self):
+        pass
+
+
+class RedisQuotaStore:
+    """Counters in Redis (or anything speaking the same client interface).
+
+    Every check-and-increment runs as one Lua script, so no worker ever
+    sees a counter above its limit. Only get/eval are used, so
+    benchmarks/fake_redis.py can stand in for a server.
+    """
+
+    INCR_SCRIPT = """
+    local amount = tonumber(ARGV[1])
+    local value = tonumber(redis.call('GET', KEYS[1]) or '0') + amount
+    if ARGV[2] ~= '' and amount > 0 and value > tonumber(ARGV[2]) then
+        return false
+    end
+    redis.call('INCRBY', KEYS[1], amount)
+    if ARGV[3] ~= '' and redis.call('TTL', KEYS[1]) == -1 then
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+    end
+    return value
+    """
+
+    TOKEN_BUCKET_SCRIPT = """
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or ARGV[2])
+    local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or ARGV[3])
+    tokens = math.min(tonumber(ARGV[2]), tokens + (tonumber(ARGV[3]) - updated) * tonumber(ARGV[1]))
+    local allowed = 0
+    if tokens >= tonumber(ARGV[4]) then
+        tokens = tokens - tonumber(ARGV[4])
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', ARGV[3])
+    return allowed
+    """
+
+    def __init__(self, client, prefix='quota:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return int(value) if value else 0
+
+    def incr(self, key, amount=1, limit=None, ttl=None):
+        return self.client.eval(self.INCR_SCRIPT, 1, self.prefix + key, amount,
+                                '' if limit is None else limit, ttl or '')
+
+    def take_token(self, key, rate, capacity, amount=1, now=None):
+        now = now if now is not None else time.time()
+        return bool(self.client.eval(self.TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, rate, capacity, now, amount))
+
+    def flush(self):
+        pass
+
+
+def make_quota_store(config):
+    """Build the quota backend named by QUOTA_BACKEND"""
+    backend = config.get('QUOTA_BACKEND', 'sqlite')
+    if backend == 'memory':
+        return MemoryQuotaStore(flush_path=config.get('QUOTA_FLUSH_PATH'))
+    if backend == 'redis':
+        import redis
+        return RedisQuotaStore(redis.Redis.from_url(config['REDIS_URL']))
+    return SQLiteQuotaStore(config.get('QUOTA_SQLITE_PATH', 'api_quota.db'))
+
+
+# API Usage Tracker Class
+class APIUsageTracker:
+    def __init__(self, store, max_calls_per_day=100, max_calls_per_minute=None,
+                 bucket_rate=None, bucket_capacity=None):
+        self.store = store
+        self.max_calls_per_day = max_calls_per_day
+        self.max_calls_per_minute = max_calls_per_minute
+        self.bucket_rate = bucket_rate  # tokens per second
+        self.bucket_capacity = bucket_capacity
+
+    def day_key(self):
+        return f"day:{datetime.now().strftime('%Y-%m-%d')}"
+
+    def minute_key(self):
+        return f"minute:{datetime.now().strftime('%Y-%m-%dT%H:%M')}"
+
+    def try_acquire(self, calls=1):
+        """Atomically check every limit and record `calls` if all of them allow it"""
+        day_key, minute_key = self.day_key(), self.minute_key()
+        if self.store.incr(day_key, calls, limit=self.max_calls_per_day, ttl=2 * 86400) is None:
+            return False
+
+        if self.max_calls_per_minute:
+            if self.store.incr(minute_key, calls, limit=self.max_calls_per_minute, ttl=120) is None:
+                self.store.incr(day_key, -calls)
+                return False
+
+        if self.bucket_rate and self.bucket_capacity:
+            if not self.store.take_token('bucket', self.bucket_rate, self.bucket_capacity, calls):
+                self.store.incr(day_key, -calls)
+                if self.max_calls_per_minute:
+                    self.store.incr(minute_key, -calls)
+                return False
+
+        return True
+
+    def can_make_call(self, calls=1):
+        """Non-consuming check against the daily and per-minute limits"""
+        if self.get_today_usage() + calls > self.max_calls_per_day:
+            return False
+        if self.max_calls_per_minute:
+            return self.store.get(self.minute_key()) + calls <= self.max_calls_per_minute
+        return True
+
+    def record_api_call(self, calls=1):
+        self.store.incr(self.day_key(), calls, ttl=2 * 86400)
+        if self.max_calls_per_minute:
+            self.store.incr(self.minute_key(), calls, ttl=120)
+
+    def get_today_usage(self):
+        return self.store.get(self.day_key())
+
+    def usage_stats(self):
+        """Everything /api/usage-stats needs from a single read"""
+        usage = self.get_today_usage()
+        return {
+            'daily_limit': self.max_calls_per_day,
+            'usage_today': usage,
+            'remaining_calls': self.max_calls_per_day - usage,
+            'usage_percentage': (usage / self.max_calls_per_day) * 100
+        }
@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class BackgroundRefresher:
+    """Keeps the match cache warm from a daemon thread.
+
+    Polls fast while matches are in play and slowly when nothing is live.
+    Every refresh - scheduled or requested over HTTP - goes through one
+    single-flight lock, so a burst of concurrent requests costs a single
+    upstream refresh and everyone gets that refresh's result.
+
+    With a `lock_path` the same holds across worker processes: refreshes
+    serialize on an flock of that file, which also records when the last
+    one ran and its result, and only the process holding the
+    `<lock_path>.leader` lock runs the polling schedule. If the leader
+    dies its lock is released and another worker takes over. A worker
+    waiting for another's refresh polls the flock rather than blocking
+    on it, so under gevent its other requests and streams keep running.
+    """
+
+    LOCK_POLL = 0.05  # seconds between attempts at a flock held by another worker
+
+    def __init__(self, refresh_fn, live_interval=60, idle_interval=1800, min_interval=30, budget_fn=None,
+                 lock_path=None):
+        self.refresh_fn = refresh_fn
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.min_interval = min_interval
+        self.budget_fn = budget_fn  # seconds between calls the quota can afford
+        self.lock_path = lock_path if fcntl else None
+        self.leader = self.lock_path is None
+
+        self.last_result = None
+        self.last_run = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the polling thread (safe to call more than once)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='match-refresher', daemon=True)
+                self._thread.start()
+
+    def request_refresh(self):
+        """Cheap signal: wake the polling thread instead of refreshing inline"""
+        self.start()
+        self._wakeup.set()
+
+    def refresh(self):
+        """Single-flight refresh, returns the result of the run that served us"""
+        if not self._lock.acquire(blocking=False):
+            # Someone else is already refreshing - wait for them and share it
+            with self._lock:
+                return self.last_result
+
+        try:
+            with self._shared_state() as state:
+                if state is not None and state.get('at') and time.time() - state['at'] < self.min_interval:
+                    # Another worker refreshed a moment ago
+                    self.last_result = state.get('result', self.last_result)
+                    self.last_run = time.monotonic() - (time.time() - state['at'])
+                    return self.last_result
+
+                if self.last_run is not None and time.monotonic() - self.last_run < self.min_interval:
+                    return self.last_result
+
+                try:
+                    self.last_result = self.refresh_fn()
+                except Exception as e:
+                    print(f"Background refresh failed: {e}")
+                    self.last_result = {'success': False, 'error': str(e)}
+                self.last_run = time.monotonic()
+                if state is not None:
+                    state.update(at=time.time(), result=self.last_result)
+                return self.last_result
+        finally:
+            self._lock.release()
+
+    @contextmanager
+    def _shared_state(self):
+        """Hold the cross-process refresh lock, yielding its {'at', 'result'} (None without lock_path)"""
+        if not self.lock_path:
+            yield None
+            return
+
+        with open(self.lock_path, 'a+') as f:
+            self._flock(f)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or '{}')
+                except ValueError:
+                    state = {}
+                before = dict(state)
+                yield state
+                if state != before:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state, default=str))
+                    f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _flock(self, f):
+        """Take the exclusive flock of `f` without blocking the process"""
+        # A blocking flock would freeze a gevent worker's whole hub until the other worker's
+        # refresh - upstream calls included - is done; time.sleep yields to the other greenlets
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                time.sleep(self.LOCK_POLL)
+
+    def _try_lead(self):
+        """Take the leader lock if nobody holds it - kept open for the life of the process"""
+        if self.leader:
+            return True
+        f = open(f'{self.lock_path}.leader', 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._leader_file = f
+        self.leader = True
+        return True
+
+    def next_interval(self):
+        """Fast while matches are in play or about to start, slow otherwise, never over budget"""
+        result = self.last_result or {}
+        busy = result.get('live_matches') or result.get('pending_fixtures')
+        interval = self.live_interval if busy else self.idle_interval
+        if self.budget_fn:
+            interval = max(interval, self.budget_fn())
+        return interval
+
+    def status(self):
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'leader': self.leader,
+            'pid': os.getpid(),
+            'refreshing': self._lock.locked(),
+            'seconds_since_refresh': round(time.monotonic() - self.last_run) if self.last_run is not None else None,
+            'next_interval': round(self.next_interval())
+        }
+
+    def _run(self):
+        while True:
+            if self._try_lead():
+                self.refresh()
+                self._wakeup.wait(self.next_interval())
+            elif self._wakeup.wait(self.min_interval):
+                # Not the leader: only refresh when asked, and check back for leadership
+                self.refresh()
+            self._wakeup.clear()
@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+from flask import Response, request
+from wire import MIMETYPES, encode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class ResponseCache:
+    """Pre-serialized, pre-compressed bodies for the match list endpoints.
+
+    Entries are keyed by a data version that the refresh bumps whenever
+    stored matches actually change, so nothing has to be invalidated by
+    hand - a new version simply misses and old ones age out of the
+    Flask-Caching backend. Every body carries an ETag (one per content
+    encoding), so polling clients get a bodyless 304 until the data changes.
+
+    Pass `version_fn` to take the version from shared state instead, so
+    every worker process agrees on it, and `on_lookup('hit' | 'miss')` to
+    count hits. Each wire format (see wire.py) is cached separately, and
+    the version a body was built for goes out as X-Data-Version.
+    """
+
+    def __init__(self, cache, timeout=3600, compress_min_size=1024, version_fn=None, on_lookup=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.compress_min_size = compress_min_size
+        self.version_fn = version_fn
+        self.on_lookup = on_lookup
+        self._version = 0
+
+    @property
+    def version(self):
+        return self.version_fn() if self.version_fn else self._version
+
+    def bump(self):
+        """Called by the refresh whenever stored matches changed (without version_fn)"""
+        self._version += 1
+
+    def respond(self, key, build_fn, fmt='json'):
+        """Serve `build_fn()` in wire format `fmt`, building it at most once per data version"""
+        version = self.version
+        cache_key = f'response:{key}:{version}:{fmt}:{request.query_string.decode()}'
+        entry = self.cache.get(cache_key)
+        if self.on_lookup:
+            self.on_lookup('hit' if entry is not None else 'miss')
+        if entry is None:
+            entry = self._serialize(build_fn(), fmt)
+            # A refresh that landed mid-build may have mixed old and new
+            # matches into the body - serve it, but don't store it under
+            # a version it may not match
+            if self.version == version:
+                self.cache.set(cache_key, entry, timeout=self.timeout)
+
+        etag, body, gzipped, brotlied = entry
+        # Each encoding is a different representation with its own ETag
+        encodings = request.accept_encodings
+        if brotlied is not None and encodings['br']:
+            body, encoding = brotlied, 'br'
+        elif gzipped is not None and encodings['gzip']:
+            body, encoding = gzipped, 'gzip'
+        else:
+            encoding = None
+        if encoding:
+            etag = f'{etag}-{encoding}'
+
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=MIMETYPES[fmt])
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding, Accept'
+        response.headers['X-Data-Version'] = str(version)
+        # Clients may keep the body but must revalidate on every poll
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _serialize(self, data, fmt):
+        body = encode(data, fmt)
+        etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        gzipped = brotlied = None
+        if len(body) >= self.compress_min_size:
+            gzipped = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                brotlied = brotli.compress(body, quality=5)
+        return etag, body, gzipped, brotlied
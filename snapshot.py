@@ -0,0 +1,281 @@
+import mmap
+import os
+import pickle
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from models import Match, MATCH_FIELDS
+from archive import encode_cursor
+
+# One current match: the to_dict() fields plus the keys the lists sort on
+MatchRecord = namedtuple('MatchRecord', MATCH_FIELDS + ('row_id', 'match_time', 'updated_at'))
+
+# Fixtures whose last-changed version is remembered for ?since= deltas
+MAX_TRACKED_CHANGES = 10000
+
+# Bump when the layout of snapshot_state() changes; the record fields are
+# part of the tag too, so files written for other fields are ignored
+SNAPSHOT_FORMAT = 1
+
+
+def _today_key(match_time, row_id):
+    return match_time, row_id
+
+
+def _live_key(updated_at, row_id):
+    # Live is newest first; inverting keeps the key list ascending for bisect
+    return datetime.max - updated_at, -row_id
+
+
+class MatchSnapshot:
+    """Immutable view of every current match, ordered and indexed for the list endpoints.
+
+    Built once per refresh from a single query and never modified, so
+    readers need no locks and no database session - a refresh builds a new
+    snapshot and swaps the reference.
+
+    `changed` maps fixture ids to the version they last changed (or
+    disappeared) in, carried over from snapshot to snapshot, so delta()
+    can answer for any version from `delta_base` on.
+    """
+
+    __slots__ = ('version', 'today', 'live', 'by_fixture', 'by_league', 'by_country', 'by_status',
+                 'changed', 'delta_base', '_today_keys', '_live_keys')
+
+    def __init__(self, records, version=0, changed=None, delta_base=None):
+        self.version = version
+        self.changed = changed or {}
+        self.delta_base = version if delta_base is None else delta_base
+        # Same orders as Match.current() / Match.live() plus the Match.id tie-break
+        self.today = tuple(sorted(records, key=lambda r: _today_key(r.match_time, r.row_id)))
+        self.live = tuple(sorted((r for r in records if r.is_live), key=lambda r: _live_key(r.updated_at, r.row_id)))
+        self._today_keys = [_today_key(r.match_time, r.row_id) for r in self.today]
+        self._live_keys = [_live_key(r.updated_at, r.row_id) for r in self.live]
+
+        self.by_fixture = {r.id: r for r in self.today}
+        indexes = {'league': defaultdict(set), 'country': defaultdict(set), 'status': defaultdict(set)}
+        for r in self.today:
+            for name, index in indexes.items():
+                index[getattr(r, name)].add(r.id)
+        self.by_league, self.by_country, self.by_status = (
+            {key: frozenset(ids) for key, ids in indexes[name].items()} for name in ('league', 'country', 'status')
+        )
+
+    @classmethod
+    def load(cls, version=0, previous=None, changes=None):
+        """Snapshot of Match.current() - the only database access.
+
+        Pass the `previous` snapshot and the `changes` (sync.match_patch()
+        dicts) leading from it to keep deltas going across versions.
+        """
+        records = []
+        for match in Match.current().order_by(None):
+            if match.match_time is None or match.updated_at is None:
+                continue
+            records.append(MatchRecord(**match.to_dict(), row_id=match.id, match_time=match.match_time,
+                                       updated_at=match.updated_at))
+
+        if previous is None or changes is None:
+            return cls(records, version)
+        changed = dict(previous.changed)
+        changed.update((change['id'], version) for change in changes)
+        delta_base = previous.delta_base
+        if len(changed) > MAX_TRACKED_CHANGES:
+            # Forget the oldest - clients that far behind get the full list again
+            by_age = sorted(changed.items(), key=lambda item: item[1])
+            dropped = by_age[:len(changed) - MAX_TRACKED_CHANGES]
+            delta_base = max(delta_base, dropped[-1][1])
+            changed = dict(by_age[len(dropped):])
+        return cls(records, version, changed, delta_base)
+
+    def __len__(self):
+        return len(self.today)
+
+    def _select(self, view, args):
+        """(records, sort keys or None) of the live or today list after the ?league=&country=&status= filters"""
+        live = view == 'live'
+        records, keys = (self.live, self._live_keys) if live else (self.today, self._today_keys)
+
+        allowed = None
+        for index, value in ((self.by_league, args['league']), (self.by_country, args['country'])):
+            if value:
+                ids = index.get(value, frozenset())
+                allowed = ids if allowed is None else allowed & ids
+        if args['status']:
+            ids = frozenset().union(*(self.by_status.get(status, ()) for status in args['status']))
+            allowed = ids if allowed is None else allowed & ids
+
+        if allowed is not None:
+            records = [r for r in records if r.id in allowed]
+            keys = None
+        return records, keys
+
+    def page(self, view, args):
+        """One page of the live or today list - ?cursor= keys are (sort value, Match.id)"""
+        live = view == 'live'
+        key_fn = _live_key if live else _today_key
+        records, keys = self._select(view, args)
+
+        start = 0
+        if args['cursor']:
+            cursor_key = key_fn(*args['cursor'])
+            if keys is None:
+                keys = [key_fn(r.updated_at if live else r.match_time, r.row_id) for r in records]
+            start = bisect_right(keys, cursor_key)
+
+        limit = args['limit']
+        page = records[start:start + limit]
+        has_more = len(records) > start + limit
+
+        next_cursor = None
+        if has_more:
+            last = page[-1]
+            next_cursor = encode_cursor((last.updated_at if live else last.match_time).isoformat(), last.row_id)
+
+        fields = args['fields'] or MATCH_FIELDS
+        return {
+            'matches': [{field: getattr(r, field) for field in fields} for r in page],
+            'success': True,
+            'from_cache': True,
+            'count': len(page),
+            'next_cursor': next_cursor
+        }
+
+    def delta(self, view, args):
+        """What changed in the live or today list after version ?since=, in list order.
+
+        `matches` are the changed fixtures still in the (filtered) list and
+        `removed` the changed ones that are not, to be dropped if the client
+        holds them. When `since` is older than delta_base, or not one of our
+        versions at all, this is the first page of the full list instead,
+        with `delta` false.
+        """
+        since = args['since']
+        if not self.delta_base <= since <= self.version:
+            return dict(self.page(view, args), delta=False, version=self.version)
+
+        fields = args['fields'] or MATCH_FIELDS
+        records, _ = self._select(view, args)
+        matches = [{field: getattr(r, field) for field in fields}
+                   for r in records if self.changed.get(r.id, since) > since]
+        shown = {match['id'] for match in matches}
+        return {
+            'matches': matches,
+            'removed': [fixture_id for fixture_id, version in self.changed.items()
+                        if version > since and fixture_id not in shown],
+            'delta': True,
+            'version': self.version,
+            'success': True,
+            'from_cache': True,
+            'count': len(matches)
+        }
+
+
+class SnapshotStore:
+    """Holds the current MatchSnapshot and swaps in new ones.
+
+    With a `path`, each published snapshot is also pickled to that file
+    (written aside and renamed into place), and every other process
+    picks it up through mmap the next time it reads after the file changed -
+    so only the worker that refreshed ever queries the database for it.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.current = None
+        self.changes = None  # diff that produced `current`, if known
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def publish(self, snapshot, changes=None):
+        if self.path:
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump(snapshot_state(snapshot, changes), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+            self._stamp = self._file_stamp()
+        # A single reference assignment - readers see the old or the new snapshot, never a mix
+        self.current, self.changes = snapshot, changes
+
+    def reload(self):
+        """Pick up a snapshot another process wrote, True if there was one"""
+        if not self.path:
+            return False
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            state = self._read()
+            self._stamp = stamp
+            if state is None:
+                return False
+            self.current, self.changes = state
+            return True
+
+    def watch(self, callback, interval=1.0):
+        """Poll the shared file and call `callback(previous, current, changes)` on news"""
+        def run():
+            while True:
+                time.sleep(interval)
+                previous = self.current
+                try:
+                    if self.reload() and previous is not None:
+                        callback(previous, self.current, self.changes)
+                except Exception as e:
+                    print(f"Snapshot reload failed: {e}")
+
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=run, name='snapshot-watcher', daemon=True)
+                self._watcher.start()
+
+    def get(self, load_fn):
+        """The newest snapshot, from the shared file or `load_fn()` if there is none yet
+
+        A file that cannot be read - truncated, or left behind in another
+        format - counts as none; publishing the loaded snapshot replaces it.
+        """
+        self.reload()
+        if self.current is None:
+            with self._lock:
+                if self.current is None:
+                    self.publish(load_fn())
+        return self.current
+
+    def _file_stamp(self):
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return info.st_mtime_ns, info.st_size, info.st_ino
+
+    def _read(self):
+        """(snapshot, changes) from the shared file, None if it is unreadable or another format"""
+        try:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                state = pickle.loads(mm)
+            if not isinstance(state, tuple) or state[0] != snapshot_format():
+                print(f"Ignoring snapshot file {self.path} in another format")
+                return None
+            _, version, rows, changes, changed, delta_base = state
+            return MatchSnapshot([MatchRecord(*row) for row in rows], version, changed, delta_base), changes
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable snapshot file {self.path}: {e}")
+            return None
+
+
+def snapshot_format():
+    return SNAPSHOT_FORMAT, MatchRecord._fields
+
+
+def snapshot_state(snapshot, changes=None):
+    """(format, version, plain tuples, diff, delta tracking) - what gets pickled for other processes"""
+    return (snapshot_format(), snapshot.version, [tuple(r) for r in snapshot.today], changes,
+            snapshot.changed, snapshot.delta_base)
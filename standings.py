@@ -0,0 +1,193 @@
+from collections import defaultdict
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Standing, StandingContribution, LIVE_STATUSES, FINISHED_STATUSES
+
+STAT_COLUMNS = ('played', 'won', 'drawn', 'lost', 'goals_for', 'goals_against', 'points')
+
+# What a fixture's StandingContribution records, in the order _add() takes them
+CONTRIBUTION_COLUMNS = ('league', 'country', 'home_team', 'away_team', 'kind', 'home_goals', 'away_goals')
+
+
+def contribution(row):
+    """(kind, home_goals, away_goals) a fixture adds to the table, or None"""
+    if row['home_score'] is None or row['away_score'] is None or not row.get('league'):
+        return None
+    if row['status'] in FINISHED_STATUSES:
+        return 'final', row['home_score'], row['away_score']
+    if row['status'] in LIVE_STATUSES:
+        return 'live', row['home_score'], row['away_score']
+    return None
+
+
+def _result_vector(scored, conceded):
+    won, drawn = int(scored > conceded), int(scored == conceded)
+    return (1, won, drawn, int(scored < conceded), scored, conceded, 3 * won + drawn)
+
+
+def _add(deltas, league, country, home, away, kind, home_goals, away_goals, sign):
+    for team, vector in ((home, _result_vector(home_goals, away_goals)),
+                         (away, _result_vector(away_goals, home_goals))):
+        totals = deltas[(league, country, team, kind)]
+        for i, value in enumerate(vector):
+            totals[i] += sign * value
+
+
+def apply_standing_changes(rows, changes):
+    """Apply the standings delta of one refresh.
+
+    For every fixture the sync reported as changed, the contribution it
+    made last time (from StandingContribution) is subtracted and its new
+    contribution added, so the cost depends on what changed rather than on
+    how much history exists. Live scores count as 'live' (provisional)
+    rows until the match finishes. Nothing is committed here.
+    """
+    by_id = {row['fixture_id']: row for row in rows}
+    fixture_ids = [change['id'] for change in changes]
+    if not fixture_ids:
+        return 0
+
+    applied = {
+        entry.fixture_id: entry
+        for entry in StandingContribution.query.filter(StandingContribution.fixture_id.in_(fixture_ids))
+    }
+
+    deltas = defaultdict(lambda: [0] * len(STAT_COLUMNS))
+    upserts, deletes = [], []
+
+    for change in changes:
+        fixture_id = change['id']
+        old = applied.get(fixture_id)
+        row = by_id.get(fixture_id)
+
+        if change.get('removed') or row is None:
+            # Dropping out of the feed only cancels a provisional result
+            if old is None or old.kind != 'live':
+                continue
+            new = None
+            league, country, home, away = old.league, old.country, old.home_team, old.away_team
+        else:
+            new = contribution(row)
+            league, country, home, away = row['league'], row.get('country') or '', row['home_team'], row['away_team']
+
+        old_state = tuple(getattr(old, column) for column in CONTRIBUTION_COLUMNS) if old else None
+        new_state = (league, country, home, away) + new if new else None
+        if old_state == new_state:
+            continue
+
+        if old_state:
+            _add(deltas, *old_state, sign=-1)
+        if new_state:
+            _add(deltas, *new_state, sign=1)
+            upserts.append(dict(zip(CONTRIBUTION_COLUMNS, new_state), fixture_id=fixture_id))
+        else:
+            deletes.append(fixture_id)
+
+    _apply_deltas(deltas)
+    for entry in upserts:
+        db.session.merge(StandingContribution(**entry))
+    if deletes:
+        StandingContribution.query.filter(StandingContribution.fixture_id.in_(deletes)).delete(
+            synchronize_session=False
+        )
+    return len(upserts) + len(deletes)
+
+
+def _apply_deltas(deltas):
+    """Add deltas to Standing rows with one INSERT ... ON CONFLICT DO UPDATE"""
+    rows = [
+        dict(zip(STAT_COLUMNS, totals), league=league, country=country, team=team, kind=kind)
+        for (league, country, team, kind), totals in deltas.items() if any(totals)
+    ]
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(Standing.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['league', 'country', 'team', 'kind'],
+            set_={c: getattr(Standing.__table__.c, c) + stmt.excluded[c] for c in STAT_COLUMNS}
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        key = {column: row[column] for column in ('league', 'country', 'team', 'kind')}
+        standing = Standing.query.filter_by(**key).first()
+        if standing is None:
+            standing = Standing(**key, **{c: 0 for c in STAT_COLUMNS})
+            db.session.add(standing)
+        for c in STAT_COLUMNS:
+            setattr(standing, c, getattr(standing, c) + row[c])
+
+
+def league_countries(league):
+    """Countries with a table for a league of this name, '' standing for unknown"""
+    return sorted(country for (country,) in
+                  db.session.query(Standing.country).filter(Standing.league == league).distinct())
+
+
+def league_table(league, country='', provisional=False):
+    """Sorted table for a league; provisional adds in-play results"""
+    kinds = ('final', 'live') if provisional else ('final',)
+    totals = defaultdict(lambda: [0] * len(STAT_COLUMNS))
+    for standing in Standing.query.filter(Standing.league == league, Standing.country == country,
+                                          Standing.kind.in_(kinds)):
+        for i, c in enumerate(STAT_COLUMNS):
+            totals[standing.team][i] += getattr(standing, c)
+
+    table = [dict(zip(STAT_COLUMNS, values), team=team) for team, values in totals.items() if values[0]]
+    for entry in table:
+        entry['goal_difference'] = entry['goals_for'] - entry['goals_against']
+    table.sort(key=lambda e: (-e['points'], -e['goal_difference'], -e['goals_for'], e['team']))
+    for rank, entry in enumerate(table, start=1):
+        entry['rank'] = rank
+    return table
+
+
+def compute_from_scratch(rows):
+    """Contributions and Standing totals computed directly from fixture rows"""
+    contributions, deltas = {}, defaultdict(lambda: [0] * len(STAT_COLUMNS))
+    for row in rows:
+        new = contribution(row)
+        if new:
+            state = (row['league'], row.get('country') or '', row['home_team'], row['away_team']) + new
+            contributions[row['fixture_id']] = state
+            _add(deltas, *state, sign=1)
+    totals = {key: tuple(values) for key, values in deltas.items() if any(values)}
+    return contributions, totals
+
+
+def stored_totals():
+    return {
+        (s.league, s.country, s.team, s.kind): tuple(getattr(s, c) for c in STAT_COLUMNS)
+        for s in Standing.query
+        if any(getattr(s, c) for c in STAT_COLUMNS)
+    }
+
+
+def rebuild_standings(rows, verify_only=False):
+    """Recompute Standing from scratch and compare with the incremental state.
+
+    Returns the list of (league, country, team, kind) keys that differed. Unless
+    verify_only is set the tables are then replaced with the recomputed
+    state (the caller commits).
+    """
+    contributions, totals = compute_from_scratch(rows)
+    stored = stored_totals()
+    mismatches = sorted(key for key in set(totals) | set(stored) if totals.get(key) != stored.get(key))
+
+    if not verify_only:
+        Standing.query.delete()
+        StandingContribution.query.delete()
+        db.session.add_all(
+            Standing(league=league, country=country, team=team, kind=kind, **dict(zip(STAT_COLUMNS, values)))
+            for (league, country, team, kind), values in totals.items()
+        )
+        db.session.add_all(
+            StandingContribution(fixture_id=fixture_id, **dict(zip(CONTRIBUTION_COLUMNS, state)))
+            for fixture_id, state in contributions.items()
+        )
+
+    return mismatches
@@ -1,20 +1,111 @@
+// Matches fetched per page, and the fields the match cards actually use
+const MATCH_PAGE_SIZE = 50;
+const MATCH_FIELDS = 'id,home_team,away_team,home_logo,away_logo,home_score,away_score,status,elapsed,time,league,league_logo,venue';
+// Patch fields that only swap an image on a card
+const LOGO_SELECTORS = [['home_logo', '.home-logo'], ['away_logo', '.away-logo'], ['league_logo', '.league-logo']];
+const LOGO_FIELDS = new Set(LOGO_SELECTORS.map(([field]) => field));
+
 class FootballApp {
     constructor() {
         this.currentView = 'live';
         this.selectedMatch = null;
+        this.nextCursor = null;
+        this.loadingMore = false;
         this.init();
     }
 
     init() {
         this.bindEvents();
         this.loadMatches('live');
+        this.connectStream();
         this.updateStatus('Ready');
     }
 
+    connectStream() {
+        if (!window.EventSource) return;
+
+        // Score changes are pushed as patches instead of re-fetching the list
+        this.stream = new EventSource('/api/stream/live');
+        this.stream.addEventListener('patch', event => this.applyPatch(JSON.parse(event.data)));
+        this.stream.addEventListener('reset', () => this.loadMatches(this.currentView));
+    }
+
+    applyPatch(patch) {
+        patch.changes.forEach(change => {
+            const element = document.querySelector(`.match[data-id="${change.id}"]`);
+            const belongsHere = this.currentView === 'today' || change.is_live !== false;
+
+            if (change.removed || !belongsHere) {
+                if (element) element.remove();
+            } else if (change.added) {
+                if (element) element.remove();
+                if (this.currentView === 'today' || change.is_live) this.insertMatch(change);
+            } else if (element) {
+                this.patchMatchElement(element, change);
+            }
+        });
+    }
+
+    insertMatch(match) {
+        const container = document.getElementById('matches');
+        if (!container.querySelector('.match')) container.innerHTML = '';
+
+        const wrapper = document.createElement('div');
+        wrapper.innerHTML = this.createMatchHTML(match).trim();
+        const element = wrapper.firstElementChild;
+        element.addEventListener('click', () => this.selectMatch(element.dataset.id, element));
+
+        // Today is ordered by kick-off, live by most recently updated
+        const matches = [...container.querySelectorAll('.match')];
+        const before = this.currentView === 'today'
+            ? matches.find(el => el.dataset.time > (match.time || ''))
+            : matches[0];
+        // Past the last loaded page - it arrives with the next one
+        if (!before && this.nextCursor) return;
+        container.insertBefore(element, before || null);
+    }
+
+    patchMatchElement(element, change) {
+        // Logos arrive on their own once downloaded - swap the image, it is not a match update
+        LOGO_SELECTORS.forEach(([field, selector]) => {
+            const img = element.querySelector(selector);
+            if (field in change && img) img.src = change[field];
+        });
+        if (Object.keys(change).every(field => field === 'id' || LOGO_FIELDS.has(field))) return;
+
+        if ('home_score' in change) element.querySelector('.home-score').textContent = change.home_score ?? '-';
+        if ('away_score' in change) element.querySelector('.away-score').textContent = change.away_score ?? '-';
+
+        const badge = element.querySelector('.status-badge');
+        const status = change.status ?? badge.dataset.status;
+        const elapsed = 'elapsed' in change ? change.elapsed : Number(badge.dataset.elapsed) || null;
+        badge.dataset.status = status;
+        badge.dataset.elapsed = elapsed ?? '';
+        badge.className = `status-badge ${this.getStatusClass(status)}`;
+        badge.textContent = `${status}${elapsed ? ` ${elapsed}'` : ''}`;
+
+        element.classList.remove('updated');
+        void element.offsetWidth;
+        element.classList.add('updated');
+    }
+
     bindEvents() {
         document.getElementById('live-tab').addEventListener('click', () => this.switchTab('live'));
         document.getElementById('today-tab').addEventListener('click', () => this.switchTab('today'));
         document.getElementById('refresh-btn').addEventListener('click', () => this.refreshData());
+
+        // Fetch the next page when the list is scrolled near its end
+        const container = document.getElementById('matches');
+        container.addEventListener('scroll', () => {
+            if (container.scrollTop + container.clientHeight >= container.scrollHeight - 300) this.loadMore();
+        });
+    }
+
+    matchesUrl(type, cursor) {
+        const endpoint = type === 'live' ? '/api/live-matches' : '/api/today-matches';
+        const params = new URLSearchParams({ limit: MATCH_PAGE_SIZE, fields: MATCH_FIELDS });
+        if (cursor) params.set('cursor', cursor);
+        return `${endpoint}?${params}`;
     }
 
     switchTab(view) {
@@ -32,12 +123,13 @@ class FootballApp {
         btn.textContent = 'Refreshing...';
 
         try {
+            // Only signal the refresher - the new scores arrive over the stream
             const response = await fetch('/api/refresh-cache');
             const data = await response.json();
 
             if (data.success) {
-                this.updateStatus(`Updated: ${data.matches_count} matches`);
-                this.loadMatches(this.currentView);
+                this.updateStatus('Refresh requested');
+                if (!this.stream) this.loadMatches(this.currentView);
             } else {
                 this.updateStatus('Error: ' + data.error);
             }
@@ -60,13 +152,14 @@ class FootballApp {
     async loadMatches(type) {
         const container = document.getElementById('matches');
         container.innerHTML = '<div class="loading"><div class="spinner"></div><p>Loading matches...</p></div>';
+        this.nextCursor = null;
 
         try {
-            const endpoint = type === 'live' ? '/api/live-matches' : '/api/today-matches';
-            const response = await fetch(endpoint);
+            const response = await fetch(this.matchesUrl(type));
             const data = await response.json();
 
             if (data.success) {
+                this.nextCursor = data.next_cursor;
                 this.renderMatches(data.matches);
                 this.updateStatus(`${data.matches.length} matches loaded`);
             } else {
@@ -77,6 +170,34 @@ class FootballApp {
         }
     }
 
+    async loadMore() {
+        if (!this.nextCursor || this.loadingMore) return;
+        this.loadingMore = true;
+
+        const view = this.currentView;
+        try {
+            const response = await fetch(this.matchesUrl(view, this.nextCursor));
+            const data = await response.json();
+            // The tab may have changed while the page was in flight
+            if (!data.success || view !== this.currentView) return;
+
+            this.nextCursor = data.next_cursor;
+            data.matches.forEach(match => {
+                if (document.querySelector(`.match[data-id="${match.id}"]`)) return;
+                const wrapper = document.createElement('div');
+                wrapper.innerHTML = this.createMatchHTML(match).trim();
+                const element = wrapper.firstElementChild;
+                element.addEventListener('click', () => this.selectMatch(element.dataset.id, element));
+                document.getElementById('matches').appendChild(element);
+            });
+            this.updateStatus(`${document.querySelectorAll('.match').length} matches loaded`);
+        } catch (error) {
+            this.updateStatus('Failed to load more matches');
+        } finally {
+            this.loadingMore = false;
+        }
+    }
+
     renderMatches(matches) {
         const container = document.getElementById('matches');
 
@@ -97,26 +218,26 @@ class FootballApp {
         const timeDisplay = this.formatTime(match.time);
 
         return `
-            <div class="match" data-id="${match.id}">
+            <div class="match" data-id="${match.id}" data-time="${match.time || ''}">
                 <div class="match-header">
                     <div class="match-teams">
                         <div class="team">
-                            <img src="${match.home_logo}" alt="${match.home_team}" class="team-logo">
+                            <img src="${match.home_logo}" alt="${match.home_team}" class="team-logo home-logo">
                             <span class="team-name">${match.home_team}</span>
                         </div>
                         <div class="team">
-                            <img src="${match.away_logo}" alt="${match.away_team}" class="team-logo">
+                            <img src="${match.away_logo}" alt="${match.away_team}" class="team-logo away-logo">
                             <span class="team-name">${match.away_team}</span>
                         </div>
                     </div>
 
                     <div class="match-score">
-                        <div class="score">${match.home_score ?? '-'}</div>
-                        <div class="score">${match.away_score ?? '-'}</div>
+                        <div class="score home-score">${match.home_score ?? '-'}</div>
+                        <div class="score away-score">${match.away_score ?? '-'}</div>
                     </div>
 
                     <div class="match-status">
-                        <span class="status-badge ${statusClass}">
+                        <span class="status-badge ${statusClass}" data-status="${match.status}" data-elapsed="${match.elapsed ?? ''}">
                             ${match.status}${match.elapsed ? ` ${match.elapsed}'` : ''}
                         </span>
                         ${timeDisplay ? `<div class="match-time">${timeDisplay}</div>` : ''}
@@ -124,6 +245,7 @@ class FootballApp {
                 </div>
 
                 <div class="match-footer">
+                    ${match.league_logo ? `<img src="${match.league_logo}" alt="" class="league-logo">` : ''}
                     ${match.league}${match.venue ? ` • ${match.venue}` : ''}
                 </div>
             </div>
@@ -381,21 +503,24 @@ async refreshData() {
     btn.style.background = 'linear-gradient(135deg, #ff9a8b, #F87060)';
 
     try {
+        // Only signal the refresher - the new scores arrive over the stream,
+        // the response describes the last refresh that finished
         const response = await fetch('/api/refresh-cache');
         const data = await response.json();
 
         if (data.success) {
-            // Show success message with data source
-            let message = data.message;
-            if (data.data_source === 'live_api') {
-                this.updateStatus(`🔴 LIVE: ${data.matches_count} matches`);
-                this.showNotification('✅ Live data refreshed successfully!', 'success');
+            if (data.data_source === 'upstream_cache' || data.data_source === 'last_good') {
+                this.updateStatus(`⚠️ STALE: ${data.matches_count} matches`);
+                this.showNotification(data.message, 'warning');
             } else if (data.data_source === 'static_fallback') {
                 this.updateStatus(`⚠️ FALLBACK: ${data.matches_count} matches`);
                 this.showNotification('⚠️ API unavailable, using test data', 'warning');
+            } else {
+                this.updateStatus('🔄 Refresh requested');
+                this.showNotification('🔄 Refresh requested - live scores update as they arrive', 'info');
             }
 
-            this.loadMatches(this.currentView);
+            if (!this.stream) this.loadMatches(this.currentView);
         } else {
             this.updateStatus('❌ Refresh failed');
             this.showNotification('❌ ' + data.error, 'error');
@@ -0,0 +1,237 @@
+import os
+import threading
+import numpy as np
+
+FRAME_COLUMNS = ('league', 'country', 'home_team', 'away_team', 'home_score', 'away_score')
+
+# Encoded columns of one month, as saved next to its archive partition
+PART_ARRAYS = ('league', 'home', 'away', 'home_goals', 'away_goals')
+
+
+def _encode(values, index):
+    """Integer codes for `values`, growing the name -> code `index` as needed"""
+    for value in set(values).difference(index):
+        index[value] = len(index)
+    return np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+def encode_rows(rows, teams, leagues):
+    """Column arrays for FRAME_COLUMNS rows, using the shared team and (league, country) codes"""
+    columns = list(zip(*rows)) if rows else [()] * len(FRAME_COLUMNS)
+    return (
+        _encode([(league, country or '') for league, country in zip(columns[0], columns[1])], leagues),
+        _encode(columns[2], teams),
+        _encode(columns[3], teams),
+        np.fromiter(columns[4], dtype=np.int16, count=len(columns[4])),
+        np.fromiter(columns[5], dtype=np.int16, count=len(columns[5]))
+    )
+
+
+class FixtureFrame:
+    """Finished fixtures as NumPy columns, teams and leagues as integer codes.
+
+    Rows are in kick-off order, so "the last N matches" is just the tail of
+    a boolean mask.
+    """
+
+    def __init__(self, parts, teams, leagues):
+        self.teams, self.leagues = teams, leagues
+        columns = [np.concatenate(column) for column in zip(*parts)] if parts else encode_rows([], {}, {})
+        self.league, self.home, self.away, self.home_goals, self.away_goals = columns
+        self.team_names = np.array(list(teams), dtype=object)
+
+    @classmethod
+    def from_rows(cls, rows):
+        teams, leagues = {}, {}
+        return cls([encode_rows(rows, teams, leagues)], teams, leagues)
+
+    def __len__(self):
+        return len(self.home)
+
+    def countries(self, league):
+        """Countries with a league of this name, '' standing for unknown"""
+        return sorted(country for name, country in self.leagues if name == league)
+
+    def league_table(self, league, country=''):
+        """Standings for one league, or None if the league is unknown"""
+        code = self.leagues.get((league, country))
+        if code is None:
+            return None
+
+        mask = self.league == code
+        home, away = self.home[mask], self.away[mask]
+        hg, ag = self.home_goals[mask].astype(np.int64), self.away_goals[mask].astype(np.int64)
+        size = len(self.teams)
+
+        def count(codes, weights=None):
+            return np.bincount(codes, weights=weights, minlength=size).astype(np.int64)
+
+        played = count(home) + count(away)
+        won = count(home[hg > ag]) + count(away[ag > hg])
+        drawn = count(home[hg == ag]) + count(away[hg == ag])
+        goals_for = count(home, hg) + count(away, ag)
+        goals_against = count(home, ag) + count(away, hg)
+        points = 3 * won + drawn
+        difference = goals_for - goals_against
+
+        teams = np.flatnonzero(played)
+        # Points, then goal difference, then goals scored, all descending
+        order = teams[np.lexsort((-goals_for[teams], -difference[teams], -points[teams]))]
+
+        return [
+            {
+                'rank': rank,
+                'team': self.team_names[t],
+                'played': int(played[t]),
+                'won': int(won[t]),
+                'drawn': int(drawn[t]),
+                'lost': int(played[t] - won[t] - drawn[t]),
+                'goals_for': int(goals_for[t]),
+                'goals_against': int(goals_against[t]),
+                'goal_difference': int(difference[t]),
+                'points': int(points[t])
+            }
+            for rank, t in enumerate(order, start=1)
+        ]
+
+    def team_stats(self, team, form=5, opponent=None):
+        """Overall, home and away record plus recent form (and head-to-head)"""
+        code = self.teams.get(team)
+        if code is None:
+            return None
+
+        at_home, away = self.home == code, self.away == code
+        stats = {
+            'team': team,
+            'overall': self._record(at_home, away),
+            'home': self._record(at_home, np.zeros_like(away)),
+            'away': self._record(np.zeros_like(at_home), away),
+            'form': self._form(at_home, away, form)
+        }
+
+        if opponent is not None:
+            other = self.teams.get(opponent)
+            if other is None:
+                stats['head_to_head'] = None
+            else:
+                h2h_home = at_home & (self.away == other)
+                h2h_away = away & (self.home == other)
+                stats['head_to_head'] = dict(
+                    self._record(h2h_home, h2h_away),
+                    opponent=opponent,
+                    form=self._form(h2h_home, h2h_away, form)
+                )
+
+        return stats
+
+    def _record(self, at_home, away):
+        """W/D/L and goals for matches selected by two masks (team at home / away)"""
+        hg, ag = self.home_goals, self.away_goals
+        goals_for = int(hg[at_home].sum()) + int(ag[away].sum())
+        goals_against = int(ag[at_home].sum()) + int(hg[away].sum())
+        won = int(np.count_nonzero(at_home & (hg > ag)) + np.count_nonzero(away & (ag > hg)))
+        drawn = int(np.count_nonzero((at_home | away) & (hg == ag)))
+        played = int(np.count_nonzero(at_home | away))
+        return {
+            'played': played,
+            'won': won,
+            'drawn': drawn,
+            'lost': played - won - drawn,
+            'goals_for': goals_for,
+            'goals_against': goals_against,
+            'points': 3 * won + drawn
+        }
+
+    def _form(self, at_home, away, last):
+        """Results of the last `last` matches, oldest first, as 'W'/'D'/'L'"""
+        rows = np.flatnonzero(at_home | away)[-last:] if last > 0 else np.array([], dtype=np.int64)
+        scored = np.where(at_home[rows], self.home_goals[rows], self.away_goals[rows])
+        conceded = np.where(at_home[rows], self.away_goals[rows], self.home_goals[rows])
+        return np.where(scored > conceded, 'W', np.where(scored == conceded, 'D', 'L')).tolist()
+
+
+class StatsEngine:
+    """Keeps a FixtureFrame of the archive, re-reading only partitions that changed.
+
+    Past months never change, so after the first load a refresh that
+    archives today's results only re-encodes the current month. Each
+    month's encoded columns are also saved next to its partition
+    (stats-YYYY-MM.npz, with the partition's stamp), so a new process
+    loads them instead of scanning every partition again.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.teams, self.leagues = {}, {}
+        self._parts = {}  # month -> (stamp, encoded columns)
+        self._stamps = None
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def frame(self):
+        stamps = self.archive.partition_stamps()
+        if self._frame is not None and stamps == self._stamps:
+            return self._frame
+
+        with self._lock:
+            if self._frame is None or stamps != self._stamps:
+                for month, stamp in stamps.items():
+                    cached = self._parts.get(month)
+                    if cached is None or cached[0] != stamp:
+                        self._parts[month] = (stamp, self._load_part(month, stamp))
+                for month in set(self._parts) - set(stamps):
+                    del self._parts[month]
+
+                parts = [self._parts[month][1] for month in sorted(self._parts)]
+                self._frame = FixtureFrame(parts, dict(self.teams), dict(self.leagues))
+                self._stamps = stamps
+            return self._frame
+
+    def part_path(self, month):
+        return os.path.join(self.archive.directory, f'stats-{month}.npz')
+
+    def _load_part(self, month, stamp):
+        """Encoded columns of one month - from its saved copy if the partition has not changed since"""
+        path = self.part_path(month)
+        saved = None
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    if np.array_equal(data['stamp'], np.array(stamp, dtype=np.int64).ravel()):
+                        saved = {name: data[name] for name in data.files}
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable {path}: {e}")
+
+        if saved is None:
+            # Month-local codes, so the saved copy does not depend on what else this process loaded
+            teams, leagues = {}, {}
+            rows = list(self.archive.read_columns(
+                FRAME_COLUMNS, where='home_score IS NOT NULL AND away_score IS NOT NULL', months=[month]
+            ))
+            saved = dict(
+                zip(PART_ARRAYS, encode_rows(rows, teams, leagues)),
+                stamp=np.array(stamp, dtype=np.int64).ravel(),
+                teams=np.array(list(teams), dtype=str),
+                league_names=np.array([name for name, _ in leagues], dtype=str),
+                countries=np.array([country for _, country in leagues], dtype=str)
+            )
+            self._save_part(path, saved)
+
+        # Month-local codes -> this engine's codes
+        teams = np.array([self.teams.setdefault(name, len(self.teams)) for name in saved['teams'].tolist()],
+                         dtype=np.int32)
+        leagues = np.array([self.leagues.setdefault(key, len(self.leagues))
+                            for key in zip(saved['league_names'].tolist(), saved['countries'].tolist())],
+                           dtype=np.int32)
+        return (leagues[saved['league']], teams[saved['home']], teams[saved['away']],
+                saved['home_goals'], saved['away_goals'])
+
+    @staticmethod
+    def _save_part(path, arrays):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not save {path}: {e}")
@@ -0,0 +1,184 @@
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Match
+from dimensions import intern_dimensions
+
+# Columns that actually move between refreshes - everything else on a
+# fixture (teams, league, venue) is written once on insert
+SYNC_COLUMNS = ('home_score', 'away_score', 'status', 'elapsed', 'match_time', 'is_live')
+INSERT_COLUMNS = ('fixture_id', 'home_team_id', 'away_team_id', 'league_id', 'venue') + SYNC_COLUMNS
+
+
+def parse_fixture(match_data, is_live=False):
+    """Turn one API-Football fixture into a row dict - team and league names, not keys yet"""
+    fixture = match_data['fixture']
+    teams = match_data['teams']
+    return {
+        'fixture_id': fixture['id'],
+        'home_team_api_id': teams['home'].get('id'),
+        'away_team_api_id': teams['away'].get('id'),
+        'league_api_id': match_data['league'].get('id'),
+        'home_team': teams['home']['name'],
+        'away_team': teams['away']['name'],
+        'home_logo': teams['home']['logo'],
+        'away_logo': teams['away']['logo'],
+        'home_score': match_data['goals']['home'],
+        'away_score': match_data['goals']['away'],
+        'status': fixture['status']['short'],
+        'elapsed': fixture['status']['elapsed'],
+        'match_time': datetime.fromisoformat(fixture['date'].replace('Z', '+00:00')),
+        'league': match_data['league']['name'],
+        'country': match_data['league'].get('country'),
+        'league_logo': match_data['league']['logo'],
+        'venue': fixture['venue']['name'] if fixture['venue'] else '',
+        'is_live': is_live
+    }
+
+
+def parse_static_match(match_data):
+    """Turn one STATIC_MATCHES entry into a row dict like parse_fixture()'s, without upstream ids"""
+    return {
+        'fixture_id': match_data['id'],
+        'home_team': match_data['home_team'],
+        'away_team': match_data['away_team'],
+        'home_logo': match_data['home_logo'],
+        'away_logo': match_data['away_logo'],
+        'home_score': match_data['home_score'],
+        'away_score': match_data['away_score'],
+        'status': match_data['status'],
+        'elapsed': match_data['elapsed'],
+        'match_time': datetime.fromisoformat(match_data['time'].replace('Z', '+00:00')),
+        'league': match_data['league'],
+        'country': match_data.get('country'),
+        'league_logo': match_data['league_logo'],
+        'venue': match_data['venue'],
+        'is_live': match_data['is_live']
+    }
+
+
+def merge_fixture_rows(live_rows, today_rows):
+    """Merge live and today rows by fixture_id - the live version wins"""
+    merged = {row['fixture_id']: row for row in today_rows}
+    merged.update((row['fixture_id'], row) for row in live_rows)
+    return list(merged.values())
+
+
+def match_patch(fixture_id, values):
+    """A client-side patch for one fixture, keyed like Match.to_dict()"""
+    patch = {'id': fixture_id}
+    for column, value in values.items():
+        if column == 'match_time':
+            patch['time'] = value.replace(tzinfo=None).isoformat() if value else None
+        elif column in ('fixture_id', 'expired_at') or column.endswith('_id'):
+            continue
+        else:
+            patch[column] = value
+    return patch
+
+
+def _differs(stored, incoming):
+    # SQLite hands back naive datetimes, the API gives offset-aware ones
+    if isinstance(incoming, datetime) and isinstance(stored, datetime):
+        return stored != incoming.replace(tzinfo=None)
+    return stored != incoming
+
+
+def upsert_matches(rows):
+    """Batch write rows with INSERT ... ON CONFLICT(fixture_id) DO UPDATE"""
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        stmt = sqlite.insert(Match.__table__)
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(Match.__table__)
+    else:
+        # No portable upsert - plain bulk insert, the caller already diffed
+        db.session.bulk_insert_mappings(Match, rows)
+        return
+
+    # Another worker may have inserted the fixture since we diffed
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['fixture_id'],
+        set_={c: stmt.excluded[c] for c in SYNC_COLUMNS + ('updated_at', 'expired_at')}
+    )
+    db.session.execute(stmt, rows)
+
+
+def sync_matches(rows, now=None, changes=None, complete=True):
+    """Differential sync of incoming fixture rows against the Match table.
+
+    New fixtures are bulk inserted (their teams and league interned first),
+    known fixtures are updated only when one of SYNC_COLUMNS changed, and
+    stored fixtures missing from `rows` are soft-expired instead of deleted -
+    unless `complete` is false, for a refresh that only re-polled some
+    fixtures. Nothing is committed here so the caller can keep the whole
+    refresh in a single transaction.
+
+    Pass a list as `changes` to collect per-fixture diffs (see match_patch).
+    """
+    now = now or datetime.utcnow()
+    incoming = {row['fixture_id']: row for row in rows}
+
+    # One SELECT for the current state of every stored fixture (that came in)
+    existing = db.session.query(
+        Match.id, Match.fixture_id, Match.expired_at, *[getattr(Match, c) for c in SYNC_COLUMNS]
+    )
+    if not complete:
+        existing = existing.filter(Match.fixture_id.in_(list(incoming)))
+    existing = existing.all()
+
+    inserts, updates, stale_ids = [], [], []
+    seen = set()
+
+    for stored in existing:
+        seen.add(stored.fixture_id)
+        row = incoming.get(stored.fixture_id)
+
+        if row is None:
+            if stored.expired_at is None:
+                stale_ids.append(stored.id)
+                if changes is not None:
+                    changes.append({'id': stored.fixture_id, 'removed': True})
+            continue
+
+        diff = {c: row[c] for c in SYNC_COLUMNS if _differs(getattr(stored, c), row[c])}
+        if stored.expired_at is not None:
+            diff['expired_at'] = None
+        if diff:
+            if changes is not None:
+                # A fixture coming back from expiry is new to clients
+                revived = stored.expired_at is not None
+                changes.append(dict(match_patch(stored.fixture_id, row), added=True) if revived
+                               else match_patch(stored.fixture_id, diff))
+            diff['id'] = stored.id
+            diff['updated_at'] = now
+            updates.append(diff)
+
+    new_rows = [row for fixture_id, row in incoming.items() if fixture_id not in seen]
+    intern_dimensions(new_rows)
+    for row in new_rows:
+        inserts.append(dict({c: row[c] for c in INSERT_COLUMNS}, created_at=now, updated_at=now, expired_at=None))
+        if changes is not None:
+            changes.append(dict(match_patch(row['fixture_id'], row), added=True))
+
+    upsert_matches(inserts)
+    if updates:
+        db.session.bulk_update_mappings(Match, updates)
+    if stale_ids:
+        db.session.query(Match).filter(Match.id.in_(stale_ids)).update(
+            {'expired_at': now, 'is_live': False}, synchronize_session=False
+        )
+
+    return {
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'expired': len(stale_ids),
+        'unchanged': len(incoming) - len(inserts) - len(updates)
+    }
+
+
+def prune_expired(before):
+    """Hard-delete matches that expired before `before` - they live in the archive"""
+    return db.session.query(Match).filter(Match.expired_at < before).delete(synchronize_session=False)
@@ -0,0 +1,220 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from itertools import islice
+import gzip
+import io
+import json
+import shutil
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from upstream_cache import CircuitOpen, cache_key
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class UpstreamClient:
+    """Shared keep-alive client for the Football API.
+
+    One requests.Session with a pooled adapter so TLS connections are reused
+    between calls, urllib3 retries with exponential backoff on connection
+    errors / 429 / 5xx, and a small thread pool to run independent calls
+    side by side.
+
+    `on_call(path, status, seconds)` is told about every call, status
+    being the HTTP code or 'error' when no response came back.
+
+    With a `store` (upstream_cache.ResponseStore) every good body is kept,
+    and a call is answered from it - `on_cache(result)` says which way:
+      fresh        younger than `fresh_for` seconds, upstream not called
+      revalidated  upstream answered within `stale_after` seconds
+      stale        upstream was slow, failing or its `breaker` open - the
+                   stored body is served and a slow call still updates it
+      miss         nothing stored, so the caller waited for upstream
+    """
+
+    def __init__(self, base_url, headers, timeout=10, retries=2, backoff=0.5, pool_size=10, on_call=None,
+                 store=None, breaker=None, fresh_for=0, stale_after=None, on_cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.on_call = on_call
+        self.store = store
+        self.breaker = breaker
+        self.fresh_for = fresh_for
+        self.stale_after = stale_after
+        self.on_cache = on_cache
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='upstream')
+        # Downloads get their own pool - run_parallel calls wait on them from `executor`
+        self._downloads = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='upstream-download')
+        self._inflight = {}  # cache key -> Future of the download
+        self._stale = {}  # cache key -> fetched_at of the body served instead
+        self._lock = threading.Lock()
+
+    def _request(self, path, params, stream=False):
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout, stream=stream)
+            status = response.status_code
+            return response
+        finally:
+            if self.on_call:
+                self.on_call(path, status, time.perf_counter() - start)
+
+    def get(self, path, params=None):
+        """GET an endpoint and return the decoded JSON body"""
+        if self.store is not None:
+            with self._stored_body(path, params) as body:
+                return json.load(body)
+
+        response = self._request(path, params)
+        if response.status_code != 200:
+            raise Exception(f"API returned status code {response.status_code}")
+        return response.json()
+
+    def iter_items(self, path, params=None, prefix='response.item', limit=None):
+        """GET an endpoint and yield the elements of one array as they are parsed.
+
+        The body is streamed through ijson, so only the current element is
+        held in memory however large the payload is, and once `limit`
+        elements have been yielded the connection is closed without reading
+        the rest. Without ijson installed this falls back to get().
+
+        With a store the whole body is downloaded (gzipped as it arrives, so
+        it can be served again) and then streamed through ijson the same way.
+        """
+        if ijson is None:
+            yield from islice(_select(self.get(path, params), prefix), limit)
+            return
+
+        if self.store is not None:
+            with self._stored_body(path, params) as body:
+                yield from islice(ijson.items(body, prefix, use_float=True), limit)
+            return
+
+        response = self._request(path, params, stream=True)
+        try:
+            if response.status_code != 200:
+                raise Exception(f"API returned status code {response.status_code}")
+            # Let urllib3 undo gzip/deflate before the parser sees the bytes
+            response.raw.decode_content = True
+            yield from islice(ijson.items(response.raw, prefix, use_float=True), limit)
+        finally:
+            response.close()
+
+    def _stored_body(self, path, params):
+        """File-like body for a request: stored, freshly downloaded, or stale - see the class docstring"""
+        key = cache_key(path, params)
+        entry = self.store.get(key)
+        if entry is not None and time.time() - entry[1] < self.fresh_for:
+            return self._serve(key, entry, 'fresh')
+
+        if self.breaker is not None and not self.breaker.allow():
+            if entry is None:
+                raise CircuitOpen(f"Upstream circuit open, nothing stored for {path}")
+            return self._serve(key, entry, 'stale')
+
+        download = self._download(key, path, params)
+        try:
+            # With nothing stored there is no choice but to wait it out
+            body = download.result(timeout=self.stale_after if entry is not None else None)
+        except FutureTimeout:
+            print(f"Upstream slow for {path} - serving the stored copy meanwhile")
+            return self._serve(key, entry, 'stale')
+        except Exception as e:
+            if entry is None:
+                raise
+            print(f"Upstream failed for {path} ({e}) - serving the stored copy")
+            return self._serve(key, entry, 'stale')
+        return self._serve(key, (body, time.time()), 'revalidated' if entry is not None else 'miss')
+
+    def _serve(self, key, entry, result):
+        with self._lock:
+            if result == 'stale':
+                self._stale[key] = entry[1]
+            else:
+                self._stale.pop(key, None)
+        if self.on_cache:
+            self.on_cache(result)
+        return gzip.GzipFile(fileobj=io.BytesIO(entry[0]))
+
+    def _download(self, key, path, params):
+        """Fetch and store a body in the background - one download per key at a time"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._downloads.submit(self._fetch_and_store, key, path, params)
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    def _fetch_and_store(self, key, path, params):
+        try:
+            response = self._request(path, params, stream=True)
+            try:
+                if response.status_code != 200:
+                    raise Exception(f"API returned status code {response.status_code}")
+                response.raw.decode_content = True
+                buffer = io.BytesIO()
+                with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=5) as gz:
+                    shutil.copyfileobj(response.raw, gz, 64 * 1024)
+            finally:
+                response.close()
+        except Exception:
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        body = buffer.getvalue()
+        self.store.put(key, path, body)
+        with self._lock:
+            self._stale.pop(key, None)
+        return body
+
+    def stale_since(self):
+        """fetched_at of the oldest stored body currently served in place of upstream, or None"""
+        with self._lock:
+            return min(self._stale.values(), default=None)
+
+    def run_parallel(self, *calls, return_exceptions=False):
+        """Run zero-argument callables on the pool, results in call order.
+
+        Re-raises the first failure, same as calling them one after another,
+        unless return_exceptions is set - then failures come back as results.
+        """
+        futures = [self.executor.submit(call) for call in calls]
+        if not return_exceptions:
+            return [future.result() for future in futures]
+        return [future.exception() or future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self._downloads.shutdown(wait=False)
+        self.session.close()
+
+
+def _select(data, prefix):
+    """The array `prefix` ('response.item') points at in decoded JSON"""
+    for key in prefix.split('.')[:-1]:
+        data = data.get(key, {})
+    return data or []
@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+
+def cache_key(path, params=None):
+    """Stable key for an endpoint + query, whatever order the params came in"""
+    return f"{path}?{urlencode(sorted((params or {}).items()))}"
+
+
+class ResponseStore:
+    """Last good raw body per upstream request, gzipped in a SQLite file.
+
+    Shared by every worker process, and survives restarts - so a worker
+    that starts while the API is down still has something real to serve.
+    Bodies older than `max_age` seconds are dropped as new ones come in.
+    """
+
+    def __init__(self, path='upstream_cache.db', max_age=86400):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self._execute(
+            'CREATE TABLE IF NOT EXISTS upstream_response '
+            '(key TEXT PRIMARY KEY, path TEXT NOT NULL, body BLOB NOT NULL, fetched_at REAL NOT NULL)'
+        )
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _execute(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+    def get(self, key):
+        """(gzipped body, fetched_at) or None"""
+        row = self._execute(
+            'SELECT body, fetched_at FROM upstream_response WHERE key = ? AND fetched_at > ?',
+            (key, time.time() - self.max_age)
+        ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def put(self, key, path, body):
+        now = time.time()
+        self._execute(
+            'INSERT INTO upstream_response (key, path, body, fetched_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET body = excluded.body, fetched_at = excluded.fetched_at',
+            (key, path, body, now)
+        )
+        self._execute('DELETE FROM upstream_response WHERE fetched_at <= ?', (now - self.max_age,))
+
+
+class CircuitOpen(Exception):
+    """The upstream has been failing - calls are refused until the breaker resets"""
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after `threshold` failures in a row.
+
+    Open for `reset_timeout` seconds, then half-open: one trial call goes
+    through, and its outcome closes the breaker again or re-opens it.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=60):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """May a call go through now? Half-open lets exactly one trial through"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
@@ -0,0 +1,80 @@
+from flask import current_app, request
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+COLUMNAR_MIMETYPE = 'application/vnd.football-stats.columnar+json'
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+
+MIMETYPES = {
+    'json': 'application/json',
+    'columnar': COLUMNAR_MIMETYPE,
+    'msgpack': MSGPACK_MIMETYPE
+}
+
+# Match fields whose values repeat across a list - sent once in `strings`
+DICTIONARY_FIELDS = frozenset(('home_team', 'away_team', 'home_logo', 'away_logo', 'league', 'country',
+                               'league_logo', 'venue', 'status', 'time'))
+
+
+def negotiate():
+    """Wire format for this request: ?format= if given, else the best the Accept header allows"""
+    fmt = request.args.get('format')
+    if fmt:
+        if fmt not in MIMETYPES:
+            raise ValueError(f"unknown format {fmt}")
+        if fmt == 'msgpack' and msgpack is None:
+            raise ValueError('msgpack is not installed on this server')
+        return fmt
+
+    offered = [MIMETYPES['json'], COLUMNAR_MIMETYPE]
+    if msgpack is not None:
+        offered += [MSGPACK_MIMETYPE, 'application/msgpack']
+    best = request.accept_mimetypes.best_match(offered, default=MIMETYPES['json'])
+    if best == COLUMNAR_MIMETYPE:
+        return 'columnar'
+    if best in (MSGPACK_MIMETYPE, 'application/msgpack'):
+        return 'msgpack'
+    return 'json'
+
+
+def columnar(data):
+    """A match list response with `matches` turned into columns.
+
+    {'columns': {'id': [...], 'home_team': [0, 1, ...], ...}, 'strings': [...]}
+    - one list per field in the order the rows had them, and the values of
+    DICTIONARY_FIELDS as indexes into `strings`, each distinct value once
+    (None stays None). Every other key of the response is kept as is.
+    """
+    matches = data['matches']
+    strings, index = [], {}
+
+    def intern(value):
+        if value is None:
+            return None
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(strings)
+            strings.append(value)
+        return position
+
+    columns = {}
+    for field in (matches[0] if matches else ()):
+        values = [match[field] for match in matches]
+        columns[field] = [intern(value) for value in values] if field in DICTIONARY_FIELDS else values
+
+    encoded = {key: value for key, value in data.items() if key != 'matches'}
+    encoded['columns'] = columns
+    encoded['strings'] = strings
+    return encoded
+
+
+def encode(data, fmt):
+    """Serialized body of a match list response in one of MIMETYPES' formats"""
+    if fmt == 'json':
+        return current_app.json.dumps(data).encode('utf-8')
+    if fmt == 'columnar':
+        return current_app.json.dumps(columnar(data)).encode('utf-8')
+    return msgpack.packb(columnar(data))
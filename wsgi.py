@@ -0,0 +1,6 @@
+"""WSGI entry point:  gunicorn -c gunicorn.conf.py wsgi:app"""
+import os
+from app import create_app
+from config import CONFIGS
+
+app = create_app(CONFIGS[os.getenv('FLASK_CONFIG', 'production')])